@@ -0,0 +1,271 @@
+"""
+Benchmark suite for the generation pipeline.
+
+Runs a fixed set of seeded workloads (1-8 players, both map styles, small and
+huge zone counts, every AI placement mode) and reports per-stage wall time,
+memory allocations and throughput (worlds per second). Stage times and counters
+are the ones utils.instrumentation records inside the pipeline.
+
+    python -m benchmarks.bench_pipeline                       # run, print, save bench_results.json
+    python -m benchmarks.bench_pipeline --quick               # small workloads only
+    python -m benchmarks.bench_pipeline --out benchmarks/baseline.json    # record a local baseline
+    python -m benchmarks.bench_pipeline --compare benchmarks/baseline.json
+
+Timings are machine specific: baselines are recorded locally (git-ignored) and
+only compared on the machine that recorded them.
+Run from the repository root (h3t_source.h3t is looked up in the working directory).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from models import map_graph
+from utils import export, instrumentation
+from utils.randomize import derive_seed, make_rng
+
+BASE_SEED = 20240501
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10    # relative slowdown reported as a regression
+
+# (human players, AI players) - together they cover 1..8 players
+PLAYER_SETS = [(1, 0), (2, 1), (2, 2), (3, 3), (4, 4), (2, 6)]
+AI_PLACEMENTS = ["main", "start", "both", "random"]
+ZONE_SIZES = {
+    "small": {"main_zone_nodes": 4, "player_zone_nodes": 3},
+    "huge": {"main_zone_nodes": 120, "player_zone_nodes": 50},
+}
+STYLES = ["random", "balanced"]
+
+def build_workloads(quick=False):
+    """Fixed workload list. AI placement modes rotate over the player sets with AI players."""
+    workloads = []
+    for style in STYLES:
+        for size_name, sizes in ZONE_SIZES.items():
+            if quick and size_name != "small":
+                continue
+            ai_index = 0
+            for humans, ais in PLAYER_SETS:
+                placement = "main"
+                if ais:
+                    placement = AI_PLACEMENTS[ai_index % len(AI_PLACEMENTS)]
+                    ai_index += 1
+                workloads.append({
+                    "name": f"{style}_{size_name}_H{humans}_C{ais}_{placement}",
+                    "map_style": style,
+                    "human_players": humans,
+                    "ai_players": ais,
+                    "ai_difficulty": "random",
+                    "ai_placement": placement,
+                    **sizes,
+                })
+    return workloads
+
+
+def run_once(workload, seed, vectorized=False):
+    """
+    Generate + export one world (export into memory). Returns (zones, links).
+    Per-stage times come from utils.instrumentation while a recording() is active.
+    """
+    rng = make_rng(seed)
+
+    with instrumentation.stage("generate_world"):
+        world = map_graph.generate_world(
+            num_human_players=workload["human_players"],
+            num_ai_players=workload["ai_players"],
+            ai_difficulty_mode=workload["ai_difficulty"],
+            map_style=workload["map_style"],
+            main_zone_nodes=workload["main_zone_nodes"],
+            player_zone_nodes=workload["player_zone_nodes"],
+            avg_links_main=2,
+            avg_links_player=2,
+            num_same_towns_in_start=0,
+            num_diff_towns_in_start=0,
+            ai_placement_mode=workload["ai_placement"],
+            rng=rng,
+            vectorized_attributes=vectorized,
+            overrides={"joining_percent": 1, "join_only_for_money": "x"},
+        )
+    with instrumentation.stage("write_h3t"):
+        export.write_h3t(
+            world, io.StringIO(),
+            num_humans=workload["human_players"],
+            num_ais=workload["ai_players"],
+            map_style=workload["map_style"],
+            rng=rng,
+        )
+    return len(world.nodes), len(world.links)
+
+
+def bench_workload(index, workload, repeat, vectorized=False):
+    seeds = [derive_seed(BASE_SEED, index, r) for r in range(repeat)]
+
+    # Warm-up (header/layout caches, imports) - not measured
+    run_once(workload, seeds[0], vectorized)
+
+    reports = []
+    t0 = time.perf_counter()
+    for seed in seeds:
+        with instrumentation.recording() as rec:
+            zones, links = run_once(workload, seed, vectorized)
+        reports.append(rec.report())
+    elapsed = time.perf_counter() - t0
+    total = instrumentation.aggregate(reports)
+
+    # Allocation pass: separate run, tracemalloc would distort the timings above
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run_once(workload, seeds[0], vectorized)
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot_blocks = sum(s.count for s in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+
+    stages = {
+        name: {
+            "calls": s["calls"] // repeat,
+            "total_ms": round(s["wall_ms"] / repeat, 3),
+            "self_ms": round(s["self_wall_ms"] / repeat, 3),
+            "self_cpu_ms": round(s["self_cpu_ms"] / repeat, 3),
+        }
+        for name, s in sorted(total["stages"].items())
+    }
+    return {
+        "name": workload["name"],
+        "params": workload,
+        "repeat": repeat,
+        "zones": zones,
+        "links": links,
+        "world_ms": round(elapsed / repeat * 1000, 3),
+        "worlds_per_sec": round(repeat / elapsed, 2),
+        "peak_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((current - before) / 1024, 1),
+        "live_blocks": snapshot_blocks,
+        "stages": stages,
+        "counters": {name: v // repeat for name, v in total["counters"].items()},
+    }
+
+
+def run_suite(quick=False, repeat=DEFAULT_REPEAT, only=None, vectorized=False):
+    results = []
+    workloads = build_workloads(quick)
+    with open(os.devnull, "w") as devnull:
+        for index, workload in enumerate(workloads):
+            if only and only not in workload["name"]:
+                continue
+            with contextlib.redirect_stdout(devnull):   # the generator is very chatty
+                result = bench_workload(index, workload, repeat, vectorized)
+            results.append(result)
+            print(f"{result['name']:<42} {result['zones']:>5} zones {result['links']:>5} links "
+                  f"{result['world_ms']:>10.2f} ms/world {result['worlds_per_sec']:>9.2f} worlds/s "
+                  f"peak {result['peak_kb']:>9.1f} KB")
+
+    total_worlds = sum(r["repeat"] for r in results)
+    total_s = sum(r["world_ms"] * r["repeat"] for r in results) / 1000
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_seed": BASE_SEED,
+            "repeat": repeat,
+            "quick": quick,
+            "vectorized": vectorized,
+        },
+        "summary": {
+            "worlds": total_worlds,
+            "seconds": round(total_s, 3),
+            "worlds_per_sec": round(total_worlds / total_s, 2) if total_s else 0.0,
+        },
+        "workloads": results,
+    }
+
+
+# ──────────────────────────────────────────────
+# Baseline comparison
+# ──────────────────────────────────────────────
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Print per-workload and per-stage time ratios (current / baseline).
+    Returns the list of regressions (ratio above 1 + threshold).
+    """
+    # ratios are only meaningful against a baseline recorded under the same conditions
+    for key in ("platform", "python", "vectorized"):
+        if baseline["meta"].get(key) != results["meta"][key]:
+            print(f"[WARN] Baseline {key} {baseline['meta'].get(key)!r} differs from this run "
+                  f"({results['meta'][key]!r}) - ratios are not comparable")
+    base = {w["name"]: w for w in baseline["workloads"]}
+    regressions = []
+    print(f"\n{'workload':<42} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+    for w in results["workloads"]:
+        b = base.get(w["name"])
+        if b is None:
+            print(f"{w['name']:<42} {'-':>10} {w['world_ms']:>10.2f}     new")
+            continue
+        ratio = w["world_ms"] / b["world_ms"] if b["world_ms"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append((w["name"], None, ratio))
+        print(f"{w['name']:<42} {b['world_ms']:>10.2f} {w['world_ms']:>10.2f} {ratio:>7.2f}{flag}")
+
+        for stage, s in w["stages"].items():
+            bs = b["stages"].get(stage)
+            if not bs or not bs["self_ms"]:
+                continue
+            stage_ratio = s["self_ms"] / bs["self_ms"]
+            # tiny stages are too noisy to flag
+            if stage_ratio > 1 + threshold and s["self_ms"] >= 1.0:
+                regressions.append((w["name"], stage, stage_ratio))
+                print(f"    {stage:<38} {bs['self_ms']:>10.2f} {s['self_ms']:>10.2f} {stage_ratio:>7.2f}  REGRESSION")
+
+    # Throughput over the workloads present in both runs
+    common = [w for w in results["workloads"] if w["name"] in base]
+    b_ms = sum(base[w["name"]]["world_ms"] for w in common)
+    n_ms = sum(w["world_ms"] for w in common)
+    if b_ms and n_ms:
+        print(f"\nthroughput ({len(common)} workloads): {len(common) * 1000 / b_ms:.2f} -> "
+              f"{len(common) * 1000 / n_ms:.2f} worlds/s ({b_ms / n_ms:.2f}x)")
+    return regressions
+
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(description="Benchmark the template generation pipeline.")
+    p.add_argument("--quick", action="store_true", help="small zone counts only")
+    p.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="worlds per workload")
+    p.add_argument("--vectorized", action="store_true", help="use the NumPy batch zone-attribute path")
+    p.add_argument("--only", default=None, help="run workloads whose name contains this text")
+    p.add_argument("--out", default="bench_results.json", help="result file (JSON)")
+    p.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slowdown counted as regression")
+    return p
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    results = run_suite(quick=args.quick, repeat=args.repeat, only=args.only, vectorized=args.vectorized)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[OK] Results saved to {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"[WARN] {len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,63 +1,69 @@
-import random
-
 from models.objects import NodeType
-from utils.randomize import random_bool, random_choice_weighted
+from utils.randomize import WeightedSampler, random_bool
+
+# Weighted draws used by the ZONE_CONFIG callables (built once, not per call)
+TREASURE_TOWNS = WeightedSampler([(2, 0.1), (1, 0.25), (0, 0.65)])
+NEUTRAL_CASTLES = WeightedSampler([(1, 0.1), (0, 0.9)])
+TREASURE_CASTLES = WeightedSampler([(1, 0.2), (0, 0.8)])
+SUPER_TREASURE_CASTLES = WeightedSampler([(2, 0.1), (1, 0.15), (0, 0.75)])
 
+# Values are either constants or callables taking (rng) or (node, rng),
+# where rng is the generator context passed to assign_zone_attributes.
 ZONE_CONFIG = {
     NodeType.START: {
-        "zone_type": lambda: 1,
-        "zone_size": lambda: random.randint(15, 40),
+        "zone_type": lambda rng: 1,
+        "zone_size": lambda rng: rng.randint(15, 40),
         "res_parameter1": 1,
         "res_parameter2": 8,
         "res_parameter3": 2,
         "res_parameter4": 8,
-        "player_control": lambda node: node.owner or 0,  # owner number or 0
+        "player_control": lambda node, rng: node.owner or 0,  # owner number or 0
         "player_towns_min": 0,
         "player_castles_min": 1,
         "player_towns_density": 0,
         "player_castles_density": 0,
 
-        "neutral_towns_min": lambda: 1 if random_bool(0.2) else 0,
-        "neutral_castle_min": lambda node: 0 if node.attributes.get("neutral_towns_min", 0) > 0 else 0,
+        "neutral_towns_min": lambda rng: 1 if random_bool(0.2, rng) else 0,
+        "neutral_castle_min": lambda node, rng: 0 if node.attributes.get("neutral_towns_min", 0) > 0 else 0,
         "neutral_towns_density": 0,
         "neutral_castle_density": 0,
 
-        "all_castle_same": lambda: random.choice(['', 'x']),  # 50/50
+        "all_castle_same": lambda rng: rng.choice(['', 'x']),  # 50/50
         **{f"allowed_castle_{i}": 'x' for i in range(1, 13)}
     },
     NodeType.NEUTRAL: {
-        "zone_type": lambda: 3,  # neutral = junction
-        "zone_size": lambda: random.randint(15, 40),
+        "zone_type": lambda rng: 3,  # neutral = junction
+        "zone_size": lambda rng: rng.randint(15, 40),
         "res_parameter1": 1,
         "res_parameter2": 8,
         "res_parameter3": 2,
         "res_parameter4": 8,
-        "player_control": lambda node: 0,
+        "player_control": lambda node, rng: 0,
 
         "player_towns_min": 0,
         "player_castles_min": 0,
         "player_towns_density": 0,
         "player_castles_density": 0,
 
-        "neutral_towns_min": lambda: 1 if random_bool(0.2) else 0,
-        "neutral_castle_min": lambda node: (
+        "neutral_towns_min": lambda rng: 1 if random_bool(0.2, rng) else 0,
+        "neutral_castle_min": lambda node, rng: (
             0 if node.attributes.get("neutral_towns_min", 0) > 0
-            else random_choice_weighted([(1, 0.1), (0, 0.9)])
+            else NEUTRAL_CASTLES.draw(rng)
         ),
         "neutral_towns_density": 0,
         "neutral_castle_density": 0,
 
-        "all_castle_same": lambda: random.choice(['', 'x']),
+        "all_castle_same": lambda rng: rng.choice(['', 'x']),
         **{f"allowed_castle_{i}": 'x' for i in range(1, 13)}
     },
     NodeType.JUNCTION: {
-        "zone_type": lambda: 3,  # neutral = junction
-        "zone_size": lambda: random.randint(15, 25),
+        "zone_type": lambda rng: 3,  # neutral = junction
+        "zone_size": lambda rng: rng.randint(15, 25),
         "res_parameter1": 1,
         "res_parameter2": 8,
         "res_parameter3": 2,
         "res_parameter4": 8,
-        "player_control": lambda node: 0,
+        "player_control": lambda node, rng: 0,
 
         "player_towns_min": 0,
         "player_castles_min": 0,
@@ -73,53 +79,53 @@ ZONE_CONFIG = {
         **{f"allowed_castle_{i}": 'x' for i in range(1, 13)}
     },
     NodeType.TREASURE: {
-        "zone_type": lambda: 2,
-        "zone_size": lambda: random.randint(15, 40),
+        "zone_type": lambda rng: 2,
+        "zone_size": lambda rng: rng.randint(15, 40),
         "res_parameter1": 1,
         "res_parameter2": 8,
         "res_parameter3": 2,
         "res_parameter4": 8,
-        "player_control": lambda node: 0,
+        "player_control": lambda node, rng: 0,
 
         "player_towns_min": 0,
         "player_castles_min": 0,
         "player_towns_density": 0,
         "player_castles_density": 0,
 
-        "neutral_towns_min": lambda: random_choice_weighted([(2, 0.1), (1, 0.25), (0, 0.65)]),
-        "neutral_castle_min": lambda node: (
+        "neutral_towns_min": lambda rng: TREASURE_TOWNS.draw(rng),
+        "neutral_castle_min": lambda node, rng: (
             0 if node.attributes.get("neutral_towns_min", 0) > 0
-            else random_choice_weighted([(1, 0.2), (0, 0.8)])
+            else TREASURE_CASTLES.draw(rng)
         ),
         "neutral_towns_density": 0,
         "neutral_castle_density": 0,
 
-        "all_castle_same": lambda: random.choice(['', 'x']),
+        "all_castle_same": lambda rng: rng.choice(['', 'x']),
         **{f"allowed_castle_{i}": 'x' for i in range(1, 13)}
     },
     NodeType.SUPER_TREASURE: {
-        "zone_type": lambda: 2,  # same zone_type as normal treasure
-        "zone_size": lambda: random.randint(20, 40),
+        "zone_type": lambda rng: 2,  # same zone_type as normal treasure
+        "zone_size": lambda rng: rng.randint(20, 40),
         "res_parameter1": 1,
         "res_parameter2": 8,
         "res_parameter3": 2,
         "res_parameter4": 8,
-        "player_control": lambda node: 0,
+        "player_control": lambda node, rng: 0,
 
         "player_towns_min": 0,
         "player_castles_min": 0,
         "player_towns_density": 0,
         "player_castles_density": 0,
 
-        "neutral_towns_min": lambda: random_choice_weighted([(2, 0.1), (1, 0.25), (0, 0.65)]),
-        "neutral_castle_min": lambda node: (
+        "neutral_towns_min": lambda rng: TREASURE_TOWNS.draw(rng),
+        "neutral_castle_min": lambda node, rng: (
             0 if node.attributes.get("neutral_towns_min", 0) > 0
-            else random_choice_weighted([(2, 0.1), (1, 0.15), (0, 0.75)])
+            else SUPER_TREASURE_CASTLES.draw(rng)
         ),
         "neutral_towns_density": 0,
         "neutral_castle_density": 0,
 
-        "all_castle_same": lambda: random.choice(['', 'x']),
+        "all_castle_same": lambda rng: rng.choice(['', 'x']),
         **{f"allowed_castle_{i}": 'x' for i in range(1, 13)}
     }
 }
@@ -131,7 +137,7 @@ MANUAL_OVERRIDES = {}
 # ──────────────────────────────────────────────
 # Field order for ZONE (Node) attributes
 # ──────────────────────────────────────────────
-# Complete zone field order (exactly 97 items)
+# Complete zone field order (exactly 94 items, one per zone column of h3t_source.h3t)
 ZONE_FIELDS = [
     # Core zone identity / basic params
     "zone_size",
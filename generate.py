@@ -1,38 +1,54 @@
 import random
+import sys
+from multiprocessing import freeze_support
 
+from utils.batch import main as batch_main
+from utils.server import main as server_main
 from utils.input_output import build_world_interactive
 from utils.gui import WorldGeneratorGUI
+from utils.instrumentation import recording_from_env
 from utils.run_pipeline import run_generation_pipeline
 
 USE_GUI = True  # ← toggle here
 
 if __name__ == "__main__":
+    freeze_support()  # needed for the process pool in PyInstaller builds
     random.seed()  # or random.seed(42)
 
-    if USE_GUI:
+    if "--serve" in sys.argv[1:]:
+        # Local HTTP service, e.g.: generate.py --serve --port 8080 --workers 4
+        server_main(sys.argv[1:])
+
+    elif len(sys.argv) > 1:
+        # Headless batch mode, e.g.: generate.py --count 1000 --humans 2 --ais 2 --out-dir out
+        batch_main(sys.argv[1:])
+
+    elif USE_GUI:
         # GUI mode
         WorldGeneratorGUI().mainloop()
 
     else:
         # CLI mode (unchanged behavior)
-        (
-            template_filename,
-            map_style,
-            human_players,
-            ai_players,
-            disable_special_weeks,
-            anarchy,
-            world,
-            heroes,
-        ) = build_world_interactive()
-
-        run_generation_pipeline(
-            template_filename=template_filename,
-            map_style=map_style,
-            human_players=human_players,
-            ai_players=ai_players,
-            disable_special_weeks=disable_special_weeks,
-            anarchy=anarchy,
-            world=world,
-            heroes=heroes
-        )
+        # H3T_INSTRUMENT=<report.json> records stage timings/counters of the run
+        with recording_from_env():
+            (
+                template_filename,
+                map_style,
+                human_players,
+                ai_players,
+                disable_special_weeks,
+                anarchy,
+                world,
+                heroes,
+            ) = build_world_interactive()
+
+            run_generation_pipeline(
+                template_filename=template_filename,
+                map_style=map_style,
+                human_players=human_players,
+                ai_players=ai_players,
+                disable_special_weeks=disable_special_weeks,
+                anarchy=anarchy,
+                world=world,
+                heroes=heroes
+            )
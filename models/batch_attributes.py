@@ -0,0 +1,325 @@
+from config import (
+    NEUTRAL_CASTLES,
+    RESOURCE_NAMES,
+    SUPER_TREASURE_CASTLES,
+    TREASURE_CASTLES,
+    TREASURE_TOWNS,
+)
+from models.objects import NodeType
+from models.parameters import (
+    MONSTER_DISPOSITION,
+    TREASURE_DENSITY,
+    TREASURE_RANGES,
+    ZONE_PLANS,
+    assign_zone_attributes,
+    resolve_overrides,
+)
+from utils import instrumentation
+from utils.randomize import resolve_rng
+
+try:
+    import numpy as np
+except ImportError:  # optional - the batch path falls back to the scalar code
+    np = None
+
+# ──────────────────────────────────────────────
+# Batch zone attributes
+# ──────────────────────────────────────────────
+# assign_zone_attributes_batch() fills the zone attributes of many nodes (one
+# world or many) at once: nodes are grouped by NodeType and every random draw
+# of a group is made as one NumPy array. The distributions are the same as in
+# assign_zone_attributes / resource_logic / terrain_and_monster_attributes /
+# treasure_attributes / meta_zone_attributes, but the random stream is not, so
+# seeded results differ from the scalar path.
+#
+# Keep _VECTOR_CONFIG in sync with the callables in ZONE_CONFIG. A callable
+# without a vector sampler is still honoured - it is called once per node.
+
+RARE_RESOURCES = ["mercury", "sulfur", "crystals", "gems"]
+
+
+def _bernoulli(gen, n, p):
+    return gen.random(n) < p
+
+def _randint(gen, n, low, high):
+    """Vector rng.randint(low, high) (both ends inclusive)."""
+    return gen.integers(low, high + 1, size=n).tolist()
+
+def _choice(gen, n, options):
+    return [options[i] for i in gen.integers(0, len(options), size=n).tolist()]
+
+def _x_or(mask, other):
+    return ['x' if m else other for m in mask.tolist()]
+
+
+def _neutral_castles(sampler):
+    """neutral_castle_min: 0 if the zone has neutral towns, else a weighted draw."""
+    def sample(gen, nodes, cols):
+        n = len(nodes)
+        drawn = sampler.draw_array(gen, n)
+        return [0 if towns > 0 else c for towns, c in zip(cols["neutral_towns_min"], drawn)]
+    return sample
+
+
+_TOWNS_START = lambda gen, nodes, cols: [int(b) for b in _bernoulli(gen, len(nodes), 0.2).tolist()]
+_TOWNS_TREASURE = lambda gen, nodes, cols: TREASURE_TOWNS.draw_array(gen, len(nodes))
+_CASTLE_SAME = lambda gen, nodes, cols: _choice(gen, len(nodes), ['', 'x'])
+_ZERO = lambda gen, nodes, cols: [0] * len(nodes)
+
+def _const(value):
+    return lambda gen, nodes, cols: [value] * len(nodes)
+
+def _zone_size(low, high):
+    return lambda gen, nodes, cols: _randint(gen, len(nodes), low, high)
+
+# (NodeType, key) -> sampler(gen, nodes, columns so far) for the callables of ZONE_CONFIG
+_VECTOR_CONFIG = {
+    (NodeType.START, "zone_type"): _const(1),
+    (NodeType.START, "zone_size"): _zone_size(15, 40),
+    (NodeType.START, "player_control"): lambda gen, nodes, cols: [n.owner or 0 for n in nodes],
+    (NodeType.START, "neutral_towns_min"): _TOWNS_START,
+    (NodeType.START, "neutral_castle_min"): _ZERO,
+    (NodeType.START, "all_castle_same"): _CASTLE_SAME,
+
+    (NodeType.NEUTRAL, "zone_type"): _const(3),
+    (NodeType.NEUTRAL, "zone_size"): _zone_size(15, 40),
+    (NodeType.NEUTRAL, "player_control"): _ZERO,
+    (NodeType.NEUTRAL, "neutral_towns_min"): _TOWNS_START,
+    (NodeType.NEUTRAL, "neutral_castle_min"): _neutral_castles(NEUTRAL_CASTLES),
+    (NodeType.NEUTRAL, "all_castle_same"): _CASTLE_SAME,
+
+    (NodeType.JUNCTION, "zone_type"): _const(3),
+    (NodeType.JUNCTION, "zone_size"): _zone_size(15, 25),
+    (NodeType.JUNCTION, "player_control"): _ZERO,
+
+    (NodeType.TREASURE, "zone_type"): _const(2),
+    (NodeType.TREASURE, "zone_size"): _zone_size(15, 40),
+    (NodeType.TREASURE, "player_control"): _ZERO,
+    (NodeType.TREASURE, "neutral_towns_min"): _TOWNS_TREASURE,
+    (NodeType.TREASURE, "neutral_castle_min"): _neutral_castles(TREASURE_CASTLES),
+    (NodeType.TREASURE, "all_castle_same"): _CASTLE_SAME,
+
+    (NodeType.SUPER_TREASURE, "zone_type"): _const(2),
+    (NodeType.SUPER_TREASURE, "zone_size"): _zone_size(20, 40),
+    (NodeType.SUPER_TREASURE, "player_control"): _ZERO,
+    (NodeType.SUPER_TREASURE, "neutral_towns_min"): _TOWNS_TREASURE,
+    (NodeType.SUPER_TREASURE, "neutral_castle_min"): _neutral_castles(SUPER_TREASURE_CASTLES),
+    (NodeType.SUPER_TREASURE, "all_castle_same"): _CASTLE_SAME,
+}
+
+
+def _flush(nodes, cols):
+    """Write the columns computed so far into the nodes (needed before calling a (node, rng) callable)."""
+    keys = list(cols)
+    for node, row in zip(nodes, zip(*(cols[k] for k in keys))):
+        node.attributes.update(zip(keys, row))
+
+
+def _config_columns(node_type, nodes, gen, rng):
+    plan = ZONE_PLANS[node_type]
+    n = len(nodes)
+    cols = {key: [value] * n for key, value in plan.constants.items()}
+    for key, func, takes_node in plan.dynamic:
+        sampler = _VECTOR_CONFIG.get((node_type, key))
+        if sampler is not None:
+            cols[key] = sampler(gen, nodes, cols)
+            continue
+        # No vector version - call the config entry per node
+        _flush(nodes, cols)
+        if takes_node:
+            cols[key] = [func(node, rng) for node in nodes]
+        else:
+            cols[key] = [func(rng) for _ in nodes]
+    return cols
+
+
+def _resource_columns(node_type, gen, n, towns, castles):
+    """Vector resource_logic: *_min / *_density columns."""
+    mins = {r: np.zeros(n, dtype=np.int64) for r in RESOURCE_NAMES}
+
+    def one_rare(p):
+        hit = _bernoulli(gen, n, p)
+        pick = gen.integers(0, len(RARE_RESOURCES), size=n)
+        for i, r in enumerate(RARE_RESOURCES):
+            mins[r][hit & (pick == i)] = 1
+
+    def wood_and_ore():
+        has_castle = castles > 0
+        has_town = ~has_castle & (towns > 0)
+        both = has_castle | (has_town & _bernoulli(gen, n, 0.5))
+        mins["wood"][both] = 1
+        mins["ore"][both] = 1
+
+    if node_type == NodeType.START:
+        mins["wood"][:] = 1
+        mins["ore"][:] = 1
+        one_rare(0.1)
+    elif node_type == NodeType.NEUTRAL:
+        wood_and_ore()
+        one_rare(0.25)
+        mins["gold"][_bernoulli(gen, n, 0.05)] = 1
+    elif node_type == NodeType.TREASURE:
+        wood_and_ore()
+        chosen = gen.random((n, len(RARE_RESOURCES))) < 0.2
+        # max 2 rares: keep a uniformly random pair of the chosen ones (like rng.sample)
+        over = chosen.sum(axis=1) > 2
+        if over.any():
+            keys = np.where(chosen, gen.random(chosen.shape), 2.0)
+            rank = keys.argsort(axis=1).argsort(axis=1)
+            chosen[over] &= rank[over] < 2
+        for i, r in enumerate(RARE_RESOURCES):
+            mins[r][chosen[:, i]] = 1
+        mins["gold"][_bernoulli(gen, n, 0.10)] = 1
+    elif node_type == NodeType.SUPER_TREASURE:
+        wood_and_ore()
+        chosen = gen.random((n, len(RARE_RESOURCES))) < 0.25
+        for i, r in enumerate(RARE_RESOURCES):
+            mins[r][chosen[:, i]] = 1
+        mins["gold"][_bernoulli(gen, n, 0.20)] = 1
+    elif node_type == NodeType.JUNCTION:
+        for r in RARE_RESOURCES + ["gold"]:
+            mins[r][_bernoulli(gen, n, 0.1)] = 1
+
+    cols = {}
+    zeros = [0] * n
+    for r in RESOURCE_NAMES:
+        cols[f"{r}_min"] = mins[r].tolist()
+        cols[f"{r}_density"] = zeros
+    return cols
+
+
+def _terrain_columns(node_type, gen, n, towns, castles):
+    """Vector terrain_and_monster_attributes."""
+    cols = {}
+    has_town = (towns > 0) | (castles > 0)
+
+    if node_type == NodeType.START:
+        cols["terrain_match_town"] = ['x'] * n
+    else:
+        cols["terrain_match_town"] = _x_or(has_town & _bernoulli(gen, n, 0.8), 0)
+
+    for i in range(1, 11):
+        cols[f"allowed_terrain_{i}"] = ['x'] * n
+
+    if node_type == NodeType.TREASURE:
+        cols["monster_strength"] = ['avg' if m else 'strong' for m in _bernoulli(gen, n, 0.8).tolist()]
+    elif node_type == NodeType.SUPER_TREASURE:
+        cols["monster_strength"] = ['avg' if m else 'strong' for m in _bernoulli(gen, n, 0.7).tolist()]
+    else:
+        cols["monster_strength"] = ['avg'] * n
+
+    if node_type == NodeType.START:
+        cols["monster_match_town"] = [0] * n
+    else:
+        cols["monster_match_town"] = _x_or(has_town & _bernoulli(gen, n, 0.1), 0)
+
+    for i in range(1, 14):
+        cols[f"allowed_monster_type_{i}"] = ['x'] * n
+    return cols
+
+
+def _treasure_columns(node_type, gen, n):
+    """Vector treasure_attributes (JUNCTION zones count as NEUTRAL or TREASURE, 50/50)."""
+    if node_type == NodeType.JUNCTION:
+        neutral = _bernoulli(gen, n, 0.5)
+        effective = np.where(neutral, int(NodeType.NEUTRAL), int(NodeType.TREASURE))
+    else:
+        effective = np.full(n, int(node_type))
+
+    cols = {}
+    types = list(TREASURE_RANGES)
+    for level in range(3):
+        for bound, name in ((0, "low"), (1, "high")):
+            base = np.zeros(n, dtype=np.int64)
+            for t in types:
+                base[effective == int(t)] = TREASURE_RANGES[t][level][bound]
+            # jitter(): randint(int(v * 0.8), int(v * 1.2))
+            low = (base * 0.8).astype(np.int64)
+            high = (base * 1.2).astype(np.int64)
+            cols[f"treasure{level + 1}_{name}"] = gen.integers(low, high + 1).tolist()
+
+    for level in range(3):
+        density = np.zeros(n, dtype=np.int64)
+        for t in types:
+            density[effective == int(t)] = TREASURE_DENSITY[t][level]
+        cols[f"treasure{level + 1}_density"] = density.tolist()
+
+    cols["zone_placement"] = [""] * n
+    cols["objects_section"] = ["+145 0 d d d d d" if node_type == NodeType.START else ""] * n
+    return cols
+
+
+def _meta_columns(node_type, gen, n, overrides):
+    """Vector meta_zone_attributes."""
+    cols = {"UI_position": ["0 0 0 0"] * n}
+    for key in ("zone_faction_force_neutral", "zone_repulsion", "town_type_rules", "shipyard_density",
+                "terrain_type_rule", "customized_allowed_factions_bitmap", "zone_faction_rule"):
+        cols[key] = [""] * n
+
+    cols["allow_non_coherent_road"] = ["" if m else "x" for m in _bernoulli(gen, n, 0.75).tolist()]
+
+    if overrides.get("monster_disposition") is not None:
+        cols["monster_disposition"] = [overrides["monster_disposition"]] * n
+    else:
+        cols["monster_disposition"] = MONSTER_DISPOSITION.draw_array(gen, n)
+
+    cols["custom_monster_disposition"] = [""] * n
+    joining = overrides.get("joining_percent")
+    cols["joining_percent"] = [1 if joining is None else joining] * n
+    money = overrides.get("join_only_for_money")
+    cols["join_only_for_money"] = ["x" if money is None else money] * n
+
+    if node_type == NodeType.SUPER_TREASURE:
+        cols["shipyard_min"] = [1 if m else "" for m in _bernoulli(gen, n, 0.1).tolist()]
+    else:
+        cols["shipyard_min"] = [""] * n
+
+    cols["max_road_block_value"] = [4000 if node_type == NodeType.START else ""] * n
+    return cols
+
+
+def _group_columns(node_type, nodes, gen, rng, overrides):
+    n = len(nodes)
+    cols = _config_columns(node_type, nodes, gen, rng)
+    towns = np.asarray(cols.get("neutral_towns_min", [0] * n), dtype=np.int64)
+    castles = np.asarray(cols.get("neutral_castle_min", [0] * n), dtype=np.int64)
+    cols.update(_resource_columns(node_type, gen, n, towns, castles))
+    cols.update(_terrain_columns(node_type, gen, n, towns, castles))
+    cols.update(_treasure_columns(node_type, gen, n))
+    cols.update(_meta_columns(node_type, gen, n, overrides))
+    return cols
+
+
+@instrumentation.timed("assign_zone_attributes_batch")
+def assign_zone_attributes_batch(nodes, rng=None, overrides=None):
+    """
+    Assign zone attributes to all `nodes` at once (they may come from many worlds).
+    Same distributions as assign_zone_attributes, drawn per NodeType group with NumPy.
+    Without NumPy every node goes through assign_zone_attributes.
+
+    Returns {NodeType: {attribute: list of values}} with the columns of each group
+    (rows in the order the nodes of that type were given); empty without NumPy.
+    """
+    rng = resolve_rng(rng)
+    overrides = resolve_overrides(overrides)
+    if np is None:
+        for node in nodes:
+            assign_zone_attributes(node, rng=rng, overrides=overrides)
+        return {}
+
+    groups = {}
+    for node in nodes:
+        if node.node_type in ZONE_PLANS:
+            groups.setdefault(node.node_type, []).append(node)
+        else:
+            assign_zone_attributes(node, rng=rng, overrides=overrides)   # untyped zones - scalar fallback
+
+    # One NumPy stream per call, seeded from the caller's generator context
+    gen = np.random.default_rng(rng.getrandbits(64))
+
+    columns = {}
+    for node_type, group in groups.items():
+        cols = _group_columns(node_type, group, gen, rng, overrides)
+        _flush(group, cols)
+        columns[node_type] = cols
+    return columns
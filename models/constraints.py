@@ -0,0 +1,194 @@
+from models.objects import NodeType
+from models.scoring import score_world
+
+# ──────────────────────────────────────────────
+# Acceptance constraints for generate_world
+# ──────────────────────────────────────────────
+# generate_world(constraints=[...]) regenerates until every constraint holds.
+# Each constraint is checked at the earliest stage that has the data it needs,
+# so a rejected candidate costs as little as possible:
+#
+#   "main"  - main graph (zone types + attributes), before the start template
+#   "start" - start template (zones + link attributes), before human cloning
+#   "world" - finished world (all link attributes), before the store is built
+#             (e.g. Fairness, which needs every guard_strength)
+#
+# Constraints are plain objects (no lambdas) so they can be sent to batch workers.
+#
+#     generate_world(..., constraints=[
+#         ZoneCount(NodeType.SUPER_TREASURE, at_least=2),
+#         StartGuard(at_most=3500),
+#         NeutralCastles(at_least=1),
+#     ], max_attempts=200, stats=stats)
+
+SCOPES = ("main", "start", "world")
+DEFAULT_MAX_ATTEMPTS = 100
+
+
+class ConstraintsNotMet(RuntimeError):
+    """generate_world ran out of attempts before all constraints held."""
+
+
+class Constraint:
+    """Base class: `scope` says where it is checked, accepts(graph) decides."""
+    scope = "main"
+
+    def accepts(self, graph):
+        raise NotImplementedError
+
+    def describe(self):
+        return type(self).__name__
+
+    def __repr__(self):
+        return self.describe()
+
+
+def _bounds_ok(value, at_least, at_most):
+    if at_least is not None and value < at_least:
+        return False
+    if at_most is not None and value > at_most:
+        return False
+    return True
+
+
+def _bounds_text(at_least, at_most):
+    if at_least is not None and at_most is not None:
+        return f"{at_least}..{at_most}"
+    if at_least is not None:
+        return f">= {at_least}"
+    return f"<= {at_most}"
+
+
+class ZoneCount(Constraint):
+    """Number of zones of `node_type` in the scope graph (default: main area)."""
+
+    def __init__(self, node_type, at_least=None, at_most=None, scope="main"):
+        if at_least is None and at_most is None:
+            raise ValueError("ZoneCount needs at_least and/or at_most")
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown constraint scope: {scope}")
+        self.node_type = NodeType(node_type)
+        self.at_least = at_least
+        self.at_most = at_most
+        self.scope = scope
+
+    def accepts(self, graph):
+        count = sum(1 for n in graph.nodes if n.node_type == self.node_type)
+        return _bounds_ok(count, self.at_least, self.at_most)
+
+    def describe(self):
+        return f"{self.scope}: {self.node_type.name} zones {_bounds_text(self.at_least, self.at_most)}"
+
+
+class NeutralCastles(Constraint):
+    """Guaranteed neutral castles (sum of neutral_castle_min) in the scope graph (default: main area)."""
+
+    def __init__(self, at_least=None, at_most=None, scope="main"):
+        if at_least is None and at_most is None:
+            raise ValueError("NeutralCastles needs at_least and/or at_most")
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown constraint scope: {scope}")
+        self.at_least = at_least
+        self.at_most = at_most
+        self.scope = scope
+
+    def accepts(self, graph):
+        count = sum(n.attributes.get("neutral_castle_min", 0) or 0 for n in graph.nodes)
+        return _bounds_ok(count, self.at_least, self.at_most)
+
+    def describe(self):
+        return f"{self.scope}: neutral castles {_bounds_text(self.at_least, self.at_most)}"
+
+
+class StartGuard(Constraint):
+    """
+    Maximum guard_strength on links touching a START zone. Checked on the start
+    template by default (its links already have attributes there); scope "world"
+    also covers the AI START zones and player->main links.
+    """
+
+    def __init__(self, at_most, scope="start"):
+        if scope not in ("start", "world"):
+            raise ValueError("StartGuard can only be checked on the start template or the world")
+        self.at_most = at_most
+        self.scope = scope
+
+    def accepts(self, graph):
+        for link in graph.links:
+            if link.node_a.node_type == NodeType.START or link.node_b.node_type == NodeType.START:
+                if link.attributes.get("guard_strength", 0) > self.at_most:
+                    return False
+        return True
+
+    def describe(self):
+        return f"{self.scope}: START link guards <= {self.at_most}"
+
+
+class Fairness(Constraint):
+    """
+    Minimum fairness ratio (models.scoring) of the finished world: the worst
+    min/max ratio over `metrics` (default: all scored metrics).
+    """
+    scope = "world"
+
+    def __init__(self, at_least, metrics=None):
+        self.at_least = at_least
+        self.metrics = tuple(metrics) if metrics else None
+
+    def accepts(self, graph):
+        fairness = score_world(graph)["fairness"]
+        ratios = [f["ratio"] for m, f in fairness.items() if self.metrics is None or m in self.metrics]
+        return min(ratios, default=1.0) >= self.at_least
+
+    def describe(self):
+        metrics = f" ({', '.join(self.metrics)})" if self.metrics else ""
+        return f"world: fairness >= {self.at_least}{metrics}"
+
+
+def group_by_scope(constraints):
+    """{scope: [constraints]} - empty scopes are left out so the checks can be skipped."""
+    grouped = {}
+    for c in constraints or ():
+        if c.scope not in SCOPES:
+            raise ValueError(f"Unknown constraint scope: {c.scope}")
+        grouped.setdefault(c.scope, []).append(c)
+    return grouped
+
+
+def first_failure(constraints, graph):
+    """The first constraint `graph` violates, or None if all hold."""
+    for c in constraints:
+        if not c.accepts(graph):
+            return c
+    return None
+
+
+# ──────────────────────────────────────────────
+# Retry statistics
+# ──────────────────────────────────────────────
+# A stats dict passed to generate_world accumulates over calls, so one dict
+# can collect the acceptance rate of a whole batch.
+
+def new_stats():
+    return {"worlds": 0, "attempts": 0, "rejected": {scope: 0 for scope in SCOPES}, "reasons": {}}
+
+
+def record_rejection(stats, constraint):
+    stats["rejected"][constraint.scope] += 1
+    reason = constraint.describe()
+    stats["reasons"][reason] = stats["reasons"].get(reason, 0) + 1
+
+
+def merge_stats(total, stats):
+    """Add `stats` into `total` (e.g. per-job stats from batch workers)."""
+    total["worlds"] += stats["worlds"]
+    total["attempts"] += stats["attempts"]
+    for scope, n in stats["rejected"].items():
+        total["rejected"][scope] = total["rejected"].get(scope, 0) + n
+    for reason, n in stats["reasons"].items():
+        total["reasons"][reason] = total["reasons"].get(reason, 0) + n
+    return total
+
+
+def acceptance_rate(stats):
+    return stats["worlds"] / stats["attempts"] if stats["attempts"] else 0.0
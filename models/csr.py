@@ -0,0 +1,238 @@
+import heapq
+
+from models.objects import NodeType
+
+try:
+    import numpy as np
+except ImportError:  # optional - all-pairs hops fall back to one BFS per node
+    np = None
+
+# ──────────────────────────────────────────────
+# CSR snapshot
+# ──────────────────────────────────────────────
+# CSRGraph.from_graph(world) freezes a Graph into integer arrays:
+#
+#   nodes[i]                       Node at index i (world.nodes order)
+#   offsets[i]:offsets[i + 1]      slice of targets / edge_links holding i's neighbours
+#   targets[e]                     neighbour index of directed edge e
+#   edge_links[e]                  link row (world.links order) of edge e
+#   guard[l] / wide[l] / road[l]   link attributes per link row
+#
+# wide / road are read from the graph on first access, so link attributes must
+# not change while the snapshot is in use.
+#
+# Every link is stored once per direction; double links stay two edges.
+# Self-loops and links to zones outside the graph have no edges (they are
+# listed in self_loops / dangling). Algorithms only walk these arrays, so
+# scoring and validation share one snapshot instead of following Node.links.
+
+
+def attribute_column(graph, kind, field):
+    """All values of one zone/link attribute, from the columnar store when it is in sync."""
+    store = graph.store
+    if store is not None and store.matches(graph):
+        return (store.zones if kind == "zones" else store.links).column(field)
+    items = graph.nodes if kind == "zones" else graph.links
+    return [item.attributes.get(field) for item in items]
+
+
+class CSRGraph:
+    """Immutable adjacency snapshot of a Graph; build with CSRGraph.from_graph."""
+
+    def __init__(self, nodes, offsets, targets, edge_links, link_ends, guard, self_loops, dangling, graph=None):
+        self.nodes = nodes
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_links = edge_links
+        self.link_ends = link_ends
+        self.guard = guard
+        self.self_loops = self_loops
+        self.dangling = dangling
+        self.node_types = [n.node_type for n in nodes]
+        self._graph = graph
+        self._wide = None
+        self._road = None
+        self._hops = None
+
+    @classmethod
+    def from_graph(cls, graph):
+        nodes = list(graph.nodes)
+        index = {id(n): i for i, n in enumerate(nodes)}
+        n = len(nodes)
+
+        link_ends = []
+        self_loops = []
+        dangling = []
+        degree = [0] * n
+        for row, link in enumerate(graph.links):
+            a = index.get(id(link.node_a))
+            b = index.get(id(link.node_b))
+            if a is None or b is None:
+                dangling.append(row)
+                link_ends.append((-1 if a is None else a, -1 if b is None else b))
+                continue
+            link_ends.append((a, b))
+            if a == b:
+                self_loops.append(row)
+                continue
+            degree[a] += 1
+            degree[b] += 1
+
+        offsets = [0] * (n + 1)
+        for i, d in enumerate(degree):
+            offsets[i + 1] = offsets[i] + d
+        fill = offsets[:-1]
+        targets = [0] * offsets[n]
+        edge_links = [0] * offsets[n]
+        for row, (a, b) in enumerate(link_ends):
+            if a < 0 or b < 0 or a == b:
+                continue
+            e = fill[a]
+            targets[e], edge_links[e] = b, row
+            fill[a] = e + 1
+            e = fill[b]
+            targets[e], edge_links[e] = a, row
+            fill[b] = e + 1
+
+        guard = [g or 0 for g in attribute_column(graph, "links", "guard_strength")]
+        return cls(nodes, offsets, targets, edge_links, link_ends, guard, self_loops, dangling, graph)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"CSRGraph({len(self.nodes)} zones, {len(self.link_ends)} links)"
+
+    # wide / road are read on first use - most algorithms only need guard
+    @property
+    def wide(self):
+        if self._wide is None:
+            self._wide = [bool(w) for w in attribute_column(self._graph, "links", "connection_type_wide")]
+        return self._wide
+
+    @property
+    def road(self):
+        if self._road is None:
+            self._road = [r == "+" for r in attribute_column(self._graph, "links", "roads")]
+        return self._road
+
+    def neighbors(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def degree(self, i):
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def indices_of(self, node_type):
+        return [i for i, t in enumerate(self.node_types) if t == node_type]
+
+    def starts(self):
+        return self.indices_of(NodeType.START)
+
+    def edge_costs(self, hop_cost=0):
+        """Per directed edge: guard strength of its link + hop_cost."""
+        guard = self.guard
+        return [guard[row] + hop_cost for row in self.edge_links]
+
+    # ─── Traversals ───
+
+    def bfs(self, source):
+        """Hop distance from `source` to every node index (-1 if unreachable)."""
+        offsets, targets = self.offsets, self.targets
+        dist = [-1] * len(self.nodes)
+        dist[source] = 0
+        frontier = [source]
+        hops = 0
+        while frontier:
+            hops += 1
+            nxt = []
+            for u in frontier:
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if dist[v] < 0:
+                        dist[v] = hops
+                        nxt.append(v)
+            frontier = nxt
+        return dist
+
+    def components(self):
+        """(count, labels): connected components, labels[i] = component number of node i."""
+        offsets, targets = self.offsets, self.targets
+        labels = [-1] * len(self.nodes)
+        count = 0
+        for root in range(len(self.nodes)):
+            if labels[root] >= 0:
+                continue
+            labels[root] = count
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if labels[v] < 0:
+                        labels[v] = count
+                        stack.append(v)
+            count += 1
+        return count, labels
+
+    def dijkstra(self, source, costs):
+        """Path cost from `source` to every node index (inf if unreachable); costs per directed edge."""
+        offsets, targets = self.offsets, self.targets
+        inf = float("inf")
+        dist = [inf] * len(self.nodes)
+        dist[source] = 0
+        heap = [(0, source)]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            d, u = pop(heap)
+            if d > dist[u]:
+                continue
+            lo, hi = offsets[u], offsets[u + 1]
+            for v, cost in zip(targets[lo:hi], costs[lo:hi]):
+                nd = d + cost
+                if nd < dist[v]:
+                    dist[v] = nd
+                    push(heap, (nd, v))
+        return dist
+
+    # ─── All-pairs hops ───
+
+    def hop_matrix(self):
+        """
+        All-pairs hop distances, -1 for unreachable pairs. With NumPy an int32
+        (n, n) array computed by frontier expansion (one matrix product per hop),
+        otherwise a list of BFS rows. Cached - the snapshot never changes.
+        """
+        if self._hops is None:
+            self._hops = self._hop_matrix_numpy() if np is not None else [self.bfs(i) for i in range(len(self.nodes))]
+        return self._hops
+
+    def _hop_matrix_numpy(self):
+        n = len(self.nodes)
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        adjacency = np.zeros((n, n), dtype=np.float32)
+        rows = np.repeat(np.arange(n), np.diff(offsets))
+        adjacency[rows, np.asarray(self.targets, dtype=np.int64)] = 1.0
+
+        dist = np.full((n, n), -1, dtype=np.int32)
+        np.fill_diagonal(dist, 0)
+        reached = np.eye(n, dtype=bool)
+        frontier = np.eye(n, dtype=np.float32)
+        hops = 0
+        while True:
+            hops += 1
+            new = ((frontier @ adjacency) > 0) & ~reached
+            if not new.any():
+                break
+            dist[new] = hops
+            reached |= new
+            frontier = new.astype(np.float32)
+        return dist
+
+    def eccentricity(self):
+        """Per node: largest hop distance to any node it can reach (its own component)."""
+        hops = self.hop_matrix()
+        if np is not None:
+            return hops.max(axis=1).tolist()
+        return [max(row) for row in hops]
+
+    def diameter(self):
+        """Largest eccentricity (over all components)."""
+        return max(self.eccentricity(), default=0)
@@ -0,0 +1,167 @@
+import hashlib
+import math
+import re
+
+from config import LINK_FIELDS, ZONE_FIELDS
+from models.csr import CSRGraph, attribute_column
+from models.store import format_value
+
+# ──────────────────────────────────────────────
+# Canonical world fingerprint
+# ──────────────────────────────────────────────
+# world_fingerprint() hashes a world independent of its zone numbering:
+#
+#   1. every zone starts with a colour from its type and exported cell texts
+#      (zone ids inside town_type_rules are replaced by that zone's player)
+#   2. Weisfeiler-Lehman refinement over the CSR snapshot: a zone's next colour
+#      is its colour plus the sorted (link cell texts, neighbour colour) pairs,
+#      repeated until the number of colours stops growing
+#   3. the palettes of all rounds (signature + count, sorted) are hashed
+#
+# Colours are renumbered by sorting their signatures, so the result does not
+# depend on Python's per-process str hashing and batch workers agree.
+# Isomorphic worlds with the same attributes always get the same fingerprint;
+# WL can in principle merge non-isomorphic graphs, which is harmless here.
+
+FINGERPRINT_BYTES = 16
+_ZONE_REF = re.compile(r"\d+")
+
+
+def _zone_labels(world):
+    """Initial zone signatures: (type, is_start, exported cell text of every zone field)."""
+    columns = [attribute_column(world, "zones", f) for f in ZONE_FIELDS]
+    rules = ZONE_FIELDS.index("town_type_rules") if "town_type_rules" in ZONE_FIELDS else None
+    player_of = None
+
+    labels = []
+    for i, node in enumerate(world.nodes):
+        cells = [format_value(col[i]) for col in columns]
+        if rules is not None and cells[rules]:
+            if player_of is None:
+                player_of = {n.id: format_value(n.attributes.get("player_control")) for n in world.nodes}
+            # "ns17_p" names zone 17 - keep the player it belongs to, not its number
+            cells[rules] = _ZONE_REF.sub(lambda m: "P" + player_of.get(int(m.group()), "?"), cells[rules])
+        labels.append((int(node.node_type or 0), bool(node.is_start), tuple(cells)))
+    return labels
+
+
+def _link_labels(world):
+    columns = [attribute_column(world, "links", f) for f in LINK_FIELDS]
+    return [tuple(format_value(v) for v in row) for row in zip(*columns)] if columns else []
+
+
+def _relabel(signatures):
+    """Signatures -> small ints in sorted-signature order, plus the (signature, count) palette."""
+    counts = {}
+    for s in signatures:
+        counts[s] = counts.get(s, 0) + 1
+    palette = sorted(counts.items())
+    color_of = {s: c for c, (s, _) in enumerate(palette)}
+    return [color_of[s] for s in signatures], palette
+
+
+def world_fingerprint(world, csr=None):
+    """Hex digest identifying `world` up to zone renumbering (see module comment)."""
+    if csr is None:
+        csr = CSRGraph.from_graph(world)
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_BYTES)
+
+    colors, palette = _relabel(_zone_labels(world))
+    digest.update(repr(palette).encode())
+
+    link_colors, link_palette = _relabel(_link_labels(world))
+    digest.update(repr(link_palette).encode())
+
+    offsets, targets, edge_links = csr.offsets, csr.targets, csr.edge_links
+    edge_colors = [link_colors[row] for row in edge_links]
+    # Self-loops and dangling links have no edges; fold them into the zone colour
+    extra = {}
+    for row in csr.self_loops + csr.dangling:
+        a, b = csr.link_ends[row]
+        for i in (a, b):
+            if i >= 0:
+                extra.setdefault(i, []).append(link_colors[row])
+
+    distinct = len(palette)
+    for _ in range(max(1, len(colors))):
+        signatures = []
+        for i, color in enumerate(colors):
+            lo, hi = offsets[i], offsets[i + 1]
+            neighbourhood = sorted(zip(edge_colors[lo:hi], (colors[t] for t in targets[lo:hi])))
+            signatures.append((color, tuple(neighbourhood), tuple(sorted(extra.get(i, ())))))
+        colors, palette = _relabel(signatures)
+        digest.update(repr(palette).encode())
+        if len(palette) == distinct:
+            break
+        distinct = len(palette)
+    return digest.hexdigest()
+
+
+# ──────────────────────────────────────────────
+# Duplicate filters
+# ──────────────────────────────────────────────
+# Both filters take fingerprints and answer add() with True for a new one.
+
+class SeenSet:
+    """Exact filter (memory grows with the number of distinct worlds)."""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, fingerprint):
+        if fingerprint in self._seen:
+            return False
+        self._seen.add(fingerprint)
+        return True
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class BloomFilter:
+    """
+    Fixed-memory filter sized for `capacity` fingerprints at `error_rate`.
+    A false positive drops a world that was not a duplicate; nothing is ever kept twice.
+    """
+
+    def __init__(self, capacity, error_rate=1e-6):
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, fingerprint):
+        # the fingerprint is already a hash: derive k positions by double hashing
+        value = int(fingerprint, 16)
+        h1 = value & 0xFFFFFFFFFFFFFFFF
+        h2 = (value >> 64) | 1
+        return [(h1 + k * h2) % self.bits for k in range(self.hashes)]
+
+    def add(self, fingerprint):
+        array = self._array
+        new = False
+        for pos in self._positions(fingerprint):
+            byte, bit = pos >> 3, 1 << (pos & 7)
+            if not array[byte] & bit:
+                array[byte] |= bit
+                new = True
+        if new:
+            self._count += 1
+        return new
+
+    def __contains__(self, fingerprint):
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fingerprint))
+
+    def __len__(self):
+        return self._count
+
+
+def make_filter(capacity=None, error_rate=1e-6):
+    """Exact SeenSet, or a BloomFilter when a capacity is given (bounded memory)."""
+    if capacity:
+        return BloomFilter(capacity, error_rate)
+    return SeenSet()
@@ -1,12 +1,58 @@
-import random
-from itertools import combinations
-
-from models.objects import Graph, Node, NodeType, Link, AIDifficulty
+from models.objects import Graph, Node, NodeType, Link, AIDifficulty, clone_attributes
+from models.batch_attributes import assign_zone_attributes_batch
+from models.constraints import DEFAULT_MAX_ATTEMPTS, ConstraintsNotMet, first_failure, group_by_scope, record_rejection
+from models.store import WorldStore
 from models.parameters import assign_zone_attributes, assign_all_link_attributes, sanity_check_links, assign_link_attributes, apply_ai_difficulty
+from utils import instrumentation
+from utils.randomize import WeightedSampler, resolve_rng
+
+# Zone type ladders (one rng.random() per zone)
+MAIN_TYPES_RANDOM = WeightedSampler.ladder(
+    [NodeType.JUNCTION, NodeType.NEUTRAL, NodeType.TREASURE, NodeType.SUPER_TREASURE], [0.1, 0.4, 0.8]
+)
+MAIN_TYPES_BALANCED = WeightedSampler.ladder(
+    [NodeType.JUNCTION, NodeType.NEUTRAL, NodeType.TREASURE, NodeType.SUPER_TREASURE], [0.1, 0.4, 0.7]
+)
+START_AREA_TYPES = WeightedSampler.ladder(
+    [NodeType.NEUTRAL, NodeType.TREASURE, NodeType.SUPER_TREASURE], [0.7, 0.9]
+)
+CENTRAL_TYPES = WeightedSampler.ladder([NodeType.TREASURE, NodeType.SUPER_TREASURE], [0.30])
+
+
+def _sample_pairs(nodes, rng):
+    """
+    Yield distinct unordered node pairs (a, b) - a before b in `nodes` - in uniformly random order.
 
-
-def generate_subgraph(num_nodes, id_start, owner=None, start_zone=False, avg_links_per_node=2, double_link_chance=0.15):
+    Pairs are drawn lazily by rejection against the pairs already yielded, so only
+    the pairs actually consumed are materialized (instead of all n*(n-1)/2).
+    Once half of all pairs have been drawn, rejection gets slow and the remaining
+    pairs are enumerated and shuffled instead.
+    """
+    n = len(nodes)
+    total = n * (n - 1) // 2
+    seen = set()
+
+    while len(seen) * 2 < total:
+        i = rng.randrange(n)
+        j = rng.randrange(n)
+        if i == j:
+            continue
+        key = (i, j) if i < j else (j, i)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield nodes[key[0]], nodes[key[1]]
+
+    rest = [(i, j) for i in range(n) for j in range(i + 1, n) if (i, j) not in seen]
+    rng.shuffle(rest)
+    for i, j in rest:
+        yield nodes[i], nodes[j]
+
+
+@instrumentation.timed("generate_subgraph")
+def generate_subgraph(num_nodes, id_start, owner=None, start_zone=False, avg_links_per_node=2, double_link_chance=0.15, rng=None):
     """Generate a connected subgraph with controlled link randomness."""
+    rng = resolve_rng(rng)
     g = Graph()
     nodes = [Node(id_start + i, owner=owner) for i in range(num_nodes)]
     for n in nodes:
@@ -16,49 +62,45 @@ def generate_subgraph(num_nodes, id_start, owner=None, start_zone=False, avg_lin
     available_nodes = nodes[:]
     connected = [available_nodes.pop()]
     while available_nodes:
-        node_a = random.choice(connected)
+        node_a = rng.choice(connected)
         node_b = available_nodes.pop()
         g.add_link(node_a, node_b)
         connected.append(node_b)
 
     # Step 2: Add random extra links (safe bounded version)
+    # Pairs are streamed in random order - cost is linear in the number of links, not n^2
     max_possible_links = num_nodes * (num_nodes - 1) // 2
     target_links = min(int(num_nodes * avg_links_per_node / 2), max_possible_links)
-    all_pairs = list(combinations(nodes, 2))
-    random.shuffle(all_pairs)
 
-    for (a, b) in all_pairs:
+    for (a, b) in _sample_pairs(nodes, rng):
         if len(g.links) >= target_links:
             break
         g.add_link(a, b)
-        if random.random() < double_link_chance:
+        if rng.random() < double_link_chance:
             g.add_link(a, b, allow_double=True)
             print(f"Created double link for nodes {a.id} and {b.id}")
 
     # Mark start node if needed
     if start_zone:
-        random.choice(nodes).is_start = True
+        rng.choice(nodes).is_start = True
 
     return g
 
 
 # Helpers to build main graph by style
-def _generate_main_graph_random(main_zone_nodes, current_id, avg_links_main):
+def _generate_main_graph_random(main_zone_nodes, current_id, avg_links_main, rng=None, vectorized_attributes=False,
+                                overrides=None):
+    rng = resolve_rng(rng)
     num_main_nodes = main_zone_nodes
-    main_graph = generate_subgraph(num_main_nodes, current_id, avg_links_per_node=avg_links_main)
+    main_graph = generate_subgraph(num_main_nodes, current_id, avg_links_per_node=avg_links_main, rng=rng)
 
     # Type assignment (current "random" method)
     for node in main_graph.nodes:
-        roll = random.random()
-        if roll < 0.1:
-            node.node_type = NodeType.JUNCTION
-        elif roll < 0.4:
-            node.node_type = NodeType.NEUTRAL
-        elif roll < 0.8:
-            node.node_type = NodeType.TREASURE
-        else:
-            node.node_type = NodeType.SUPER_TREASURE
-        assign_zone_attributes(node)
+        node.node_type = MAIN_TYPES_RANDOM.draw(rng)
+        if not vectorized_attributes:
+            assign_zone_attributes(node, rng=rng, overrides=overrides)
+    if vectorized_attributes:
+        assign_zone_attributes_batch(main_graph.nodes, rng=rng, overrides=overrides)
 
     return main_graph, num_main_nodes
 
@@ -67,6 +109,9 @@ def _generate_main_graph_balanced(
     current_id,
     avg_links_main,
     num_players=3,
+    rng=None,
+    vectorized_attributes=False,
+    overrides=None,
 ):
     """
     Generate a symmetrical balanced main graph:
@@ -77,29 +122,26 @@ def _generate_main_graph_balanced(
           * If A <  H → all AIs are global (connect to all fragments)
     """
 
+    rng = resolve_rng(rng)
+
     # Generate base fragment
     fragment_size = main_zone_nodes
     base_fragment = generate_subgraph(
-        fragment_size, id_start=current_id, avg_links_per_node=avg_links_main
+        fragment_size, id_start=current_id, avg_links_per_node=avg_links_main, rng=rng
     )    
 
     current_id += fragment_size
 
     for node in base_fragment.nodes:
-        roll = random.random()
-        if roll < 0.1:
-            node.node_type = NodeType.JUNCTION
-        elif roll < 0.4:
-            node.node_type = NodeType.NEUTRAL
-        elif roll < 0.7:
-            node.node_type = NodeType.TREASURE
-        else:
-            node.node_type = NodeType.SUPER_TREASURE
-        assign_zone_attributes(node)
+        node.node_type = MAIN_TYPES_BALANCED.draw(rng)
+        if not vectorized_attributes:
+            assign_zone_attributes(node, rng=rng, overrides=overrides)
+    if vectorized_attributes:
+        assign_zone_attributes_batch(base_fragment.nodes, rng=rng, overrides=overrides)
 
     # Generate parameters for links in the base_fragment
     for link in base_fragment.links:
-        assign_link_attributes(link)
+        assign_link_attributes(link, rng=rng)
 
     # Chose potential connection points for AI zones
     base_nodes = list(base_fragment.nodes)
@@ -108,8 +150,8 @@ def _generate_main_graph_balanced(
     # This turned out not to be that great... to many connections for global AIs
     # How many potential connection points per fragment (2–3)
    
-    #num_potential_main = random.choice([2, 3])
-    #base_potential_indices = random.sample(
+    #num_potential_main = rng.choice([2, 3])
+    #base_potential_indices = rng.sample(
     #    range(len(base_nodes)),
     #    k=min(num_potential_main, len(base_nodes))
     #)
@@ -137,7 +179,7 @@ def _generate_main_graph_balanced(
 
         for n in base_fragment.nodes:
             new_n = Node(current_id, node_type=n.node_type)
-            new_n.attributes = dict(n.attributes)
+            new_n.attributes = clone_attributes(n.attributes)
             nodes_map[n.id] = new_n
             g.add_node(new_n)
             new_nodes.append(new_n)
@@ -147,7 +189,7 @@ def _generate_main_graph_balanced(
         for l in base_fragment.links:
             new_link = g.add_link(nodes_map[l.node_a.id], nodes_map[l.node_b.id], allow_double=True)
             if hasattr(l, "attributes"):
-                new_link.attributes = dict(l.attributes)
+                new_link.attributes = clone_attributes(l.attributes)
 
         # Map the potential indices to this clone's nodes
         fragment_points = [new_nodes[idx] for idx in base_potential_indices]
@@ -163,20 +205,20 @@ def _generate_main_graph_balanced(
         num_cross_links = 1
     else:
         # Use less cross links
-        #num_cross_links = random.randint(2, base_count)
-        num_cross_links = random.randint(2, max(2, base_count - 2))
+        #num_cross_links = rng.randint(2, base_count)
+        num_cross_links = rng.randint(2, max(2, base_count - 2))
 
     base_nodes = list(base_fragment.nodes)
 
     # Build template: (from_idx, to_idx, attrs_dict)
     template_cross_links = []
     for _ in range(num_cross_links):
-        a_idx = random.randrange(base_count)
-        b_idx = random.randrange(base_count)
+        a_idx = rng.randrange(base_count)
+        b_idx = rng.randrange(base_count)
 
         # Create a dummy link on the base fragment just to compute attributes
         dummy_link = Link(base_nodes[a_idx], base_nodes[b_idx])
-        assign_link_attributes(dummy_link)
+        assign_link_attributes(dummy_link, rng=rng)
 
         template_cross_links.append(
             (a_idx, b_idx, dict(dummy_link.attributes))
@@ -198,24 +240,20 @@ def _generate_main_graph_balanced(
             # Create the actual link between fragments i and next_i
             link = g_i.add_link(node_a, node_b)
             # Copy the precomputed attributes so all such links are identical
-            link.attributes = dict(attrs)
+            link.attributes = clone_attributes(attrs)
 
 
     # Define indices for connecting player starting zones
     fragment_node_indices = list(range(len(base_fragment.nodes)))
-    num_connections = random.choice([2, 3])
-    player_connection_indices = random.sample(
+    num_connections = rng.choice([2, 3])
+    player_connection_indices = rng.sample(
         fragment_node_indices, k=min(num_connections, len(fragment_node_indices))
     )
     
     # optional central node
-    if random.random() < 0.5:
+    if rng.random() < 0.5:
         # Decide central node type: 30% Treasure, 70% Super-treasure
-        roll = random.random()
-        if roll < 0.30:
-            central_type = NodeType.TREASURE
-        else:
-            central_type = NodeType.SUPER_TREASURE
+        central_type = CENTRAL_TYPES.draw(rng)
 
         central_node = Node(
             current_id,
@@ -226,15 +264,15 @@ def _generate_main_graph_balanced(
         current_id += 1
 
         # Randomize zone attributes for the central node
-        assign_zone_attributes(central_node)
+        assign_zone_attributes(central_node, rng=rng, overrides=overrides)
 
         # Pick symmetrical indices inside each fragment (one per fragment)
         fragment_size = len(clone_graphs[0][1])
-        idx = random.randrange(fragment_size)     # one index for all fragments
+        idx = rng.randrange(fragment_size)     # one index for all fragments
 
         # Precompute symmetrical link attributes
         dummy = Link(Node(-1, node_type=central_type), Node(-2))
-        assign_link_attributes(dummy)
+        assign_link_attributes(dummy, rng=rng)
         CENTRAL_LINK_ATTRS = dict(dummy.attributes)
 
         # Connect central node to each fragment
@@ -244,7 +282,7 @@ def _generate_main_graph_balanced(
             link = frag_graph.add_link(central_node, target)
 
             # Symmetrical link attributes
-            link.attributes = dict(CENTRAL_LINK_ATTRS)
+            link.attributes = clone_attributes(CENTRAL_LINK_ATTRS)
 
         # Insert central node into FIRST fragment so that merge() picks it up
         clone_graphs[0][0].add_node(central_node)
@@ -252,8 +290,7 @@ def _generate_main_graph_balanced(
 
     # Merge all fragments into unified main graph
     main_graph = Graph()
-    for g, _ in clone_graphs:
-        main_graph.merge(g)
+    main_graph.merge_many(g for g, _ in clone_graphs)
 
 
     return (
@@ -279,34 +316,121 @@ def generate_world(
     num_same_towns_in_start=1,
     num_diff_towns_in_start=0,
     ai_placement_mode="main",
+    rng=None,
+    vectorized_attributes=False,
+    constraints=None,
+    max_attempts=DEFAULT_MAX_ATTEMPTS,
+    stats=None,
+    overrides=None,
 ):
     """
     Generate full world:
     - Main graph by 'map_style'
     - Human players: identical starting areas (cloned from one template)
     - AI players: single START node cloned from the template's START node
+
+    rng: generator context (random.Random); the same rng seed and parameters
+    always give the same world. Defaults to the module-global random.
+    vectorized_attributes: assign the zone attributes of the main graph and the
+    start template with assign_zone_attributes_batch (NumPy, same distributions,
+    different random stream - seeded worlds differ from the default path).
+    constraints: models.constraints objects; candidates are regenerated (with the
+    same rng) until all hold. Each one is checked right after the stage it needs
+    (main graph / start template / world), so rejections stay cheap.
+    Raises ConstraintsNotMet (a RuntimeError) after max_attempts rejected candidates.
+    stats: optional dict (models.constraints.new_stats()) accumulating attempts,
+    accepted worlds and rejections per scope / constraint over calls.
+    overrides: manual zone overrides ({"joining_percent": ..., ...}) for this world;
+    None uses the shared config.MANUAL_OVERRIDES.
     """
+    rng = resolve_rng(rng)
     assert 1 <= num_human_players <= 8, "Human players must be in [1, 8]"
     total_players = num_human_players + num_ai_players
     assert total_players <= 8, "Total players (human + AI) must be <= 8"
 
+    checks = group_by_scope(constraints)
+    attempts = max_attempts if checks else 1
+    for attempt in range(attempts):
+        if stats is not None:
+            stats["attempts"] += 1
+        world = _generate_candidate(
+            num_human_players, num_ai_players, ai_difficulty_mode, map_style,
+            main_zone_nodes, player_zone_nodes, avg_links_main, avg_links_player,
+            num_same_towns_in_start, num_diff_towns_in_start, ai_placement_mode,
+            rng, vectorized_attributes, checks, stats, overrides,
+        )
+        if world is not None:
+            if stats is not None:
+                stats["worlds"] += 1
+            if attempt:
+                print(f"[DEBUG] Constraints met after {attempt + 1} attempts")
+            return world
+
+    raise ConstraintsNotMet(
+        f"No world satisfied the constraints in {max_attempts} attempts: {', '.join(map(repr, constraints))}"
+    )
+
+
+def _rejected(constraints, graph, stats):
+    """Check one scope's constraints; records and reports the first violated one."""
+    failed = first_failure(constraints, graph)
+    if failed is None:
+        return False
+    if stats is not None:
+        record_rejection(stats, failed)
+    if instrumentation.recorder is not None:
+        instrumentation.recorder.count(f"constraints.rejected.{failed.scope}")
+    print(f"[DEBUG] Candidate rejected ({failed.describe()})")
+    return True
+
+
+def _generate_candidate(
+    num_human_players,
+    num_ai_players,
+    ai_difficulty_mode,
+    map_style,
+    main_zone_nodes,
+    player_zone_nodes,
+    avg_links_main,
+    avg_links_player,
+    num_same_towns_in_start,
+    num_diff_towns_in_start,
+    ai_placement_mode,
+    rng,
+    vectorized_attributes,
+    checks,
+    stats,
+    overrides,
+):
+    """One generate_world attempt. Returns None as soon as a constraint in `checks` fails."""
     current_id = 1
+    lap = instrumentation.laps()
 
     # 1) Generate main graph by style
+    lap("main_graph")
     if map_style.lower() == "balanced":
         # Balanced map generation
         main_graph, num_main_nodes, player_connection_indices, clone_graphs, base_fragment, current_id, main_conn_points = _generate_main_graph_balanced(
-            main_zone_nodes, current_id, avg_links_main, num_players=num_human_players
+            main_zone_nodes, current_id, avg_links_main, num_players=num_human_players, rng=rng,
+            vectorized_attributes=vectorized_attributes, overrides=overrides,
         )
     else:
         # Random map generation
-        main_graph, num_main_nodes = _generate_main_graph_random(main_zone_nodes*num_human_players, current_id, avg_links_main)
+        main_graph, num_main_nodes = _generate_main_graph_random(
+            main_zone_nodes*num_human_players, current_id, avg_links_main, rng=rng,
+            vectorized_attributes=vectorized_attributes, overrides=overrides,
+        )
         current_id += num_main_nodes
-        
+
+    if "main" in checks and _rejected(checks["main"], main_graph, stats):
+        lap.done()
+        return None
+
     # 2) Build human template starting area
+    lap("start_template")
     num_nodes = player_zone_nodes
     template_graph = generate_subgraph(
-        num_nodes, id_start=0, owner=None, start_zone=True, avg_links_per_node=avg_links_player
+        num_nodes, id_start=0, owner=None, start_zone=True, avg_links_per_node=avg_links_player, rng=rng
     )
 
     # Assign node types & attributes for template (identical across all humans)
@@ -315,25 +439,26 @@ def generate_world(
         if node.is_start:
             node.node_type = NodeType.START
         else:
-            roll = random.random()
-            if roll < 0.7:
-                node.node_type = NodeType.NEUTRAL
-            elif roll < 0.9:
-                node.node_type = NodeType.TREASURE
-            else:
-                node.node_type = NodeType.SUPER_TREASURE
-        assign_zone_attributes(node)
+            node.node_type = START_AREA_TYPES.draw(rng)
+        if not vectorized_attributes:
+            assign_zone_attributes(node, rng=rng, overrides=overrides)
+    if vectorized_attributes:
+        assign_zone_attributes_batch(template_graph.nodes, rng=rng, overrides=overrides)
 
 
     # Assign link attributes once for the template graph
     for link in template_graph.links:
-        assign_link_attributes(link)
+        assign_link_attributes(link, rng=rng)
+
+    if "start" in checks and _rejected(checks["start"], template_graph, stats):
+        lap.done()
+        return None
 
     # Mark potential conneciton points for AI in player start zone
     template_nodes = list(template_graph.nodes)
 
-    #num_potential_start = random.choice([2, 3])  # or make this a setting later
-    #start_potential_indices = random.sample(
+    #num_potential_start = rng.choice([2, 3])  # or make this a setting later
+    #start_potential_indices = rng.sample(
     #    range(len(template_nodes)),
     #    k=min(num_potential_start, len(template_nodes))
     #)
@@ -352,6 +477,7 @@ def generate_world(
             raise RuntimeError("Template graph did not produce a START node — this should not happen.")
 
     # Create Player starting zones
+    lap("cloning")
 
     # Clone template for each human player
     human_graphs = []
@@ -367,7 +493,7 @@ def generate_world(
                 owner=p,
                 is_start=n.is_start
             )
-            new_node.attributes = dict(n.attributes)
+            new_node.attributes = clone_attributes(n.attributes)
             if new_node.node_type == NodeType.START:
                 new_node.attributes["player_control"] = new_node.owner
                 start_node_id = new_node.id
@@ -385,7 +511,7 @@ def generate_world(
             b = nodes_map[l.node_b.id]
             new_link = g.add_link(a, b, allow_double=True)
             if hasattr(l, "attributes"):
-                new_link.attributes = dict(l.attributes)
+                new_link.attributes = clone_attributes(l.attributes)
 
         # map template indices to this clone
         player_start_points = [copied_nodes[idx] for idx in start_potential_indices]
@@ -422,6 +548,7 @@ def generate_world(
 
 
     # 4) Prepare world & connect human areas to main graph
+    lap("ai_attachment")
     world = Graph()
     world.merge(main_graph)
 
@@ -433,27 +560,29 @@ def generate_world(
             connection_indices = [0, 0]
         else:
             connection_indices = [
-                random.randrange(len(template_nodes)),
-                random.randrange(len(template_nodes)),
+                rng.randrange(len(template_nodes)),
+                rng.randrange(len(template_nodes)),
             ]
         for human_graph in human_graphs:
             player_nodes = list(human_graph.nodes)
-            main_targets = random.sample(list(main_graph.nodes), 2)
+            main_targets = rng.sample(list(main_graph.nodes), 2)
             for conn_idx, target in zip(connection_indices, main_targets):
                 connection_node = player_nodes[conn_idx]
                 link = human_graph.add_link(connection_node, target, is_player_to_main=True)
-                assign_link_attributes(link, is_player_to_main=True)
-            world.merge(human_graph)
+                assign_link_attributes(link, is_player_to_main=True, rng=rng)
+        world.merge_many(human_graphs)
+
         # 5) Create AI players: each gets a single START node cloned from the template START
         #    and connects to main graph with 2 links
         next_owner = num_human_players + 1
 
+        ai_graphs = []
         for _ in range(num_ai_players):
             ai_start = Node(current_id, node_type=NodeType.START, owner=next_owner, is_start=True)
-            ai_start.attributes = dict(tmpl_start.attributes)
+            ai_start.attributes = clone_attributes(tmpl_start.attributes)
             ai_start.attributes["player_control"] = next_owner
             if ai_difficulty_mode == "random":
-                ai_player_difficulty = random.choice([
+                ai_player_difficulty = rng.choice([
                     AIDifficulty.NORMAL,
                     AIDifficulty.HARD,
                     AIDifficulty.UNFAIR
@@ -470,7 +599,7 @@ def generate_world(
             mode = ai_placement_mode.lower()
 
             if mode == "random":
-                mode = random.choice(["main", "start", "both"])
+                mode = rng.choice(["main", "start", "both"])
 
             # Collect target lists for convenience
             main_nodes = list(main_graph.nodes)
@@ -480,61 +609,63 @@ def generate_world(
             # MAIN only
             if mode == "main":
                 # two connections to the main area
-                targets = random.sample(main_nodes, k=2)
+                targets = rng.sample(main_nodes, k=2)
                 for tgt in targets:
                     link = ai_graph.add_link(ai_start, tgt)
-                    assign_link_attributes(link)
+                    assign_link_attributes(link, rng=rng)
 
             # START only
             elif mode == "start":
                 if len(start_nodes) >= 2:
-                    targets = random.sample(start_nodes, k=2)
+                    targets = rng.sample(start_nodes, k=2)
                 elif len(start_nodes) == 1:
                     targets = [start_nodes[0], start_nodes[0]]
                 else:
                     # fallback if somehow no start nodes exist
-                    targets = random.sample(main_nodes, k=2)
+                    targets = rng.sample(main_nodes, k=2)
 
                 for tgt in targets:
                     link = ai_graph.add_link(ai_start, tgt)
-                    assign_link_attributes(link)
+                    assign_link_attributes(link, rng=rng)
 
             # BOTH (one link to main, one to start)
             elif mode == "both":
                 if len(start_nodes) == 0:
                     # fallback if no start nodes available
-                    targets = random.sample(main_nodes, k=2)
+                    targets = rng.sample(main_nodes, k=2)
                     for tgt in targets:
                         link = ai_graph.add_link(ai_start, tgt)
-                        assign_link_attributes(link)
+                        assign_link_attributes(link, rng=rng)
                 else:
-                    tgt_main = random.choice(main_nodes)
-                    tgt_start = random.choice(start_nodes)
+                    tgt_main = rng.choice(main_nodes)
+                    tgt_start = rng.choice(start_nodes)
                     link1 = ai_graph.add_link(ai_start, tgt_main)
                     link2 = ai_graph.add_link(ai_start, tgt_start)
-                    assign_link_attributes(link1)
-                    assign_link_attributes(link2)
+                    assign_link_attributes(link1, rng=rng)
+                    assign_link_attributes(link2, rng=rng)
 
-            # Merge AI graph into world
-            world.merge(ai_graph)
+            ai_graphs.append(ai_graph)
             current_id += 1
             next_owner += 1
 
+        # Merge AI graphs into world
+        world.merge_many(ai_graphs)
+
     # Balanced map post config
     else:    
         # All players share the same pattern of start/main connections
-        num_links = random.choice([2, 3])
+        num_links = rng.choice([2, 3])
         
         # Pick which player-zone nodes will connect
         player_nodes_example = list(template_graph.nodes)
-        player_connection_indices = random.sample(
+        player_connection_indices = rng.sample(
             range(len(player_nodes_example)),
             k=min(num_links, len(player_nodes_example))
         )
         
         # Pick which main-fragment nodes (by index within fragment) will connect
         base_fragment_nodes = list(base_fragment.nodes)
-        main_connection_indices = random.sample(
+        main_connection_indices = rng.sample(
             range(len(base_fragment_nodes)),
             k=min(num_links, len(base_fragment_nodes))
         )
@@ -543,7 +674,7 @@ def generate_world(
         PLAYER_MAIN_LINK_ATTRS = []
         for _ in player_connection_indices:
             dummy = Link(Node(-1), Node(-2), is_player_to_main=True)
-            assign_link_attributes(dummy, is_player_to_main=True)
+            assign_link_attributes(dummy, is_player_to_main=True, rng=rng)
             PLAYER_MAIN_LINK_ATTRS.append(dict(dummy.attributes))
 
         # Now connect each player's start zone <-> their corresponding main fragment clone
@@ -558,9 +689,13 @@ def generate_world(
 
                 # Use template attributes for this specific link index
                 template_index = player_connection_indices.index(p_idx)
-                link.attributes = dict(PLAYER_MAIN_LINK_ATTRS[template_index])
-                
-            world.merge(human_graph)
+                link.attributes = clone_attributes(PLAYER_MAIN_LINK_ATTRS[template_index])
+
+        world.merge_many(human_graphs)
+
+        # Corresponding zones of all players: start areas, main fragments (+ embedded AIs below)
+        clone_orbits = [tuple(nodes) for nodes in zip(*(g.nodes for g in human_graphs))]
+        clone_orbits += [tuple(nodes) for nodes in zip(*(nodes for _, nodes in clone_graphs))]
 
         current_id = attach_ai_balanced(
             world=world,
@@ -573,11 +708,25 @@ def generate_world(
             assign_zone_attributes=assign_zone_attributes,
             assign_link_attributes=assign_link_attributes,
             AI_START_TEMPLATE_ATTRS=None,          # or precomputed template
-            ai_difficulty_mode=ai_difficulty_mode
+            ai_difficulty_mode=ai_difficulty_mode,
+            rng=rng,
+            clone_orbits=clone_orbits,
+            overrides=overrides,
         )
+        world.clone_orbits = clone_orbits
 
-    assign_all_link_attributes(world)
+    lap("finalize_links")
+    assign_all_link_attributes(world, rng=rng)
     sanity_check_links(world)
+
+    if "world" in checks and _rejected(checks["world"], world, stats):
+        lap.done()
+        return None
+
+    # Move all attributes into columns; nodes/links keep dict-like views into the store
+    lap("store")
+    world.store = WorldStore.from_graph(world)
+    lap.done()
     return world
 
 def attach_ai_balanced(
@@ -591,7 +740,10 @@ def attach_ai_balanced(
     assign_zone_attributes,
     assign_link_attributes,
     AI_START_TEMPLATE_ATTRS=None,
-    ai_difficulty_mode='normal'
+    ai_difficulty_mode='normal',
+    rng=None,
+    clone_orbits=None,
+    overrides=None,
 ):
     """
     Attach AI players in a BALANCED map using precomputed symmetric connection points.
@@ -607,10 +759,15 @@ def attach_ai_balanced(
         - Embedded AIs: connect to both main & start according to a shared pattern.
         - Global AIs: connect only via main_conn_points.
     current_id: next free node id
-    assign_zone_attributes: function(Node) -> None
-    assign_link_attributes: function(Link) -> None
+    assign_zone_attributes: function(Node, rng=None, overrides=None) -> None
+    assign_link_attributes: function(Link, rng=None) -> None
     AI_START_TEMPLATE_ATTRS: optional dict with base START attributes (for AIs)
+    rng: generator context (random.Random), module-global random if None
+    clone_orbits: optional list; every block of embedded AIs is appended as one
+        tuple (the AI of player 1..N)
+    overrides: manual zone overrides passed on to assign_zone_attributes
     """
+    rng = resolve_rng(rng)
 
     if num_ai_players <= 0:
         return current_id
@@ -623,7 +780,7 @@ def attach_ai_balanced(
         m = "both"
 
     if m == "random":
-        m = random.choice(["main", "start", "both"])
+        m = rng.choice(["main", "start", "both"])
         print(f"[DEBUG] AI placement randomly selected mode = {m}")
 
     embedded_mode = m
@@ -641,7 +798,7 @@ def attach_ai_balanced(
     # Prepare AI START template attributes if not provided
     if AI_START_TEMPLATE_ATTRS is None:
         tmpl = Node(-1, node_type=NodeType.START, owner=None, is_start=True)
-        assign_zone_attributes(tmpl)
+        assign_zone_attributes(tmpl, rng=rng, overrides=overrides)
         AI_START_TEMPLATE_ATTRS = dict(tmpl.attributes)
 
     if num_ai_players < num_human_players:
@@ -653,7 +810,7 @@ def attach_ai_balanced(
         max_blocks = num_ai_players // num_human_players
         
         # Randomly choose 1..max_blocks with equal probability
-        num_blocks = random.randint(1, max_blocks)
+        num_blocks = rng.randint(1, max_blocks)
     
         embedded_count = num_blocks * num_human_players
         remaining_ais = num_ai_players - embedded_count
@@ -690,7 +847,7 @@ def attach_ai_balanced(
             else:  # embedded_mode == "both"
                 # Must include at least one of each
                 # total_links is 2 or 3
-                total_links = random.choice([2, 3])
+                total_links = rng.choice([2, 3])
 
                 possible_splits = []
                 for k_main_try in range(1, total_links):  # >=1 main, >=1 start
@@ -704,21 +861,21 @@ def attach_ai_balanced(
                     k_main = total_links
                     k_start = 0
                 else:
-                    k_main, k_start = random.choice(possible_splits)
+                    k_main, k_start = rng.choice(possible_splits)
 
             print(f"[DEBUG] Embedded AI mode={embedded_mode}, total_links={total_links}, "
                   f"k_main={k_main}, k_start={k_start}")
 
             print(f"[DEBUG] Embedded AIs: total_links={total_links}, k_main={k_main}, k_start={k_start}")
             # Pick indices ONCE (symmetric) for all embedded AIs
-            main_indices = random.sample(range(main_len), k=k_main) if k_main > 0 else []
-            start_indices = random.sample(range(start_len), k=k_start) if k_start > 0 else []
+            main_indices = rng.sample(range(main_len), k=k_main) if k_main > 0 else []
+            start_indices = rng.sample(range(start_len), k=k_start) if k_start > 0 else []
             print(f"[DEBUG] Embedded AIs main_indices={main_indices}, start_indices={start_indices}")
             # Precompute link attributes: one template per "slot" (combined main+start)
             EMBEDDED_LINK_ATTRS = []
             for _ in range(total_links):
                 dummy = Link(Node(-1), Node(-2))
-                assign_link_attributes(dummy)
+                assign_link_attributes(dummy, rng=rng)
                 EMBEDDED_LINK_ATTRS.append(dict(dummy.attributes))
             next_owner = num_human_players + 1
 
@@ -729,9 +886,9 @@ def attach_ai_balanced(
 
             for block in range(num_blocks):
                 if main_len > 0:
-                    block_main_choice[block] = random.randrange(main_len)
+                    block_main_choice[block] = rng.randrange(main_len)
                 if start_len > 0:
-                    block_start_choice[block] = random.randrange(start_len)
+                    block_start_choice[block] = rng.randrange(start_len)
 
 
             # Balanced Difficulty:
@@ -746,7 +903,7 @@ def attach_ai_balanced(
                 num_blocks = (embedded_count + num_human_players - 1) // num_human_players
                 for b in range(num_blocks):
                     embedded_difficulties.append(
-                        random.choice(['normal','hard','unfair'])
+                        rng.choice(['normal','hard','unfair'])
                     )
             else:
                 # All embedded AIs have same difficulty
@@ -767,7 +924,7 @@ def attach_ai_balanced(
                     is_start=True
                 )
                 current_id += 1
-                ai_node.attributes = dict(AI_START_TEMPLATE_ATTRS)
+                ai_node.attributes = clone_attributes(AI_START_TEMPLATE_ATTRS)
                 ai_node.attributes["player_control"] = ai_owner
 
                 # Apply difficulty settings
@@ -790,7 +947,7 @@ def attach_ai_balanced(
                     if connector_index < len(target_list):
                         target = target_list[connector_index]
                         link = ai_graph.add_link(ai_node, target)
-                        link.attributes = dict(EMBEDDED_LINK_ATTRS[attr_idx])
+                        link.attributes = clone_attributes(EMBEDDED_LINK_ATTRS[attr_idx])
                         attr_idx += 1
                 # START side
                 for _ in start_indices:  # idx not needed
@@ -803,7 +960,7 @@ def attach_ai_balanced(
                     if connector_index < len(target_list):
                         target = target_list[connector_index]
                         link = ai_graph.add_link(ai_node, target)
-                        link.attributes = dict(EMBEDDED_LINK_ATTRS[attr_idx])
+                        link.attributes = clone_attributes(EMBEDDED_LINK_ATTRS[attr_idx])
                         attr_idx += 1
                 world.merge(ai_graph)
                 embedded_ai_nodes.append(ai_node)
@@ -811,6 +968,10 @@ def attach_ai_balanced(
         # Adjust remaining AIs
         remaining_ais = num_ai_players - len(embedded_ai_nodes)
 
+        if clone_orbits is not None:
+            for start in range(0, len(embedded_ai_nodes), num_human_players):
+                clone_orbits.append(tuple(embedded_ai_nodes[start:start + num_human_players]))
+
     # ---------------------------------------------------------
     # GLOBAL AIs — main only, exactly num_human_players links
     # ---------------------------------------------------------
@@ -838,16 +999,16 @@ def attach_ai_balanced(
             current_id += 1
 
             global_ai_connection = Link(Node(-1, node_type=NodeType.START), Node(-2, node_type=NodeType.TREASURE))
-            assign_link_attributes(global_ai_connection)
+            assign_link_attributes(global_ai_connection, rng=rng)
 
             # Use template as base, then customize
             ai_node.attributes = dict(AI_START_TEMPLATE_ATTRS)
-            assign_zone_attributes(ai_node)
+            assign_zone_attributes(ai_node, rng=rng, overrides=overrides)
             ai_node.attributes["player_control"] = ai_owner
             
             # Set difficulty
             if ai_difficulty_mode == "random":
-                ai_difficulty = random.choice(['normal','hard','unfair'])
+                ai_difficulty = rng.choice(['normal','hard','unfair'])
             else:
                 ai_difficulty = ai_difficulty_mode
             print(f"[DEBUG] Global AI player {ai_node.owner} difficulty set to {ai_difficulty}")
@@ -858,7 +1019,7 @@ def attach_ai_balanced(
 
             # Choose ONE shared index into main_conn_points
             # GLOBAL AIs ALWAYS USE MAIN — start zones cannot be used symmetrically
-            chosen_idx = random.randrange(main_len)
+            chosen_idx = rng.randrange(main_len)
             print(f"[DEBUG] Global AI {ai_owner}: chosen main index {chosen_idx}")
 
             # Connect to each player's main fragment at that index
@@ -867,7 +1028,7 @@ def attach_ai_balanced(
                 if chosen_idx < len(targets):
                     target = targets[chosen_idx]
                     link = ai_graph.add_link(ai_node, target)
-                    link.attributes = global_ai_connection.attributes
+                    link.attributes = clone_attributes(global_ai_connection.attributes)
 
             world.merge(ai_graph)
 
@@ -1,29 +1,60 @@
-from enum import Enum, auto
+from collections import ChainMap
+from enum import IntEnum, auto
+
+from utils import instrumentation
 
 class AIDifficulty:
     NORMAL = "normal"
     HARD = "hard"
     UNFAIR = "unfair"
 
-class NodeType(Enum):
+class NodeType(IntEnum):
+    """Zone type; members are small ints (1-5) so they can be stored in compact arrays."""
     START = auto()
     NEUTRAL = auto()
     TREASURE = auto()
     SUPER_TREASURE = auto()
     JUNCTION = auto()
 
+    # keep the Enum style "NodeType.START" text in debug output
+    def __str__(self):
+        return f"{type(self).__name__}.{self.name}"
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+def clone_attributes(attributes):
+    """
+    Copy-on-write clone of an attribute mapping.
+
+    The clone shares the template's values and only stores its own overrides
+    (player_control, town_type_rules, ...), so cloning a zone is O(1) instead of
+    copying ~100 keys. Templates are fully generated before they are cloned and
+    must not be modified afterwards.
+    """
+    if isinstance(attributes, ChainMap):
+        # clone of a clone: copy only the overrides, keep sharing the base
+        return ChainMap(dict(attributes.maps[0]), *attributes.maps[1:])
+    return ChainMap({}, attributes)
+
 class Node:
+    # __slots__ keeps nodes small (no per-instance __dict__) - worlds are held in bulk during scoring
+    __slots__ = ("id", "node_type", "owner", "is_start", "links", "attributes")
+
     def __init__(self, node_id, node_type=None, owner=None, is_start=False):
         self.id = node_id
         self.node_type = node_type
         self.owner = owner
         self.is_start = is_start
+        # Kept for display/validation only: generation and merge go through the
+        # Graph pair index, and scoring/validation through models.csr integer arrays.
         self.links = []
         self.attributes = {}  # all generated values live here
 
     def add_link(self, link):
-        if link not in self.links:
-            self.links.append(link)
+        # Membership is decided by Graph.add_link through its pair index: it only
+        # registers links it has just created, once per endpoint - O(1), no scan.
+        self.links.append(link)
 
     def __repr__(self):
         type_name = self.node_type.name if self.node_type else "?"
@@ -31,6 +62,8 @@ class Node:
         return f"Node({self.id}, {type_name}{owner}{' (Start)' if self.is_start else ''})"
 
 class Link:
+    __slots__ = ("node_a", "node_b", "is_player_to_main", "attributes")
+
     def __init__(self, node_a, node_b, is_player_to_main=False):
         self.node_a = node_a
         self.node_b = node_b
@@ -44,21 +77,40 @@ class Link:
         return f"Link({self.node_a.id} <-> {self.node_b.id})"
 
 
+def _pair_key(node_a, node_b):
+    """Order-independent key for a node pair (by zone id)."""
+    a, b = node_a.id, node_b.id
+    return (a, b) if a <= b else (b, a)
+
+
 class Graph:
     def __init__(self):
         self.nodes = []
         self.links = []
+        # Persistent indexes, kept in sync by add_node/add_link/merge:
+        # node ids present in the graph, and (id_a, id_b) -> links between that pair (max 2)
+        self._node_ids = set()
+        self._pair_links = {}
+        # columnar attribute store (models.store.WorldStore), set once the world is complete
+        self.store = None
+        # balanced worlds: one tuple per cloned zone holding its copy for player 1..N
+        # (models.symmetry checks the world against this permutation)
+        self.clone_orbits = None
+
+    def _index_link(self, link):
+        self._pair_links.setdefault(_pair_key(link.node_a, link.node_b), []).append(link)
+
+    def links_between(self, node_a, node_b):
+        """Return the links between node_a and node_b (empty list if none)."""
+        return self._pair_links.get(_pair_key(node_a, node_b), [])
+
+    def link_count(self, node_a, node_b):
+        """Number of links between node_a and node_b."""
+        return len(self.links_between(node_a, node_b))
 
     def add_node(self, node):
         self.nodes.append(node)
-
-    #def add_link(self, node_a, node_b, is_player_to_main=False):
-    #    if not self.nodes_connected(node_a, node_b):
-    #        link = Link(node_a, node_b, is_player_to_main=is_player_to_main)
-    #        node_a.add_link(link)
-    #        node_b.add_link(link)
-    #        self.links.append(link)
-    #        return link
+        self._node_ids.add(node.id)
 
     # This fixes an issue if link already exists
     def add_link(self, node_a, node_b, is_player_to_main=False, allow_double=False):
@@ -67,12 +119,11 @@ class Graph:
         If allow_double=False, enforces only a single link.
         If allow_double=True, allows up to two links between the same nodes.
         """
-        # Count existing links between the pair
-        existing = [
-            link for link in self.links
-            if (link.node_a is node_a and link.node_b is node_b) or
-               (link.node_a is node_b and link.node_b is node_a)
-        ]
+        # Existing links between the pair (O(1) index lookup)
+        existing = self.links_between(node_a, node_b)
+        if instrumentation.recorder is not None:
+            instrumentation.recorder.count("graph.add_link")
+            instrumentation.recorder.count("graph.links_scanned", len(existing))
 
         # Only allow two total links max
         if not allow_double and existing:
@@ -81,50 +132,54 @@ class Graph:
         if allow_double and len(existing) >= 2:
             return existing[0]  # do not create a third
 
-        # Create a new link
+        # Create a new link - not in the pair index yet, so neither endpoint has it
         link = Link(node_a, node_b, is_player_to_main=is_player_to_main)
         node_a.add_link(link)
-        node_b.add_link(link)
+        if node_b is not node_a:    # a self-loop is registered once
+            node_b.add_link(link)
         self.links.append(link)
+        self._index_link(link)
         return link
 
     def nodes_connected(self, node_a, node_b):
-        return any(
-            (l.node_a == node_a and l.node_b == node_b)
-            or (l.node_a == node_b and l.node_b == node_a)
-            for l in self.links
-        )
+        return _pair_key(node_a, node_b) in self._pair_links
 
     def merge(self, other_graph):
-        """Merge another graph into this one, preserving up to double-links."""
-        existing_ids = {n.id for n in self.nodes}
+        """
+        Merge another graph into this one, preserving up to double-links.
+        Uses the persistent indexes, so the cost only depends on the size of other_graph.
+        """
+        node_ids = self._node_ids
+        if instrumentation.recorder is not None:
+            instrumentation.recorder.count("graph.merge")
+            instrumentation.recorder.count("graph.merge_links", len(other_graph.links))
 
         # Add nodes
         for node in other_graph.nodes:
-            if node.id not in existing_ids:
+            if node.id not in node_ids:
                 self.nodes.append(node)
-                existing_ids.add(node.id)
-
-        # Count existing links per node-pair
-        pair_counts = {}
-        for l in self.links:
-            key = tuple(sorted([l.node_a.id, l.node_b.id]))
-            pair_counts[key] = pair_counts.get(key, 0) + 1
+                node_ids.add(node.id)
 
         # Merge links (allow up to 2 links between same nodes)
+        pair_links = self._pair_links
         for link in other_graph.links:
-            key = tuple(sorted([link.node_a.id, link.node_b.id]))
+            key = _pair_key(link.node_a, link.node_b)
+            existing = pair_links.get(key)
 
-            count = pair_counts.get(key, 0)
-
-            if count < 2:
-                # Accept link
-                self.links.append(link)
-                pair_counts[key] = count + 1
+            if existing is None:
+                pair_links[key] = [link]
+            elif len(existing) < 2:
+                existing.append(link)
             else:
                 # already have 2 links → ignore extras
                 continue
-            
+            self.links.append(link)
+
+    def merge_many(self, graphs):
+        """Merge several graphs in order; total cost is O(sum of their sizes)."""
+        for g in graphs:
+            self.merge(g)
+
     def display(self):
         print(f"\nGraph with {len(self.nodes)} nodes and {len(self.links)} links:")
         for node in self.nodes:
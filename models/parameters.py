@@ -1,16 +1,49 @@
-import random
+import inspect
+from collections.abc import Mapping
 
 from config import MANUAL_OVERRIDES, RESOURCE_NAMES, ZONE_CONFIG
 from models.objects import NodeType
+from utils import instrumentation
 from utils.randomize import (
+    WeightedSampler,
     jitter,
     pick_random_subset,
     random_bool,
-    weighted_choice,
+    resolve_rng,
 )
 
-def resource_logic(node):
+def resolve_overrides(overrides=None):
+    """
+    Manual zone overrides (monster_disposition / joining_percent / join_only_for_money)
+    to apply: the caller's dict, or config.MANUAL_OVERRIDES if overrides is None.
+    Pass a dict per world (like rng) so concurrent generations don't share state.
+    """
+    return MANUAL_OVERRIDES if overrides is None else overrides
+
+# monster_disposition: 25% -> 1, 50% -> 2, 25% -> 3
+MONSTER_DISPOSITION = WeightedSampler.from_weights([0.25, 0.5, 0.25])
+
+# Treasure (low, high) value ranges and densities of levels 1-3 per effective zone type.
+# Shared by treasure_attributes and the batch path (models.batch_attributes).
+TREASURE_RANGES = {
+    NodeType.START: ((500, 3000), (4000, 9000), (10000, 16000)),
+    NodeType.NEUTRAL: ((500, 3000), (4000, 9000), (10000, 16000)),
+    NodeType.TREASURE: ((3000, 6000), (10000, 15000), (15000, 20000)),
+    NodeType.SUPER_TREASURE: ((10000, 15000), (15000, 20000), (20000, 30000)),
+}
+TREASURE_DENSITY = {
+    NodeType.START: (9, 6, 1),
+    NodeType.NEUTRAL: (9, 6, 1),
+    NodeType.TREASURE: (6, 8, 2),
+    NodeType.SUPER_TREASURE: (6, 8, 2),
+}
+# zones without a type
+_FALLBACK_TREASURE_RANGES = ((500, 3000), (3000, 6000), (10000, 15000))
+_FALLBACK_TREASURE_DENSITY = (9, 6, 1)
+
+def resource_logic(node, rng=None):
     """Generates *_min and *_density attributes for a given node."""
+    rng = resolve_rng(rng)
     res = {}
 
     # Default all to 0
@@ -26,8 +59,8 @@ def resource_logic(node):
         res["wood_min"] = 1
         res["ore_min"] = 1
         # 10% chance that exactly one special resource is 1
-        if random_bool(0.1):
-            special = random.choice(["mercury", "sulfur", "crystals", "gems"])
+        if random_bool(0.1, rng):
+            special = rng.choice(["mercury", "sulfur", "crystals", "gems"])
             res[f"{special}_min"] = 1
 
     # --- NEUTRAL zones ---
@@ -36,14 +69,14 @@ def resource_logic(node):
         if nc > 0:
             res["wood_min"] = res["ore_min"] = 1
         elif nt > 0:
-            if random_bool(0.5):
+            if random_bool(0.5, rng):
                 res["wood_min"] = res["ore_min"] = 1
         # 25% chance one of the rare resources is 1
-        if random_bool(0.25):
-            special = random.choice(["mercury", "sulfur", "crystals", "gems"])
+        if random_bool(0.25, rng):
+            special = rng.choice(["mercury", "sulfur", "crystals", "gems"])
             res[f"{special}_min"] = 1
         # gold 5%
-        if random_bool(0.05):
+        if random_bool(0.05, rng):
             res["gold_min"] = 1
 
     # --- TREASURE zones ---
@@ -52,14 +85,14 @@ def resource_logic(node):
         if nc > 0:
             res["wood_min"] = res["ore_min"] = 1
         elif nt > 0:
-            if random_bool(0.5):
+            if random_bool(0.5, rng):
                 res["wood_min"] = res["ore_min"] = 1
         # Each rare has 20% chance, max 2 total
-        subset = pick_random_subset(["mercury", "sulfur", "crystals", "gems"], 0.2, max_total=2)
+        subset = pick_random_subset(["mercury", "sulfur", "crystals", "gems"], 0.2, max_total=2, rng=rng)
         for k, v in subset.items():
             res[f"{k}_min"] = v
         # gold 10%
-        if random_bool(0.10):
+        if random_bool(0.10, rng):
             res["gold_min"] = 1
 
     # --- SUPER TREASURE zones ---
@@ -67,27 +100,27 @@ def resource_logic(node):
         if nc > 0:
             res["wood_min"] = res["ore_min"] = 1
         elif nt > 0:
-            if random_bool(0.5):
+            if random_bool(0.5, rng):
                 res["wood_min"] = res["ore_min"] = 1
         # Each rare 25%, no limit
-        subset = pick_random_subset(["mercury", "sulfur", "crystals", "gems"], 0.25)
+        subset = pick_random_subset(["mercury", "sulfur", "crystals", "gems"], 0.25, rng=rng)
         for k, v in subset.items():
             res[f"{k}_min"] = v
         # gold 20%
-        if random_bool(0.20):
+        if random_bool(0.20, rng):
             res["gold_min"] = 1
 
     # --- Junction / others (no resources) ---
     elif node.node_type == NodeType.JUNCTION:
         for r in ["mercury", "sulfur", "crystals", "gems", "gold"]:
-            if random_bool(0.1):
+            if random_bool(0.1, rng):
                 res[f"{r}_min"] = 1    
     else:
         pass
 
     return res
 
-def terrain_and_monster_attributes(node):
+def terrain_and_monster_attributes(node, rng=None):
     """Generate terrain- and monster-related attributes."""
     attrs = {}
 
@@ -98,7 +131,7 @@ def terrain_and_monster_attributes(node):
     if node.node_type == NodeType.START:
         attrs["terrain_match_town"] = 'x'
     elif nt > 0 or nc > 0:
-        attrs["terrain_match_town"] = 'x' if random_bool(0.8) else 0
+        attrs["terrain_match_town"] = 'x' if random_bool(0.8, rng) else 0
     else:
         attrs["terrain_match_town"] = 0
 
@@ -110,9 +143,9 @@ def terrain_and_monster_attributes(node):
     if node.node_type == NodeType.START or node.node_type == NodeType.NEUTRAL or node.node_type == NodeType.JUNCTION:
         attrs["monster_strength"] = 'avg'
     elif node.node_type == NodeType.TREASURE:
-        attrs["monster_strength"] = 'avg' if random_bool(0.8) else 'strong'
+        attrs["monster_strength"] = 'avg' if random_bool(0.8, rng) else 'strong'
     elif node.node_type == NodeType.SUPER_TREASURE:
-        attrs["monster_strength"] = 'avg' if random_bool(0.7) else 'strong'
+        attrs["monster_strength"] = 'avg' if random_bool(0.7, rng) else 'strong'
     else:
         attrs["monster_strength"] = 'none'  # fallback
 
@@ -120,7 +153,7 @@ def terrain_and_monster_attributes(node):
     if node.node_type == NodeType.START:
         attrs["monster_match_town"] = 0
     elif nt > 0 or nc > 0:
-        attrs["monster_match_town"] = 'x' if random_bool(0.1) else 0
+        attrs["monster_match_town"] = 'x' if random_bool(0.1, rng) else 0
     else:
         attrs["monster_match_town"] = 0
 
@@ -130,63 +163,26 @@ def terrain_and_monster_attributes(node):
 
     return attrs
 
-def treasure_attributes(node):
+def treasure_attributes(node, rng=None):
     """Generate treasure-related attributes for the zone."""
     attrs = {}
 
     # Determine effective type (JUNCTION uses NEUTRAL or TREASURE randomly)
     ntype = node.node_type
     if node.node_type == NodeType.JUNCTION:
-        ntype = NodeType.NEUTRAL if random_bool(0.5) else NodeType.TREASURE
-
-    # Base definitions per type
-    if ntype == NodeType.START or ntype == NodeType.NEUTRAL:
-        t1_low, t1_high = 500, 3000
-        t2_low, t2_high = 4000, 9000
-        t3_low, t3_high = 10000, 16000
-    elif ntype == NodeType.TREASURE:
-        t1_low, t1_high = 3000, 6000
-        t2_low, t2_high = 10000, 15000
-        t3_low, t3_high = 15000, 20000
-    elif ntype == NodeType.SUPER_TREASURE:
-        t1_low, t1_high = 10000, 15000
-        t2_low, t2_high = 15000, 20000
-        t3_low, t3_high = 20000, 30000
-    else:
-        # fallback — treat as neutral
-        t1_low, t1_high = 500, 3000
-        t2_low, t2_high = 3000, 6000
-        t3_low, t3_high = 10000, 15000
-
-    # Apply jitter ±10%
-    attrs["treasure1_low"] = jitter(t1_low)
-    attrs["treasure1_high"] = jitter(t1_high)
+        ntype = NodeType.NEUTRAL if random_bool(0.5, rng) else NodeType.TREASURE
 
-    attrs["treasure2_low"] = jitter(t2_low)
-    attrs["treasure2_high"] = jitter(t2_high)
+    ranges = TREASURE_RANGES.get(ntype, _FALLBACK_TREASURE_RANGES)
+    densities = TREASURE_DENSITY.get(ntype, _FALLBACK_TREASURE_DENSITY)
 
-    attrs["treasure3_low"] = jitter(t3_low)
-    attrs["treasure3_high"] = jitter(t3_high)
+    # Apply jitter ±10%
+    for level, (low, high) in enumerate(ranges, start=1):
+        attrs[f"treasure{level}_low"] = jitter(low, rng=rng)
+        attrs[f"treasure{level}_high"] = jitter(high, rng=rng)
 
     # Apply treasure density
-    
-    if ntype == NodeType.START or ntype == NodeType.NEUTRAL:
-        attrs["treasure1_density"] = 9
-        attrs["treasure2_density"] = 6
-        attrs["treasure3_density"] = 1
-    elif ntype == NodeType.TREASURE:
-        attrs["treasure1_density"] = 6
-        attrs["treasure2_density"] = 8
-        attrs["treasure3_density"] = 2
-    elif ntype == NodeType.SUPER_TREASURE:
-        attrs["treasure1_density"] = 6
-        attrs["treasure2_density"] = 8
-        attrs["treasure3_density"] = 2
-    else:
-        # fallback — treat as neutral
-        attrs["treasure1_density"] = 9
-        attrs["treasure2_density"] = 6
-        attrs["treasure3_density"] = 1
+    for level, density in enumerate(densities, start=1):
+        attrs[f"treasure{level}_density"] = density
 
     # Fixed attributes
     attrs["zone_placement"] = ""     # other posible values: ground, underground
@@ -199,8 +195,9 @@ def treasure_attributes(node):
 
     return attrs
 
-def meta_zone_attributes(node):
+def meta_zone_attributes(node, rng=None, overrides=None):
     """Generate final batch of meta/control attributes for the zone."""
+    overrides = resolve_overrides(overrides)
     attrs = {}
 
     # ─── UI positions (4 placeholders, can be ±float, set to empty now)
@@ -217,33 +214,33 @@ def meta_zone_attributes(node):
     attrs["zone_faction_rule"] = ""
 
     # ─── allow_non_coherent_road ───
-    attrs["allow_non_coherent_road"] = "" if random_bool(0.75) else "x"
+    attrs["allow_non_coherent_road"] = "" if random_bool(0.75, rng) else "x"
 
     # ─── monster_disposition ───
-    if MANUAL_OVERRIDES.get("monster_disposition") is not None:
-        attrs["monster_disposition"] = MANUAL_OVERRIDES["monster_disposition"]
+    if overrides.get("monster_disposition") is not None:
+        attrs["monster_disposition"] = overrides["monster_disposition"]
     else:
         # 25% → 1, 50% → 2, 25% → 3
-        attrs["monster_disposition"] = weighted_choice([0.25, 0.5, 0.25])
+        attrs["monster_disposition"] = MONSTER_DISPOSITION.draw(rng)
 
     # ─── custom_monster_disposition ───
     attrs["custom_monster_disposition"] = ""
 
     # ─── joining_percent ───
-    if MANUAL_OVERRIDES.get("joining_percent") is not None:
-        attrs["joining_percent"] = MANUAL_OVERRIDES["joining_percent"]
+    if overrides.get("joining_percent") is not None:
+        attrs["joining_percent"] = overrides["joining_percent"]
     else:
         attrs["joining_percent"] = 1
 
     # ─── join_only_for_money ───
-    if MANUAL_OVERRIDES.get("join_only_for_money") is not None:
-        attrs["join_only_for_money"] = MANUAL_OVERRIDES["join_only_for_money"]
+    if overrides.get("join_only_for_money") is not None:
+        attrs["join_only_for_money"] = overrides["join_only_for_money"]
     else:
         attrs["join_only_for_money"] = "x"
 
     # ─── shipyard_min ───
     if node.node_type == NodeType.SUPER_TREASURE:
-        attrs["shipyard_min"] = 1 if random_bool(0.1) else ""
+        attrs["shipyard_min"] = 1 if random_bool(0.1, rng) else ""
     else:
         attrs["shipyard_min"] = ""
 
@@ -252,25 +249,78 @@ def meta_zone_attributes(node):
 
     return attrs
 
-def assign_zone_attributes(node):
-    config = ZONE_CONFIG.get(node.node_type, {})
-    for key, value in config.items():
-        if callable(value):
-            try:
-                node.attributes[key] = value(node)
-            except TypeError:
-                node.attributes[key] = value()
-        else:
-            node.attributes[key] = value
+# ──────────────────────────────────────────────
+# Compiled ZONE_CONFIG
+# ──────────────────────────────────────────────
+# Each NodeType's config is compiled once into a plan: the constants as one
+# prebuilt dict and the callables with their arity resolved up front, so
+# applying it is a dict update plus the dynamic draws (in config order, so the
+# random stream is unchanged).
+
+class ZonePlan:
+    __slots__ = ("constants", "dynamic")
+
+    def __init__(self, constants, dynamic):
+        self.constants = constants    # {key: value}
+        self.dynamic = dynamic        # [(key, func, takes_node)]
+
+
+def _takes_node(key, func):
+    """True for (node, rng) callables, False for (rng) ones."""
+    params = [
+        p for p in inspect.signature(func).parameters.values()
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty
+    ]
+    if len(params) == 2:
+        return True
+    if len(params) == 1:
+        return False
+    raise TypeError(f"ZONE_CONFIG['{key}'] must take (rng) or (node, rng), got {len(params)} arguments")
+
+
+def compile_zone_plans(config=ZONE_CONFIG):
+    """Compile {NodeType: {key: constant or callable}} into {NodeType: ZonePlan}."""
+    plans = {}
+    for node_type, entries in config.items():
+        constants = {}
+        dynamic = []
+        for key, value in entries.items():
+            if callable(value):
+                dynamic.append((key, value, _takes_node(key, value)))
+            else:
+                constants[key] = value
+        plans[node_type] = ZonePlan(constants, dynamic)
+    return plans
+
+
+ZONE_PLANS = compile_zone_plans()
+_EMPTY_PLAN = ZonePlan({}, [])
+
+def refresh_zone_plans():
+    """Recompile ZONE_PLANS after ZONE_CONFIG was changed at runtime."""
+    ZONE_PLANS.clear()
+    ZONE_PLANS.update(compile_zone_plans())
+
+
+@instrumentation.timed("assign_zone_attributes")
+def assign_zone_attributes(node, rng=None, overrides=None):
+    rng = resolve_rng(rng)
+    plan = ZONE_PLANS.get(node.node_type, _EMPTY_PLAN)
+    attrs = node.attributes
+    attrs.update(plan.constants)
+    for key, func, takes_node in plan.dynamic:
+        attrs[key] = func(node, rng) if takes_node else func(rng)
+    if instrumentation.recorder is not None:
+        instrumentation.recorder.count("zone_config.calls", len(plan.dynamic))
 
     # generate mines
-    node.attributes.update(resource_logic(node))
+    node.attributes.update(resource_logic(node, rng))
     # generate terrain and monsters
-    node.attributes.update(terrain_and_monster_attributes(node))
+    node.attributes.update(terrain_and_monster_attributes(node, rng))
     # generate treasure
-    node.attributes.update(treasure_attributes(node))
+    node.attributes.update(treasure_attributes(node, rng))
     # misc parameters
-    node.attributes.update(meta_zone_attributes(node))
+    node.attributes.update(meta_zone_attributes(node, rng, overrides))
 
 def apply_ai_difficulty(node, difficulty):
     """
@@ -301,7 +351,7 @@ def apply_ai_difficulty(node, difficulty):
         attrs["monster_match_town"] = 1
 
 
-def assign_all_link_attributes(graph):
+def assign_all_link_attributes(graph, rng=None):
     """
     Assign attributes for every link in a graph.
     Honors pre-marked player→main links.
@@ -310,13 +360,15 @@ def assign_all_link_attributes(graph):
         # skip links that already have attributes - they are either player zones or set manualy. Should not be overwritten
         if link.attributes:
             continue
-        assign_link_attributes(link, is_player_to_main=link.is_player_to_main)
+        assign_link_attributes(link, is_player_to_main=link.is_player_to_main, rng=rng)
 
-def assign_link_attributes(link, is_player_to_main=False):
+@instrumentation.timed("assign_link_attributes")
+def assign_link_attributes(link, is_player_to_main=False, rng=None):
     """
     Assign parameters to a link based on connected zone types and game rules.
     If `is_player_to_main` is True, this link connects player start area to the main map.
     """
+    rng = resolve_rng(rng)
 
     a, b = link.node_a, link.node_b
     a_type = a.node_type
@@ -335,13 +387,13 @@ def assign_link_attributes(link, is_player_to_main=False):
         # Determine the "other" node type
         other_type = b_type if a_type == NodeType.START else a_type
         if other_type in (NodeType.NEUTRAL, NodeType.JUNCTION):
-            guard_strength = random.randint(3000, 4000)
+            guard_strength = rng.randint(3000, 4000)
         elif other_type == NodeType.TREASURE:
-            guard_strength = random.randint(5000, 7000)
+            guard_strength = rng.randint(5000, 7000)
         elif other_type == NodeType.SUPER_TREASURE:
-            guard_strength = random.randint(8000, 12000)
+            guard_strength = rng.randint(8000, 12000)
         else:
-            guard_strength = random.randint(2500, 3500)
+            guard_strength = rng.randint(2500, 3500)
 
     # All other (non-start) combinations
     else:
@@ -369,11 +421,11 @@ def assign_link_attributes(link, is_player_to_main=False):
             return (2000, 4000)
 
         low, high = strength_range(a_type, b_type)
-        guard_strength = random.randint(low, high)
+        guard_strength = rng.randint(low, high)
 
     # Add bonus for connection to main world
     if is_player_to_main:
-        guard_strength += random.randint(3000, 6000)
+        guard_strength += rng.randint(3000, 6000)
 
     # Cap at 25 000
     attrs["guard_strength"] = min(guard_strength, 25000)
@@ -386,7 +438,7 @@ def assign_link_attributes(link, is_player_to_main=False):
     if NodeType.SUPER_TREASURE in types:
         attrs["connection_type_wide"] = ""
     else:
-        attrs["connection_type_wide"] = "" if random.random() < 0.9 else "1"
+        attrs["connection_type_wide"] = "" if rng.random() < 0.9 else "1"
 
     # ───────────────────────────────
     # CONNECTION TYPE: BORDERGUARD
@@ -399,7 +451,7 @@ def assign_link_attributes(link, is_player_to_main=False):
     if NodeType.START in types:
         attrs["roads"] = "+"
     else:
-        attrs["roads"] = "+" if random.random() < 0.75 else "-"
+        attrs["roads"] = "+" if rng.random() < 0.75 else "-"
 
     # ───────────────────────────────
     # PLACEMENT HINT
@@ -414,7 +466,7 @@ def assign_link_attributes(link, is_player_to_main=False):
     # ───────────────────────────────
     # MONOLITH REPULSION
     # ───────────────────────────────
-    attrs["monolith_repulsion"] = 1 if random.random() < 0.2 else ""
+    attrs["monolith_repulsion"] = 1 if rng.random() < 0.2 else ""
 
     # ───────────────────────────────
     # PLAYER LIMITS
@@ -438,7 +490,7 @@ def sanity_check_links(graph):
 
     for link in graph.links:
         attrs = getattr(link, "attributes", None)
-        if not attrs or not isinstance(attrs, dict) or not attrs:
+        if not attrs or not isinstance(attrs, Mapping):
             missing_attrs.append(link)
             continue
 
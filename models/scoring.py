@@ -0,0 +1,117 @@
+import math
+
+from models.csr import CSRGraph, attribute_column
+from models.objects import NodeType
+
+# ──────────────────────────────────────────────
+# Fairness scoring
+# ──────────────────────────────────────────────
+# score_world() runs one Dijkstra per START zone over the world's CSR snapshot
+# (models.csr, link cost = guard_strength + HOP_COST) and compares the players:
+#
+#   treasure_dist / super_dist  - cost to the nearest TREASURE / SUPER_TREASURE zone
+#   opponent_dist               - cost to the nearest other START zone
+#   reward                      - zone rewards discounted by distance, summed
+#   territory                   - reward of the zones this START reaches first
+#
+# For every metric the fairness block holds min / max / spread (max - min) and
+# ratio (min / max, 1.0 = perfectly even). `score` is the worst ratio.
+
+HOP_COST = 1000             # added to every link, so unguarded links still count as a step
+REWARD_DISTANCE = 20000     # reward halves at this path cost
+
+# Reward weight per zone type, multiplied by the zone's treasure value
+TYPE_WEIGHTS = {
+    NodeType.START: 0.0,
+    NodeType.NEUTRAL: 0.5,
+    NodeType.JUNCTION: 0.5,
+    NodeType.TREASURE: 1.0,
+    NodeType.SUPER_TREASURE: 1.5,
+}
+TREASURE_TIERS = (1, 2, 3)
+TREASURE_UNIT = 100000      # treasure value scale (a typical NEUTRAL zone is ~0.5-1)
+
+METRICS = ("treasure_dist", "super_dist", "opponent_dist", "reward", "territory")
+
+
+def treasure_values(world):
+    """Per zone: sum over the 3 treasure tiers of density * mean(low, high), scaled by TREASURE_UNIT."""
+    values = [0.0] * len(world.nodes)
+    for tier in TREASURE_TIERS:
+        lows = attribute_column(world, "zones", f"treasure{tier}_low")
+        highs = attribute_column(world, "zones", f"treasure{tier}_high")
+        densities = attribute_column(world, "zones", f"treasure{tier}_density")
+        for i, (low, high, density) in enumerate(zip(lows, highs, densities)):
+            if density:
+                values[i] += density * ((low or 0) + (high or 0)) / 2
+    return [v / TREASURE_UNIT for v in values]
+
+
+def _spread(values):
+    lo, hi = min(values), max(values)
+    if hi == math.inf:
+        ratio = 1.0 if lo == math.inf else 0.0
+    else:
+        ratio = lo / hi if hi else 1.0
+    # all equal (also all inf, where hi - lo would be nan): no spread
+    spread = 0 if lo == hi else hi - lo
+    return {"min": lo, "max": hi, "spread": spread, "ratio": round(ratio, 4)}
+
+
+def score_world(world, csr=None):
+    """
+    Per-player shortest-path metrics and fairness summary of a world:
+    {"players": {player: {metric: value}}, "fairness": {metric: {min, max, spread, ratio}}, "score": worst ratio}
+    Players are the START zones (keyed by owner, or zone id if unowned).
+    csr: an existing CSRGraph snapshot of `world` to reuse.
+    """
+    if csr is None:
+        csr = CSRGraph.from_graph(world)
+    nodes = csr.nodes
+    costs = csr.edge_costs(HOP_COST)
+    types = csr.node_types
+    rewards = [v * TYPE_WEIGHTS.get(t, 0.0) for v, t in zip(treasure_values(world), types)]
+
+    starts = [i for i, t in enumerate(types) if t == NodeType.START]
+    treasure = [i for i, t in enumerate(types) if t == NodeType.TREASURE]
+    supers = [i for i, t in enumerate(types) if t == NodeType.SUPER_TREASURE]
+    rewarding = [i for i, r in enumerate(rewards) if r]
+
+    distances = [csr.dijkstra(s, costs) for s in starts]
+
+    # Territory: every zone counts for the START reaching it first (ties split)
+    territory = [0.0] * len(starts)
+    for i in rewarding:
+        best = min(d[i] for d in distances)
+        if best == math.inf:
+            continue
+        owners = [k for k, d in enumerate(distances) if d[i] == best]
+        for k in owners:
+            territory[k] += rewards[i] / len(owners)
+
+    players = {}
+    for k, (s, dist) in enumerate(zip(starts, distances)):
+        node = nodes[s]
+        players[node.owner or node.id] = {
+            "zone": node.id,
+            "treasure_dist": min((dist[i] for i in treasure), default=math.inf),
+            "super_dist": min((dist[i] for i in supers), default=math.inf),
+            "opponent_dist": min((dist[i] for i in starts if i != s), default=math.inf),
+            "reward": round(sum(rewards[i] / (1 + dist[i] / REWARD_DISTANCE) for i in rewarding), 4),
+            "territory": round(territory[k], 4),
+        }
+
+    fairness = {}
+    if len(players) > 1:
+        for metric in METRICS:
+            values = [p[metric] for p in players.values()]
+            if metric in ("treasure_dist", "super_dist") and all(v == math.inf for v in values):
+                continue    # no zone of that type - nothing to compare
+            fairness[metric] = _spread(values)
+    score = min((f["ratio"] for f in fairness.values()), default=1.0)
+    return {"players": players, "fairness": fairness, "score": score}
+
+
+def fairness_score(world):
+    """Worst min/max ratio over all metrics (1.0 = every player equally well off)."""
+    return score_world(world)["score"]
@@ -0,0 +1,184 @@
+from collections.abc import MutableMapping
+
+from config import LINK_FIELDS, ZONE_FIELDS
+
+# Marks a schema field that was never set on a row (export writes it as an empty column)
+_MISSING = object()
+
+
+def format_value(value):
+    """h3t cell text: None/0/missing -> empty column, everything else str()."""
+    if value is _MISSING or value is None or value == 0:
+        return ""
+    return str(value)
+
+
+class AttributeStore:
+    """
+    Columnar attribute storage for one kind of record (zones or links) of a world.
+
+    One list per schema field (ZONE_FIELDS / LINK_FIELDS), indexed by row.
+    Keys outside the schema (e.g. potential_connection_main) live in a per-row
+    dict. Repeated strings ('x', '', '+', ...) are interned so every row shares
+    one object.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.field_index = {f: i for i, f in enumerate(self.fields)}
+        self.columns = [[] for _ in self.fields]
+        self.extras = []        # row -> dict of non-schema keys (or None)
+        self._strings = {}
+
+    def __len__(self):
+        return len(self.extras)
+
+    def intern(self, value):
+        if type(value) is str:
+            return self._strings.setdefault(value, value)
+        return value
+
+    def append(self, attributes):
+        """Add a row copied from an attribute mapping, return its row index."""
+        row = len(self.extras)
+        field_index = self.field_index
+        columns = self.columns
+        for col in columns:
+            col.append(_MISSING)
+        extras = None
+        for key, value in attributes.items():
+            idx = field_index.get(key)
+            if idx is None:
+                if extras is None:
+                    extras = {}
+                extras[key] = value
+            else:
+                columns[idx][row] = self.intern(value)
+        self.extras.append(extras)
+        return row
+
+    def column(self, field):
+        """Raw values of one field for all rows (missing values as None)."""
+        return [None if v is _MISSING else v for v in self.columns[self.field_index[field]]]
+
+    def formatted_column(self, field, start=0, stop=None, formatter=format_value):
+        """h3t cell text of one field for rows[start:stop]."""
+        cache = {}
+        out = []
+        for v in self.columns[self.field_index[field]][start:stop]:
+            # values are hashable scalars, so identical values are formatted once
+            # (keyed by type too, so that True and 1 stay distinct)
+            key = (v.__class__, v)
+            text = cache.get(key)
+            if text is None:
+                text = cache[key] = formatter(v)
+            out.append(text)
+        return out
+
+    def view(self, row):
+        return RowView(self, row)
+
+
+class RowView(MutableMapping):
+    """Dict-like view of one row of an AttributeStore (used as Node/Link.attributes)."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key):
+        store = self._store
+        idx = store.field_index.get(key)
+        if idx is not None:
+            value = store.columns[idx][self._row]
+            if value is not _MISSING:
+                return value
+        else:
+            extras = store.extras[self._row]
+            if extras is not None and key in extras:
+                return extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        store = self._store
+        idx = store.field_index.get(key)
+        if idx is not None:
+            store.columns[idx][self._row] = store.intern(value)
+        else:
+            extras = store.extras[self._row]
+            if extras is None:
+                extras = store.extras[self._row] = {}
+            extras[key] = value
+
+    def __delitem__(self, key):
+        store = self._store
+        idx = store.field_index.get(key)
+        if idx is not None:
+            if store.columns[idx][self._row] is _MISSING:
+                raise KeyError(key)
+            store.columns[idx][self._row] = _MISSING
+        else:
+            extras = store.extras[self._row]
+            if extras is None or key not in extras:
+                raise KeyError(key)
+            del extras[key]
+
+    def __iter__(self):
+        store = self._store
+        row = self._row
+        for field, col in zip(store.fields, store.columns):
+            if col[row] is not _MISSING:
+                yield field
+        extras = store.extras[row]
+        if extras:
+            yield from extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"RowView({dict(self)!r})"
+
+
+class WorldStore:
+    """Zone and link attribute stores of one world, rows in world.nodes / world.links order."""
+
+    def __init__(self):
+        self.zones = AttributeStore(ZONE_FIELDS)
+        self.links = AttributeStore(LINK_FIELDS)
+
+    @classmethod
+    def from_graph(cls, graph, bind=True):
+        """
+        Copy all zone/link attributes of `graph` into columns.
+        With bind=True every Node/Link.attributes is replaced by a view into the store.
+        """
+        store = cls()
+        for node in graph.nodes:
+            row = store.zones.append(node.attributes)
+            if bind:
+                node.attributes = store.zones.view(row)
+        for link in graph.links:
+            row = store.links.append(link.attributes)
+            if bind:
+                link.attributes = store.links.view(row)
+        return store
+
+    def matches(self, graph):
+        """
+        True if the store rows still line up with graph.nodes / graph.links:
+        every attributes object is still the view of its own row (nothing was
+        reordered, added, removed or given a new attributes dict).
+        """
+        return _rows_bound(self.zones, graph.nodes) and _rows_bound(self.links, graph.links)
+
+
+def _rows_bound(store, items):
+    if len(store) != len(items):
+        return False
+    for row, item in enumerate(items):
+        view = item.attributes
+        if view.__class__ is not RowView or view._store is not store or view._row != row:
+            return False
+    return True
@@ -0,0 +1,111 @@
+from collections import Counter
+
+from config import LINK_FIELDS, ZONE_FIELDS
+from models.validation import ERROR, Issue, WorldValidationError
+
+# ──────────────────────────────────────────────
+# Balanced map symmetry
+# ──────────────────────────────────────────────
+# A balanced world records world.clone_orbits: one tuple per cloned zone
+# (start area, main fragment, embedded AI) holding its copy for player 1..N.
+# The world is symmetric if shifting every orbit by one player (1 -> 2 -> ...
+# -> N -> 1, zones outside the orbits stay put) maps it onto itself: same zone
+# types and exported zone attributes within each orbit, and the same multiset
+# of links with the same exported link attributes. The cyclic shift generates
+# every player rotation, so checking it once covers all of them.
+# Cost: O(zones + links).
+
+# Exported fields that legitimately differ per player
+PER_PLAYER_FIELDS = frozenset({"player_control", "town_type_rules"})
+_ZONE_FIELDS = tuple(f for f in ZONE_FIELDS if f not in PER_PLAYER_FIELDS)
+
+MAX_REPORTED = 5    # asymmetric links reported individually
+
+
+def _zone_signature(node):
+    attrs = node.attributes
+    return (node.node_type, node.is_start) + tuple(attrs.get(f) for f in _ZONE_FIELDS)
+
+
+def _link_signature(link):
+    attrs = link.attributes
+    return tuple(attrs.get(f) for f in LINK_FIELDS)
+
+
+def _link_key(id_a, id_b, signature):
+    return ((id_a, id_b) if id_a <= id_b else (id_b, id_a)) + signature
+
+
+def check_symmetry(world):
+    """
+    Check a balanced world against its clone orbits. Returns a list of Issues
+    (empty if symmetric or if the world has no clone_orbits, e.g. random style).
+    """
+    orbits = world.clone_orbits
+    if not orbits:
+        return []
+    issues = []
+    players = len(orbits[0])
+    present = {id(n) for n in world.nodes}
+
+    # ─── Zones: every orbit complete, in the world, identical signature ───
+    shift = {}      # id(node) -> zone id of the same zone for the next player
+    for orbit in orbits:
+        if len(orbit) != players:
+            issues.append(Issue(
+                "orbit_size", ERROR,
+                f"zones {[n.id for n in orbit]} form an orbit of {len(orbit)}, expected {players} players",
+                [n.id for n in orbit]
+            ))
+            continue
+        missing = [n.id for n in orbit if id(n) not in present]
+        if missing:
+            issues.append(Issue("orbit_zone_missing", ERROR, f"cloned zone(s) {missing} are not in the world", missing))
+            continue
+        reference = _zone_signature(orbit[0])
+        for node in orbit[1:]:
+            if _zone_signature(node) != reference:
+                issues.append(Issue(
+                    "zone_asymmetry", ERROR,
+                    f"zone {node.id} differs from its player 1 counterpart {orbit[0].id}", [orbit[0].id, node.id]
+                ))
+        for p, node in enumerate(orbit):
+            shift[id(node)] = orbit[(p + 1) % players].id
+
+    if players < 2:
+        return issues
+
+    # ─── Links: the shifted link multiset equals the original one ───
+    original = Counter()
+    shifted = Counter()
+    for link in world.links:
+        a, b = link.node_a, link.node_b
+        signature = _link_signature(link)
+        original[_link_key(a.id, b.id, signature)] += 1
+        shifted[_link_key(shift.get(id(a), a.id), shift.get(id(b), b.id), signature)] += 1
+
+    if original != shifted:
+        # both multisets have one entry per link, so some original link is always unmatched
+        lacking = list((original - shifted).elements())
+        for key in lacking[:MAX_REPORTED]:
+            issues.append(Issue(
+                "link_asymmetry", ERROR,
+                f"link {key[0]}-{key[1]} has no counterpart for the next player", key[:2]
+            ))
+        if len(lacking) > MAX_REPORTED:
+            issues.append(Issue(
+                "link_asymmetry", ERROR, f"{len(lacking)} links differ under the player rotation", ()
+            ))
+    return issues
+
+
+def is_symmetric(world):
+    return not check_symmetry(world)
+
+
+def check_balanced(world):
+    """Raise WorldValidationError if a balanced world is not symmetric; returns the issues otherwise."""
+    issues = check_symmetry(world)
+    if issues:
+        raise WorldValidationError(issues)
+    return issues
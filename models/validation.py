@@ -0,0 +1,153 @@
+from collections import Counter
+
+from models.csr import CSRGraph
+
+# ──────────────────────────────────────────────
+# Structural validation
+# ──────────────────────────────────────────────
+# validate_world() runs all checks in O(nodes + links) over the world's CSR
+# snapshot (models.csr: components for connectivity, link end indexes for the
+# link checks) and returns a list of Issues instead of printing, so callers
+# (batch, server) can reject a world.
+
+ERROR = "error"
+WARNING = "warning"
+
+MAX_LINKS_PER_PAIR = 2
+
+
+class Issue:
+    """One validation finding: code (machine readable), severity, message and the zone ids involved."""
+    __slots__ = ("code", "severity", "message", "nodes")
+
+    def __init__(self, code, severity, message, nodes=()):
+        self.code = code
+        self.severity = severity
+        self.message = message
+        self.nodes = tuple(nodes)
+
+    def as_dict(self):
+        return {"code": self.code, "severity": self.severity, "message": self.message, "nodes": list(self.nodes)}
+
+    def __repr__(self):
+        return f"Issue({self.severity}: {self.code} - {self.message})"
+
+
+class WorldValidationError(ValueError):
+    """Raised when a world has validation errors; .issues holds all findings."""
+
+    def __init__(self, issues):
+        self.issues = issues
+        errors = [i for i in issues if i.severity == ERROR]
+        summary = "; ".join(i.message for i in errors[:3])
+        more = f" (+{len(errors) - 3} more)" if len(errors) > 3 else ""
+        super().__init__(f"world failed validation: {summary}{more}")
+
+
+def _is_main_zone(node):
+    """Main area = zones without an owner (main graph / balanced fragments / central zone)."""
+    return node.owner is None and not node.is_start
+
+
+def validate_world(world, csr=None):
+    """
+    Check the structure of a generated (or parsed) world. Returns a list of Issues:
+
+    errors:   duplicate_node_id, dangling_link, too_many_links, disconnected,
+              start_unreachable, no_start
+    warnings: self_loop, missing_link_attributes, stray_node_link
+
+    csr: an existing CSRGraph snapshot of `world` to reuse.
+    """
+    issues = []
+    if csr is None:
+        csr = CSRGraph.from_graph(world)
+    nodes, links = csr.nodes, world.links
+
+    # ─── Nodes: duplicate ids ───
+    counts = Counter(n.id for n in nodes)
+    for node_id, count in counts.items():
+        if count > 1:
+            issues.append(Issue("duplicate_node_id", ERROR, f"zone id {node_id} is used by {count} zones", [node_id]))
+
+    # ─── Links: dangling ends, self-loops, pair limit, attributes ───
+    for row in csr.dangling:
+        a, b = links[row].node_a, links[row].node_b
+        missing = [n.id for n, i in zip((a, b), csr.link_ends[row]) if i < 0]
+        issues.append(Issue(
+            "dangling_link", ERROR,
+            f"link {a.id}-{b.id} refers to zone(s) {missing} that are not part of the world", [a.id, b.id]
+        ))
+    for row in csr.self_loops:
+        # the generator links a lone main zone to itself - allowed, but worth reporting
+        node_id = links[row].node_a.id
+        issues.append(Issue("self_loop", WARNING, f"zone {node_id} is linked to itself", [node_id]))
+
+    skipped = set(csr.dangling)
+    skipped.update(csr.self_loops)
+    pair_counts = Counter()
+    for row, (a, b) in enumerate(csr.link_ends):
+        if row in skipped:
+            continue
+        key = (a, b) if a <= b else (b, a)
+        pair_counts[key] += 1
+        if not links[row].attributes:
+            ids = (nodes[key[0]].id, nodes[key[1]].id)
+            issues.append(Issue("missing_link_attributes", WARNING, f"link {ids[0]}-{ids[1]} has no attributes", ids))
+
+    for (a, b), count in pair_counts.items():
+        if count > MAX_LINKS_PER_PAIR:
+            ids = (nodes[a].id, nodes[b].id)
+            issues.append(Issue(
+                "too_many_links", ERROR,
+                f"zones {ids[0]} and {ids[1]} have {count} links (max {MAX_LINKS_PER_PAIR})", ids
+            ))
+
+    # Links attached to nodes but not registered in the world (e.g. dropped by merge)
+    link_objects = {id(link) for link in links}
+    for node in nodes:
+        for link in node.links:
+            if id(link) not in link_objects:
+                issues.append(Issue(
+                    "stray_node_link", WARNING,
+                    f"zone {node.id} holds link {link.node_a.id}-{link.node_b.id} that is not in the world", [node.id]
+                ))
+
+    # ─── Connectivity ───
+    count, labels = csr.components()
+    if count > 1:
+        sizes = Counter(labels)
+        smallest = min(sizes, key=sizes.get)
+        issues.append(Issue(
+            "disconnected", ERROR,
+            f"world has {count} disconnected parts (sizes {sorted(sizes.values(), reverse=True)})",
+            sorted(nodes[i].id for i, label in enumerate(labels) if label == smallest)
+        ))
+
+    starts = csr.starts()
+    if not starts:
+        issues.append(Issue("no_start", ERROR, "world has no START zone"))
+
+    main_labels = {labels[i] for i, n in enumerate(nodes) if _is_main_zone(n)}
+    if main_labels:
+        for i in starts:
+            if labels[i] not in main_labels:
+                node = nodes[i]
+                issues.append(Issue(
+                    "start_unreachable", ERROR,
+                    f"START zone {node.id} (player {node.owner}) cannot reach the main area", [node.id]
+                ))
+
+    return issues
+
+
+def errors(issues):
+    return [i for i in issues if i.severity == ERROR]
+
+
+def check_world(world):
+    """Validate and raise WorldValidationError if there are errors; returns the (warning) issues otherwise."""
+    issues = validate_world(world)
+    if errors(issues):
+        raise WorldValidationError(issues)
+    return issues
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# The modules import each other as top-level packages (models, utils, config)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def _repo_root(monkeypatch):
+    # h3t_source.h3t is looked up in the working directory
+    monkeypatch.chdir(ROOT)
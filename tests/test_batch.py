@@ -0,0 +1,101 @@
+import os
+
+from models.objects import NodeType
+from utils import batch as batch_module
+from utils.batch import run_batch
+from utils.h3t_reader import read_h3t
+
+PARAMS = {"human_players": 2, "ai_players": 2, "map_style": "balanced", "ai_placement": "random"}
+
+
+def _contents(paths):
+    result = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            result[os.path.basename(path)] = f.read()
+    return result
+
+
+def test_same_seed_same_files_for_any_worker_count(tmp_path):
+    one = run_batch(PARAMS, 6, tmp_path / "one", seed=11, workers=1)
+    three = run_batch(PARAMS, 6, tmp_path / "three", seed=11, workers=3)
+    assert len(one) == 6
+    assert _contents(one) == _contents(three)
+
+
+def test_different_seed_different_files(tmp_path):
+    a = run_batch(PARAMS, 2, tmp_path / "a", seed=1, workers=1)
+    b = run_batch(PARAMS, 2, tmp_path / "b", seed=2, workers=1)
+    assert set(_contents(a).values()).isdisjoint(_contents(b).values())
+
+
+def test_dedupe_keeps_the_same_files_for_any_worker_count(tmp_path, monkeypatch):
+    _few_fingerprints(monkeypatch)
+    one = run_batch({"ai_players": 0}, 12, tmp_path / "one", seed=5, workers=1, dedupe=True)
+    four = run_batch({"ai_players": 0}, 12, tmp_path / "four", seed=5, workers=4, dedupe=True, dedupe_capacity=100)
+    assert 1 <= len(one) <= 3
+    assert _contents(one) == _contents(four)
+    assert sorted(os.listdir(tmp_path / "four")) == sorted(_contents(four))   # no .part files left
+
+
+def _few_fingerprints(monkeypatch):
+    # only 3 distinct fingerprints, so most jobs are duplicates (workers are forked and see the patch)
+    monkeypatch.setattr("utils.batch.world_fingerprint", lambda world, csr=None: "%032x" % (len(world.links) % 3))
+
+
+def test_dedupe_exports_only_unique_worlds(tmp_path, monkeypatch):
+    _few_fingerprints(monkeypatch)
+    log = tmp_path / "exports.log"
+    export = batch_module._export
+
+    def logged_export(params, rng, world, output):
+        with open(log, "a") as f:
+            f.write(f"{output}\n")
+        return export(params, rng, world, output)
+
+    monkeypatch.setattr("utils.batch._export", logged_export)
+    paths = run_batch({"ai_players": 0}, 12, tmp_path / "out", seed=5, workers=1, dedupe=True)
+    assert len(log.read_text().splitlines()) == len(paths)
+
+
+class _SeesEverything:
+    """Worker filter that claims every fingerprint was seen (like a Bloom filter false positive)."""
+
+    def __contains__(self, fingerprint):
+        return True
+
+    def add(self, fingerprint):
+        return False
+
+
+def _init_blind_worker(dedupe, capacity):
+    batch_module._worker_seen = _SeesEverything()
+
+
+def test_worker_false_positives_are_generated_again(tmp_path, monkeypatch):
+    _few_fingerprints(monkeypatch)
+    expected = run_batch({"ai_players": 0}, 12, tmp_path / "plain", seed=5, workers=2, dedupe=True)
+    monkeypatch.setattr("utils.batch._init_worker", _init_blind_worker)
+    paths = run_batch({"ai_players": 0}, 12, tmp_path / "blind", seed=5, workers=2, dedupe=True)
+    assert _contents(paths) == _contents(expected)
+    assert sorted(os.listdir(tmp_path / "blind")) == sorted(_contents(paths))
+
+
+def test_failing_jobs_are_rejected_without_aborting_the_batch(tmp_path):
+    # random style with a single main zone cannot link the start area to 2 main zones
+    paths = run_batch({"human_players": 1, "main_zones": 1}, 3, tmp_path, seed=3, workers=2)
+    assert paths == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_start_guard_limit_holds_on_the_written_worlds(tmp_path):
+    limit = 6000
+    params = {"human_players": 2, "ai_players": 2, "map_style": "random", "max_start_guard": limit,
+              "max_attempts": 500}
+    paths = run_batch(params, 3, tmp_path, seed=3, workers=1)
+    assert len(paths) == 3
+    for path in paths:
+        world, _ = read_h3t(path)
+        guards = [link.attributes.get("guard_strength", 0) for link in world.links
+                  if NodeType.START in (link.node_a.node_type, link.node_b.node_type)]
+        assert guards and max(guards) <= limit
@@ -0,0 +1,109 @@
+import json
+import sqlite3
+
+import pytest
+
+from models.map_graph import generate_world
+from models.objects import NodeType
+from utils import catalog as catalog_cli
+from utils.batch import run_batch
+from utils.catalog import SCHEMA, Catalog, world_metrics
+from utils.randomize import make_rng
+
+
+def _metrics(super_treasures, fairness):
+    return {
+        "start_area_zones": 3, "main_area_zones": 8, "zones": 20, "links": 30, "treasures": 2,
+        "super_treasures": super_treasures, "guard_min": 100, "guard_max": 9000, "guard_mean": 4000.5,
+        "fairness": fairness,
+    }
+
+
+@pytest.fixture
+def cat(tmp_path):
+    with Catalog(tmp_path / "catalog.db", batch_size=2) as cat:
+        rows = [
+            ("balanced", 2, 1, 3, 0.9),
+            ("balanced", 2, 2, 4, 0.5),
+            ("balanced", 2, 0, 1, 0.7),
+            ("random", 2, 1, 5, 0.3),
+            ("balanced", 3, 1, 6, 0.8),
+        ]
+        for i, (style, humans, ais, supers, fairness) in enumerate(rows):
+            params = {"map_style": style, "human_players": humans, "ai_players": ais, "ai_difficulty": "normal"}
+            cat.add(f"t{i}.h3t", 1000 + i, params, _metrics(supers, fairness), fingerprint=f"{i:032x}")
+        yield cat
+
+
+def test_find_filters_and_order(cat):
+    rows = cat.find(human_players=2, map_style="balanced", min_super_treasures=3, order_by="fairness", descending=True)
+    assert [r["path"] for r in rows] == ["t0.h3t", "t1.h3t"]
+    assert [r["path"] for r in cat.find(max_fairness=0.5, order_by="fairness")] == ["t3.h3t", "t1.h3t"]
+    assert len(cat.find(limit=2)) == 2
+    assert len(cat) == 5
+
+
+def test_row_contents(cat):
+    row = cat.find(fingerprint=f"{4:032x}")[0]
+    assert row["seed"] == f"{1004:016x}"
+    assert row["guard_mean"] == 4000.5
+    assert json.loads(row["params"])["ai_difficulty"] == "normal"
+
+
+def test_same_path_replaces_the_row(cat):
+    cat.add("t0.h3t", 1, {"map_style": "random", "human_players": 1, "ai_players": 0}, _metrics(0, 1.0))
+    assert len(cat) == 5
+    assert cat.find(path="t0.h3t")[0]["map_style"] == "random"
+
+
+def test_unknown_columns_are_rejected(cat):
+    with pytest.raises(ValueError):
+        cat.find(**{"human_players; DROP TABLE templates": 1})
+    with pytest.raises(ValueError):
+        cat.find(order_by="params")
+
+
+def test_player_query_uses_the_index(cat):
+    plan = cat.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM templates WHERE human_players = 2 AND map_style = 'balanced' "
+        "AND super_treasures >= 3"
+    ).fetchall()
+    assert "idx_templates_style_players" in plan[0][3]
+
+
+def test_world_metrics():
+    world = generate_world(num_human_players=2, num_ai_players=1, map_style="balanced", main_zone_nodes=4,
+                           player_zone_nodes=3, rng=make_rng(3))
+    metrics = world_metrics(world)
+    assert metrics["zones"] == len(world.nodes)
+    assert metrics["main_area_zones"] >= 2 * 4         # both fragments of main_zone_nodes=4, not the param
+    assert metrics["start_area_zones"] == 3
+    assert metrics["links"] == len(world.links)
+    assert metrics["super_treasures"] == sum(1 for n in world.nodes if n.node_type == NodeType.SUPER_TREASURE)
+    assert metrics["guard_min"] <= metrics["guard_mean"] <= metrics["guard_max"]
+    assert 0.0 <= metrics["fairness"] <= 1.0
+    json.dumps(metrics)
+
+
+def test_batch_records_every_written_template(tmp_path, capsys):
+    db = tmp_path / "catalog.db"
+    paths = run_batch({"map_style": "balanced", "human_players": 2}, 4, tmp_path / "out", seed=2, workers=2,
+                      catalog=db)
+    with Catalog(db) as cat:
+        assert sorted(r["path"] for r in cat.find()) == sorted(paths)
+
+    catalog_cli.main([str(db), "--map-style", "balanced", "--order-by", "fairness", "--desc", "--limit", "2"])
+    assert "[OK] 2 templates" in capsys.readouterr().out
+
+
+def test_old_size_columns_are_renamed(tmp_path):
+    db = tmp_path / "old.db"
+    conn = sqlite3.connect(db)
+    old_schema = SCHEMA[0].replace("start_area_zones", "start_zones").replace("main_area_zones", "main_zones")
+    conn.execute(old_schema)
+    conn.execute("INSERT INTO templates (path, seed, map_style, human_players, ai_players, main_zones, zones, links, "
+                 "treasures, super_treasures, params, created) VALUES ('a.h3t', '1', 'random', 1, 0, 5, 9, 9, 0, 0, '{}', '')")
+    conn.commit()
+    conn.close()
+    with Catalog(db) as cat:
+        assert cat.find(min_main_area_zones=5)[0]["path"] == "a.h3t"
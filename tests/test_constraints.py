@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+
+from models.constraints import (
+    ConstraintsNotMet, NeutralCastles, StartGuard, ZoneCount, acceptance_rate, merge_stats, new_stats
+)
+from models.map_graph import generate_world
+from models.objects import NodeType
+from utils.randomize import make_rng
+
+
+def _generate(constraints, seed=1, max_attempts=100, stats=None, style="random"):
+    return generate_world(
+        num_human_players=2, num_ai_players=1, map_style=style, main_zone_nodes=4, player_zone_nodes=3,
+        avg_links_main=2, avg_links_player=2, rng=make_rng(seed),
+        constraints=constraints, max_attempts=max_attempts, stats=stats,
+    )
+
+
+@pytest.mark.parametrize("style", ["random", "balanced"])
+def test_accepted_world_meets_the_constraints(style):
+    stats = new_stats()
+    world = _generate([ZoneCount(NodeType.SUPER_TREASURE, at_least=2), NeutralCastles(at_least=1)],
+                      stats=stats, style=style)
+    main = [n for n in world.nodes if n.owner is None and not n.is_start]
+    assert sum(1 for n in main if n.node_type == NodeType.SUPER_TREASURE) >= 2
+    assert sum(n.attributes.get("neutral_castle_min", 0) or 0 for n in main) >= 1
+    assert stats["worlds"] == 1
+    assert stats["attempts"] == 1 + sum(stats["rejected"].values())
+
+
+def test_start_guard_on_the_world():
+    world = _generate([StartGuard(at_most=4500, scope="world")], max_attempts=500)
+    for link in world.links:
+        if NodeType.START in (link.node_a.node_type, link.node_b.node_type):
+            assert link.attributes["guard_strength"] <= 4500
+
+
+def test_same_seed_same_world_with_constraints():
+    constraints = [ZoneCount(NodeType.SUPER_TREASURE, at_least=2)]
+    a, b = _generate(constraints, seed=4), _generate(constraints, seed=4)
+    assert [dict(n.attributes) for n in a.nodes] == [dict(n.attributes) for n in b.nodes]
+
+
+def test_impossible_constraints_raise_after_max_attempts():
+    stats = new_stats()
+    with pytest.raises(ConstraintsNotMet):
+        _generate([ZoneCount(NodeType.SUPER_TREASURE, at_least=99)], max_attempts=3, stats=stats)
+    assert stats["attempts"] == 3
+    assert stats["worlds"] == 0
+    assert stats["rejected"]["main"] == 3
+
+
+def test_stats_merge_and_rate():
+    total = new_stats()
+    merge_stats(total, {"worlds": 1, "attempts": 4, "rejected": {"main": 3}, "reasons": {"x": 3}})
+    merge_stats(total, {"worlds": 1, "attempts": 1, "rejected": {"main": 0}, "reasons": {}})
+    assert acceptance_rate(total) == pytest.approx(2 / 5)
+    assert total["reasons"] == {"x": 3}
+    assert acceptance_rate(new_stats()) == 0.0
+
+
+def test_constraints_are_picklable_and_validated():
+    constraint = pickle.loads(pickle.dumps(ZoneCount(NodeType.TREASURE, at_most=2, scope="world")))
+    assert constraint.describe() == "world: TREASURE zones <= 2"
+    with pytest.raises(ValueError):
+        ZoneCount(NodeType.TREASURE)
+    with pytest.raises(ValueError):
+        StartGuard(at_most=1, scope="main")
@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from models import csr as csr_module
+from models.csr import CSRGraph
+from models.objects import Graph, Node, NodeType
+
+
+def _graph():
+    """
+    1 -- 2 == 3 -- 4     (2 == 3 is a double link)
+    5 (self-loop), plus a link from 4 to a zone outside the graph
+    """
+    g = Graph()
+    nodes = {i: Node(i, node_type=NodeType.START if i in (1, 4) else NodeType.NEUTRAL) for i in range(1, 6)}
+    for n in nodes.values():
+        g.add_node(n)
+    guards = {(1, 2): 100, (2, 3): 500, (3, 4): 200}
+    for (a, b), guard in guards.items():
+        g.add_link(nodes[a], nodes[b]).attributes = {"guard_strength": guard}
+    g.add_link(nodes[2], nodes[3], allow_double=True).attributes = {"guard_strength": 50}
+    g.add_link(nodes[5], nodes[5]).attributes = {}
+    g.add_link(nodes[4], Node(99)).attributes = {"guard_strength": 1}
+    return g
+
+
+def test_snapshot_layout():
+    snap = CSRGraph.from_graph(_graph())
+    assert len(snap) == 5
+    assert sorted(snap.neighbors(1)) == [0, 2, 2]      # zone 2: zone 1 and both links to zone 3
+    assert snap.degree(4) == 0
+    assert snap.self_loops == [4]
+    assert snap.dangling == [5]
+    assert snap.offsets[-1] == len(snap.targets) == 2 * 4
+    assert snap.guard == [100, 500, 200, 50, 0, 1]
+    assert snap.starts() == [0, 3]
+
+
+def test_bfs_components_and_dijkstra():
+    snap = CSRGraph.from_graph(_graph())
+    assert snap.bfs(0) == [0, 1, 2, 3, -1]
+    count, labels = snap.components()
+    assert count == 2
+    assert labels[:4] == [labels[0]] * 4 and labels[4] != labels[0]
+    # the cheaper of the two 2-3 links is used
+    assert snap.dijkstra(0, snap.edge_costs()) == [0, 100, 150, 350, math.inf]
+    assert snap.dijkstra(0, snap.edge_costs(hop_cost=1000))[3] == 3350
+
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_hop_matrix_and_diameter(monkeypatch, with_numpy):
+    if with_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(csr_module, "np", None)
+    snap = CSRGraph.from_graph(_graph())
+    hops = snap.hop_matrix()
+    rows = hops.tolist() if with_numpy else hops
+    assert rows == [snap.bfs(i) for i in range(5)]
+    assert snap.eccentricity() == [3, 2, 2, 3, 0]
+    assert snap.diameter() == 3
@@ -0,0 +1,51 @@
+import io
+
+import pytest
+
+from models.map_graph import generate_world
+from utils.batch import generate_template, render_template
+from utils.export import export_to_h3t, generate_h3t_file, write_h3t
+from utils.randomize import make_rng
+
+
+def _world(style, seed, humans=2, ais=2):
+    return generate_world(
+        num_human_players=humans, num_ai_players=ais, ai_difficulty_mode="random", map_style=style,
+        main_zone_nodes=5, player_zone_nodes=4, avg_links_main=2, avg_links_player=2,
+        ai_placement_mode="random", rng=make_rng(seed),
+    )
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("style", ["random", "balanced"])
+def test_single_pass_writer_matches_two_step_export(tmp_path, style):
+    world = _world(style, seed=7)
+    two_step = tmp_path / "two_step.h3t"
+    generate_h3t_file(2, 2, output_path=two_step, map_style=style, rng=make_rng(1))
+    export_to_h3t(world, two_step)
+
+    single = tmp_path / "single.h3t"
+    rows = write_h3t(world, single, num_humans=2, num_ais=2, map_style=style, rng=make_rng(1))
+
+    assert _read(single) == _read(two_step)
+    assert rows == max(len(world.nodes), len(world.links))
+
+
+def test_writing_to_a_stream_matches_the_file(tmp_path):
+    world = _world("balanced", seed=3)
+    path = tmp_path / "t.h3t"
+    write_h3t(world, path, num_humans=2, num_ais=2, map_style="balanced", rng=make_rng(2))
+    buf = io.StringIO()
+    write_h3t(world, buf, num_humans=2, num_ais=2, map_style="balanced", rng=make_rng(2))
+    assert buf.getvalue().encode("utf-8") == _read(path)
+
+
+def test_render_template_matches_the_written_file(tmp_path):
+    params = {"map_style": "balanced", "human_players": 2, "ai_players": 1}
+    path = generate_template(params, 42, tmp_path / "t.h3t")
+    assert render_template(params, 42) == _read(path)
+    assert render_template(params, 42) != render_template(params, 43)
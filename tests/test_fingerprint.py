@@ -0,0 +1,102 @@
+import hashlib
+import io
+import random
+import re
+
+import pytest
+
+from models.fingerprint import BloomFilter, SeenSet, make_filter, world_fingerprint
+from models.map_graph import generate_world
+from models.objects import Graph, Node
+from utils.export import write_h3t
+from utils.h3t_reader import parse_h3t
+from utils.randomize import make_rng
+
+
+def _world(style, seed):
+    return generate_world(
+        num_human_players=3, num_ai_players=2, ai_difficulty_mode="random", map_style=style,
+        main_zone_nodes=4, player_zone_nodes=3, avg_links_main=2, avg_links_player=2,
+        num_same_towns_in_start=1, ai_placement_mode="random", rng=make_rng(seed),
+    )
+
+
+def _renumbered(world, seed):
+    """Copy of `world` with new zone ids, shuffled zone/link order and flipped link ends."""
+    shuffle = random.Random(seed)
+    ids = [n.id for n in world.nodes]
+    new_ids = dict(zip(ids, shuffle.sample(range(100, 100 + 3 * len(ids)), len(ids))))
+
+    copy = Graph()
+    nodes = {}
+    for node in shuffle.sample(world.nodes, len(world.nodes)):
+        new = Node(new_ids[node.id], node_type=node.node_type, owner=node.owner, is_start=node.is_start)
+        new.attributes = dict(node.attributes)
+        if new.attributes.get("town_type_rules"):
+            # "ns12_p" names a zone - follow it to its new id
+            new.attributes["town_type_rules"] = re.sub(
+                r"\d+", lambda m: str(new_ids[int(m.group())]), new.attributes["town_type_rules"]
+            )
+        nodes[node.id] = new
+        copy.add_node(new)
+    for link in shuffle.sample(world.links, len(world.links)):
+        a, b = nodes[link.node_a.id], nodes[link.node_b.id]
+        if shuffle.random() < 0.5:
+            a, b = b, a
+        copy.add_link(a, b, allow_double=True).attributes = dict(link.attributes)
+    return copy
+
+
+@pytest.mark.parametrize("style", ["random", "balanced"])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_fingerprint_ignores_zone_numbering(style, seed):
+    world = _world(style, seed)
+    fingerprint = world_fingerprint(world)
+    assert world_fingerprint(_renumbered(world, seed)) == fingerprint
+    assert world_fingerprint(_renumbered(world, seed + 100)) == fingerprint
+
+
+def test_fingerprint_survives_export_and_read_back():
+    world = _world("balanced", 4)
+    buf = io.StringIO()
+    write_h3t(world, buf, num_humans=3, num_ais=2, map_style="balanced", rng=make_rng(4))
+    parsed, _ = parse_h3t(buf.getvalue().splitlines(keepends=True))
+    assert world_fingerprint(parsed) == world_fingerprint(world)
+
+
+def test_fingerprint_tells_worlds_apart():
+    fingerprints = {world_fingerprint(_world(style, seed)) for style in ("random", "balanced") for seed in range(5)}
+    assert len(fingerprints) == 10
+
+    world = _world("random", 1)
+    before = world_fingerprint(world)
+    world.links[0].attributes["guard_strength"] += 1
+    assert world_fingerprint(world) != before
+
+
+def _fingerprints(start, count):
+    """Hex digests shaped like world_fingerprint output."""
+    return [hashlib.blake2b(str(i).encode(), digest_size=16).hexdigest() for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize("make", [SeenSet, lambda: BloomFilter(1000)])
+def test_filters_report_new_fingerprints_once(make):
+    seen = make()
+    fingerprints = _fingerprints(0, 500)
+    assert all(seen.add(f) for f in fingerprints)
+    assert not any(seen.add(f) for f in fingerprints)
+    assert all(f in seen for f in fingerprints)
+    assert len(seen) == len(fingerprints)
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(2000, error_rate=0.01)
+    for f in _fingerprints(0, 2000):
+        bloom.add(f)
+    false_positives = sum(f in bloom for f in _fingerprints(10000, 5000))
+    assert false_positives <= 100     # ~50 expected
+
+
+def test_make_filter():
+    assert isinstance(make_filter(), SeenSet)
+    assert isinstance(make_filter(10), BloomFilter)
@@ -0,0 +1,79 @@
+import io
+import os
+
+import pytest
+
+from models.map_graph import generate_world
+from utils.export import iter_h3t_rows, write_h3t
+from utils.h3t_layout import get_layout
+from utils.h3t_reader import parse_h3t, read_h3t
+from utils.randomize import make_rng
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def _export(style, seed):
+    world = generate_world(
+        num_human_players=3, num_ai_players=2, ai_difficulty_mode="random", map_style=style,
+        main_zone_nodes=4, player_zone_nodes=3, avg_links_main=2, avg_links_player=2,
+        num_same_towns_in_start=1, ai_placement_mode="random", rng=make_rng(seed),
+    )
+    buf = io.StringIO()
+    write_h3t(world, buf, num_humans=3, num_ais=2, map_style=style, rng=make_rng(seed))
+    return world, buf.getvalue()
+
+
+@pytest.mark.parametrize("style", ["random", "balanced"])
+def test_round_trip_reproduces_the_rows(style):
+    world, text = _export(style, seed=5)
+    parsed, template = parse_h3t(text.splitlines(keepends=True))
+
+    assert list(iter_h3t_rows(parsed)) == text.splitlines()[4:]
+    assert [(n.id, n.node_type, n.is_start) for n in parsed.nodes] == [
+        (n.id, n.node_type, n.is_start) for n in world.nodes
+    ]
+    assert [(l.node_a.id, l.node_b.id) for l in parsed.links] == [(l.node_a.id, l.node_b.id) for l in world.links]
+    assert template[("Map", "Name")].endswith(f"_{style}_H3_C2")
+
+
+def test_read_h3t_from_file(tmp_path):
+    _, text = _export("random", seed=8)
+    path = tmp_path / "t.h3t"
+    path.write_text(text, encoding="utf-8")
+    world, _ = read_h3t(path)
+    assert list(iter_h3t_rows(world)) == text.splitlines()[4:]
+
+
+def test_link_to_unknown_zone_is_an_error():
+    _, text = _export("random", seed=9)
+    lines = text.splitlines(keepends=True)
+    link_start = get_layout().link_start
+    # point the first connection at a zone id that does not exist
+    cells = lines[4].split("\t")
+    cells[link_start + 1] = "999"
+    with pytest.raises(ValueError, match="999"):
+        parse_h3t(lines[:4] + ["\t".join(cells)] + lines[5:])
+
+
+def test_reads_files_with_the_legacy_header(capsys):
+    # written by the original exporter: header without the 2 Bulwark zone columns,
+    # rows in the current layout (Zone 1 of the connections at column 127)
+    world, template = read_h3t(os.path.join(DATA_DIR, "legacy_baseline.h3t"))
+    assert "older h3t header" in capsys.readouterr().out
+    assert template[("Map", "Minimum Size")] == 16
+    assert len(world.nodes) == 9
+    assert sum(1 for n in world.nodes if n.is_start) == 3
+    assert all("zone_size" in n.attributes for n in world.nodes)
+    assert all(0 < l.attributes["guard_strength"] for l in world.links if "guard_strength" in l.attributes)
+    with open(os.path.join(DATA_DIR, "legacy_baseline.h3t"), encoding="utf-8") as f:
+        rows = f.read().splitlines()[4:]
+    assert list(iter_h3t_rows(world)) == rows
+
+
+def test_unknown_header_is_rejected():
+    _, text = _export("random", seed=1)
+    lines = text.splitlines(keepends=True)
+    # 2 connection columns missing: not the legacy header, which only lacks zone columns
+    lines[2] = "\t".join(lines[2].split("\t")[:-3]) + "\n"
+    with pytest.raises(ValueError):
+        parse_h3t(lines)
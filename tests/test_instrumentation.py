@@ -0,0 +1,89 @@
+import json
+
+from models.map_graph import generate_world
+from utils import instrumentation
+from utils.instrumentation import aggregate, laps, recording, recording_from_env, stage, timed
+from utils.randomize import make_rng
+
+
+@timed("double")
+def _double(x):
+    return 2 * x
+
+
+def test_disabled_hooks_are_no_ops():
+    assert instrumentation.recorder is None
+    assert stage("a") is stage("b")     # one shared null context
+    with stage("a"):
+        pass
+    lap = laps()
+    lap("a")
+    lap.done()
+    assert _double(2) == 4
+    assert _double.__name__ == "_double"
+
+
+def test_stages_nest_and_count():
+    with recording() as rec:
+        with stage("outer"):
+            with stage("inner"):
+                _double(1)
+            _double(2)
+        lap = laps()
+        lap("first")
+        lap("second")
+        lap.done()
+        instrumentation.recorder.count("things", 3)
+    assert instrumentation.recorder is None
+
+    report = rec.report()
+    stages = report["stages"]
+    assert stages["double"]["calls"] == 2
+    assert stages["inner"]["calls"] == stages["outer"]["calls"] == 1
+    assert stages["first"]["calls"] == stages["second"]["calls"] == 1
+    outer = stages["outer"]
+    assert outer["self_wall_ms"] <= outer["wall_ms"]
+    assert stages["inner"]["self_wall_ms"] <= stages["inner"]["wall_ms"]
+    assert report["counters"] == {"things": 3}
+    json.dumps(report)
+
+
+def test_recording_a_world():
+    with recording() as rec:
+        generate_world(num_human_players=2, num_ai_players=1, map_style="balanced", rng=make_rng(1))
+    report = rec.report()
+    assert {"main_graph", "start_template", "cloning", "ai_attachment", "finalize_links", "store"} <= set(report["stages"])
+    assert report["counters"]["graph.add_link"] > 0
+
+
+def test_instrumentation_does_not_change_the_world():
+    plain = generate_world(num_human_players=2, map_style="random", rng=make_rng(5))
+    with recording():
+        recorded = generate_world(num_human_players=2, map_style="random", rng=make_rng(5))
+    assert [dict(n.attributes) for n in plain.nodes] == [dict(n.attributes) for n in recorded.nodes]
+
+
+def test_aggregate_sums_runs():
+    reports = []
+    for _ in range(3):
+        with recording() as rec:
+            with stage("a"):
+                instrumentation.recorder.count("n")
+        reports.append(rec.report())
+    total = aggregate(reports)
+    assert total["runs"] == 3
+    assert total["stages"]["a"]["calls"] == 3
+    assert total["counters"] == {"n": 3}
+
+
+def test_report_from_env(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "perf.json"
+    monkeypatch.delenv(instrumentation.ENV_VAR, raising=False)
+    with recording_from_env() as rec:
+        assert rec is None
+    monkeypatch.setenv(instrumentation.ENV_VAR, str(path))
+    with recording_from_env():
+        with stage("a"):
+            pass
+    assert json.loads(path.read_text())["stages"]["a"]["calls"] == 1
+    assert "[OK] Instrumentation report saved" in capsys.readouterr().out
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from models.map_graph import _sample_pairs, generate_subgraph
+from utils.randomize import make_rng
+
+
+@pytest.mark.parametrize("n", [2, 3, 7, 20])
+def test_sample_pairs_yields_every_pair_once(n):
+    nodes = list(range(n))
+    pairs = list(_sample_pairs(nodes, random.Random(n)))
+    assert all(a < b for a, b in pairs)
+    assert len(pairs) == len(set(pairs)) == n * (n - 1) // 2
+
+
+class _CountingRandom(random.Random):
+    draws = 0
+
+    def randrange(self, *args):
+        self.draws += 1
+        return super().randrange(*args)
+
+    def shuffle(self, x):
+        raise AssertionError("all pairs were enumerated")
+
+
+def test_sample_pairs_is_lazy():
+    # only the consumed pairs are drawn, not the ~500k pairs of a 1000-zone graph
+    rng = _CountingRandom(1)
+    stream = _sample_pairs(list(range(1000)), rng)
+    first = [next(stream) for _ in range(10)]
+    assert len(set(first)) == 10
+    assert rng.draws < 100
+
+
+def test_sample_pairs_on_tiny_inputs():
+    assert list(_sample_pairs([], random.Random(1))) == []
+    assert list(_sample_pairs(["a"], random.Random(1))) == []
+
+
+@pytest.mark.parametrize("num_nodes,avg_links", [(1, 2), (5, 2), (8, 3), (30, 4)])
+def test_subgraph_is_connected_and_bounded(num_nodes, avg_links):
+    g = generate_subgraph(num_nodes, 10, avg_links_per_node=avg_links, double_link_chance=0.0, rng=make_rng(3))
+    assert sorted(n.id for n in g.nodes) == list(range(10, 10 + num_nodes))
+    target = min(num_nodes * avg_links // 2, num_nodes * (num_nodes - 1) // 2)
+    assert len(g.links) == max(target, num_nodes - 1)
+
+    reached, frontier = {g.nodes[0].id}, [g.nodes[0]]
+    while frontier:
+        node = frontier.pop()
+        for link in node.links:
+            other = link.connects(node)
+            if other.id not in reached:
+                reached.add(other.id)
+                frontier.append(other)
+    assert len(reached) == num_nodes
+
+
+def test_subgraph_is_reproducible():
+    a = generate_subgraph(12, 1, rng=make_rng(7))
+    b = generate_subgraph(12, 1, rng=make_rng(7))
+    assert [(l.node_a.id, l.node_b.id) for l in a.links] == [(l.node_a.id, l.node_b.id) for l in b.links]
@@ -0,0 +1,127 @@
+import sys
+
+import pytest
+
+from models.map_graph import generate_world
+from models.objects import Graph, Node, clone_attributes
+from utils.randomize import make_rng
+
+
+def _nodes(graph, *ids):
+    nodes = [Node(i) for i in ids]
+    for n in nodes:
+        graph.add_node(n)
+    return nodes
+
+
+def test_pair_index_is_order_independent():
+    g = Graph()
+    a, b, c = _nodes(g, 1, 2, 3)
+    link = g.add_link(a, b)
+    assert g.links_between(a, b) == g.links_between(b, a) == [link]
+    assert g.nodes_connected(b, a)
+    assert not g.nodes_connected(a, c)
+    assert g.links_between(a, c) == []
+    assert g.link_count(c, b) == 0
+
+
+def test_add_link_caps_links_per_pair():
+    g = Graph()
+    a, b = _nodes(g, 1, 2)
+    first = g.add_link(a, b)
+    assert g.add_link(b, a) is first                        # single link unless allow_double
+    second = g.add_link(b, a, allow_double=True)
+    assert second is not first
+    assert g.add_link(a, b, allow_double=True) is first     # never a third
+    assert g.link_count(a, b) == 2
+    assert g.links == [first, second]
+    assert a.links == b.links == [first, second]
+
+
+def test_self_loop_is_registered_once():
+    g = Graph()
+    a, = _nodes(g, 1)
+    link = g.add_link(a, a)
+    assert a.links == [link]
+    assert g.links_between(a, a) == [link]
+
+
+def test_merge_keeps_indexes_in_sync():
+    g, other = Graph(), Graph()
+    a, b = _nodes(g, 1, 2)
+    g.add_link(a, b)
+    c, = _nodes(other, 3)
+    other.add_node(a)                       # shared zone is not added twice
+    other.add_node(b)
+    extra = other.add_link(a, b, allow_double=True)
+    bridge = other.add_link(b, c)
+
+    g.merge(other)
+    assert [n.id for n in g.nodes] == [1, 2, 3]
+    assert g.link_count(a, b) == 2
+    assert g.links_between(c, b) == [bridge]
+    assert g.links[1:] == [extra, bridge]
+
+
+def test_merge_drops_links_beyond_two_per_pair():
+    g = Graph()
+    a, b = _nodes(g, 1, 2)
+    g.add_link(a, b)
+    g.add_link(a, b, allow_double=True)
+    others = []
+    for _ in range(2):
+        other = Graph()
+        other.add_node(a)
+        other.add_node(b)
+        other.add_link(a, b)
+        others.append(other)
+
+    g.merge_many(others)
+    assert len(g.links) == 2
+    assert g.link_count(a, b) == 2
+
+
+def test_clone_shares_values_until_written():
+    template = {"zone_size": 10, "town_type_rules": ""}
+    clone = clone_attributes(template)
+    assert dict(clone) == template
+    clone["zone_size"] = 20
+    clone["player_control"] = 2
+    with pytest.raises(KeyError):
+        del clone["town_type_rules"]        # template values cannot be removed through a clone
+    assert template == {"zone_size": 10, "town_type_rules": ""}
+    assert dict(clone) == {"zone_size": 20, "town_type_rules": "", "player_control": 2}
+
+
+def test_clone_of_a_clone_is_isolated():
+    template = {"zone_size": 10}
+    first = clone_attributes(template)
+    first["player_control"] = 1
+    second = clone_attributes(first)
+    second["player_control"] = 2
+    second["zone_size"] = 30
+    assert first["player_control"] == 1 and first["zone_size"] == 10
+    assert template == {"zone_size": 10}
+    assert second.maps[-1] is template      # still shares the base instead of nesting
+
+
+def test_cloned_zones_of_a_world_are_independent():
+    world = generate_world(num_human_players=3, map_style="balanced", rng=make_rng(2))
+    orbit = world.clone_orbits[0]
+    before = [dict(n.attributes) for n in orbit]
+    orbit[0].attributes["zone_size"] = 999
+    assert [dict(n.attributes) for n in orbit[1:]] == before[1:]
+
+
+@pytest.mark.parametrize("style", ["random", "balanced"])
+def test_generation_does_not_walk_node_links(monkeypatch, style):
+    # adjacency lookups go through the pair index; Node.links is only appended to
+    slot = Node.__dict__["links"]
+
+    def read(node):
+        assert sys._getframe(1).f_code.co_name == "add_link", "Node.links walked during generation"
+        return slot.__get__(node, Node)
+
+    monkeypatch.setattr(Node, "links", property(read, slot.__set__))
+    world = generate_world(num_human_players=3, num_ai_players=2, map_style=style, rng=make_rng(1))
+    assert world.links
@@ -0,0 +1,48 @@
+import pytest
+
+from utils import randomize
+from utils.randomize import WeightedSampler, make_rng, random_choice_weighted, weighted_choice
+
+OPTIONS = [("a", 0.2), ("b", 0.5), ("c", 0.3)]
+WEIGHTS = [1, 3, 6]
+
+
+def test_draw_matches_random_choice_weighted():
+    sampler = WeightedSampler(OPTIONS)
+    rng_a, rng_b = make_rng(1), make_rng(1)
+    assert [sampler.draw(rng_a) for _ in range(500)] == [random_choice_weighted(OPTIONS, rng_b) for _ in range(500)]
+
+
+def test_from_weights_matches_weighted_choice():
+    sampler = WeightedSampler.from_weights(WEIGHTS)
+    rng_a, rng_b = make_rng(2), make_rng(2)
+    assert [sampler.draw(rng_a) for _ in range(500)] == [weighted_choice(WEIGHTS, rng_b) for _ in range(500)]
+
+
+def test_draw_many_is_the_same_stream_as_draw():
+    sampler = WeightedSampler.from_weights(WEIGHTS)
+    rng_a, rng_b = make_rng(3), make_rng(3)
+    assert sampler.draw_many(200, rng_a) == [sampler.draw(rng_b) for _ in range(200)]
+    assert rng_a.random() == rng_b.random()
+
+
+def test_ladder():
+    sampler = WeightedSampler.ladder(["low", "mid", "high"], [0.25, 0.75])
+    assert [sampler.values[sampler.index(r)] for r in (0.0, 0.25, 0.5, 0.75, 0.99)] == ["low", "mid", "mid", "high", "high"]
+    with pytest.raises(ValueError):
+        WeightedSampler.ladder(["a", "b"], [0.1, 0.2])
+
+
+def test_draw_array_distribution():
+    np = pytest.importorskip("numpy")
+    sampler = WeightedSampler.from_weights(WEIGHTS)
+    n = 60000
+    draws = sampler.draw_array(np.random.default_rng(4), n)
+    for value, weight in zip((1, 2, 3), WEIGHTS):
+        assert draws.count(value) / n == pytest.approx(weight / sum(WEIGHTS), abs=0.01)
+
+
+def test_draw_array_without_numpy(monkeypatch):
+    monkeypatch.setattr(randomize, "np", None)
+    with pytest.raises(ImportError):
+        WeightedSampler(OPTIONS).draw_array(None, 10)
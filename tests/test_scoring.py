@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from models.map_graph import generate_world
+from models.objects import Graph, Node, NodeType
+from models.scoring import HOP_COST, REWARD_DISTANCE, fairness_score, score_world, treasure_values
+from utils.randomize import make_rng
+
+
+def _world():
+    """
+    S1 --1000-- T --3000-- S2        S1, S2: START zones of players 1 and 2
+                |                    T: TREASURE, X: SUPER_TREASURE
+               500
+                |
+                X
+    """
+    g = Graph()
+    s1 = Node(1, NodeType.START, owner=1, is_start=True)
+    s2 = Node(2, NodeType.START, owner=2, is_start=True)
+    t = Node(3, NodeType.TREASURE)
+    x = Node(4, NodeType.SUPER_TREASURE)
+    t.attributes = {"treasure1_low": 1000, "treasure1_high": 3000, "treasure1_density": 10}
+    x.attributes = {"treasure1_low": 10000, "treasure1_high": 20000, "treasure1_density": 5}
+    for n in (s1, s2, t, x):
+        g.add_node(n)
+    for a, b, guard in ((s1, t, 1000), (t, s2, 3000), (t, x, 500)):
+        g.add_link(a, b).attributes = {"guard_strength": guard}
+    return g
+
+
+def test_treasure_values():
+    assert treasure_values(_world()) == [0.0, 0.0, 0.2, 0.75]
+
+
+def test_distances_and_rewards():
+    result = score_world(_world())
+    p1, p2 = result["players"][1], result["players"][2]
+    assert p1["treasure_dist"] == 1000 + HOP_COST
+    assert p2["treasure_dist"] == 3000 + HOP_COST
+    assert p1["super_dist"] == 1000 + 500 + 2 * HOP_COST
+    assert p1["opponent_dist"] == p2["opponent_dist"] == 4000 + 2 * HOP_COST
+
+    t_reward, x_reward = 0.2 * 1.0, 0.75 * 1.5
+    assert p1["reward"] == pytest.approx(
+        t_reward / (1 + 2000 / REWARD_DISTANCE) + x_reward / (1 + 3500 / REWARD_DISTANCE), abs=1e-4
+    )
+    # player 1 reaches both rewarding zones first
+    assert p1["territory"] == pytest.approx(t_reward + x_reward)
+    assert p2["territory"] == 0
+
+
+def test_fairness_summary():
+    result = score_world(_world())
+    treasure = result["fairness"]["treasure_dist"]
+    assert treasure == {"min": 2000, "max": 4000, "spread": 2000, "ratio": 0.5}
+    assert result["fairness"]["opponent_dist"]["ratio"] == 1.0
+    assert result["score"] == result["fairness"]["territory"]["ratio"] == 0.0
+
+
+def test_double_link_uses_the_cheaper_guard():
+    world = _world()
+    s2, t = world.nodes[1], world.nodes[2]
+    world.add_link(t, s2, allow_double=True).attributes = {"guard_strength": 100}
+    assert score_world(world)["players"][2]["treasure_dist"] == 100 + HOP_COST
+
+
+def test_unreachable_player():
+    world = _world()
+    world.add_node(Node(5, NodeType.START, owner=3, is_start=True))
+    result = score_world(world)
+    assert result["players"][3]["treasure_dist"] == math.inf
+    assert result["fairness"]["treasure_dist"]["ratio"] == 0.0
+    assert result["fairness"]["treasure_dist"]["max"] == math.inf
+
+
+def test_single_player_is_fair():
+    world = generate_world(num_human_players=1, num_ai_players=0, rng=make_rng(1))
+    assert score_world(world)["fairness"] == {}
+    assert fairness_score(world) == 1.0
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import server as server_module
+from utils.batch import render_template
+from utils.server import TemplateServer, parse_params
+
+
+async def _request(port, line):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(line.encode("latin-1") + b"\r\nHost: test\r\n\r\n")
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, body
+
+
+def _dechunk(body):
+    out = b""
+    while True:
+        size, _, rest = body.partition(b"\r\n")
+        size = int(size, 16)
+        if not size:
+            return out
+        out += rest[:size]
+        body = rest[size + 2:]
+
+
+def _serve(scenario, capacity=2):
+    """Run `scenario(server)` against a server on a free port with a small thread pool."""
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            server = await TemplateServer(port=0, capacity=capacity, executor=executor).start()
+            try:
+                return await scenario(server)
+            finally:
+                await server.close()
+    return asyncio.run(run())
+
+
+def test_template_is_streamed_with_its_seed():
+    query = "map_style=balanced&human_players=2&ai_players=1&seed=42"
+
+    async def scenario(server):
+        return await _request(server.port, f"GET /template?{query} HTTP/1.1")
+
+    status, headers, body = _serve(scenario)
+    assert status == 200
+    assert headers["X-Template-Seed"] == "42"
+    assert headers["Transfer-Encoding"] == "chunked"
+    params, seed = parse_params(query)
+    assert _dechunk(body) == render_template(params, seed)
+
+
+@pytest.mark.parametrize("line,status", [
+    ("GET /template?human_players=0 HTTP/1.1", 400),
+    ("GET /template?map_style=spiral HTTP/1.1", 400),
+    ("GET /template?main_zones=500 HTTP/1.1", 400),
+    ("GET /template?max_attempts=1000000 HTTP/1.1", 400),
+    ("GET /template?colour=red HTTP/1.1", 400),
+    ("GET /nowhere HTTP/1.1", 404),
+    ("POST /template HTTP/1.1", 405),
+])
+def test_error_statuses(line, status):
+    async def scenario(server):
+        return await _request(server.port, line)
+
+    code, headers, body = _serve(scenario)
+    assert code == status
+    assert headers["Content-Type"] == "application/json"
+    assert "error" in json.loads(body)
+
+
+def test_busy_server_answers_503(monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocked_job(params, seed):
+        started.set()
+        release.wait(10)
+        return b"x"
+
+    monkeypatch.setattr(server_module, "_render_job", blocked_job)
+
+    async def scenario(server):
+        first = asyncio.ensure_future(_request(server.port, "GET /template?seed=1 HTTP/1.1"))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 10)
+        assert server.pending == 1
+        busy = await _request(server.port, "GET /template?seed=2 HTTP/1.1")
+        health = await _request(server.port, "GET /health HTTP/1.1")
+        release.set()
+        return busy, health, await first
+
+    (busy, headers, _), health, first = _serve(scenario, capacity=1)
+    assert busy == 503
+    assert headers["Retry-After"] == "1"
+    assert json.loads(health[2]) == {"status": "ok", "pending": 1, "capacity": 1}
+    assert first[0] == 200 and _dechunk(first[2]) == b"x"
+
+
+def test_render_job_validates_the_world(monkeypatch):
+    calls = []
+    monkeypatch.setattr(server_module, "render_template",
+                        lambda params, seed, validate=False: calls.append(validate) or b"")
+    server_module._render_job(parse_params("seed=1")[0], 1)
+    assert calls == [True]
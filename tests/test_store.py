@@ -0,0 +1,80 @@
+import io
+import random
+
+from config import LINK_FIELDS, ZONE_FIELDS
+from models.csr import attribute_column
+from models.fingerprint import world_fingerprint
+from models.map_graph import generate_world
+from models.store import AttributeStore, RowView, WorldStore
+from utils.export import write_h3t
+from utils.randomize import make_rng
+
+
+def _world(seed=1):
+    return generate_world(num_human_players=2, num_ai_players=1, map_style="balanced", rng=make_rng(seed))
+
+
+def _export(world):
+    buf = io.StringIO()
+    write_h3t(world, buf, num_humans=2, num_ais=1, map_style="balanced", rng=make_rng(0))
+    return buf.getvalue()
+
+
+def _unbound_copy_export(world):
+    """Export of `world` with plain-dict attributes (no store)."""
+    for item in world.nodes + world.links:
+        item.attributes = dict(item.attributes)
+    world.store = None
+    return _export(world)
+
+
+def test_row_view_round_trip():
+    store = AttributeStore(ZONE_FIELDS)
+    attributes = {"zone_size": 12, "town_type_rules": "", "potential_connection_main": True}
+    view = store.view(store.append(attributes))
+    assert isinstance(view, RowView)
+    assert dict(view) == attributes
+    view["zone_size"] = 3
+    view["extra"] = "x"
+    del view["town_type_rules"]
+    assert dict(view) == {"zone_size": 3, "potential_connection_main": True, "extra": "x"}
+    assert "town_type_rules" not in view
+    assert store.column("zone_size") == [3]
+
+
+def test_repeated_strings_are_interned():
+    store = AttributeStore(LINK_FIELDS)
+    field = LINK_FIELDS[-1]
+    a = store.view(store.append({field: "".join(["x", "+"])}))
+    b = store.view(store.append({field: "".join(["x", "+"])}))
+    assert a[field] is b[field]
+
+
+def test_world_is_bound_to_its_store():
+    world = _world()
+    assert world.store.matches(world)
+    assert all(isinstance(n.attributes, RowView) for n in world.nodes)
+    assert attribute_column(world, "zones", "zone_size") == [n.attributes.get("zone_size") for n in world.nodes]
+    copy = WorldStore.from_graph(world, bind=False)
+    assert [dict(copy.zones.view(i)) for i in range(len(world.nodes))] == [dict(n.attributes) for n in world.nodes]
+
+
+def test_reordered_zones_invalidate_the_store():
+    world = _world()
+    fingerprint = world_fingerprint(world)
+    random.Random(1).shuffle(world.nodes)
+    assert not world.store.matches(world)
+    assert attribute_column(world, "zones", "zone_size") == [n.attributes.get("zone_size") for n in world.nodes]
+    assert world_fingerprint(world) == fingerprint
+    assert _export(world) == _unbound_copy_export(world)
+
+
+def test_replaced_attributes_invalidate_the_store():
+    world = _world()
+    node = world.nodes[0]
+    node.attributes = dict(node.attributes, zone_size=999)
+    assert not world.store.matches(world)
+    assert attribute_column(world, "zones", "zone_size")[0] == 999
+    text = _export(world)
+    assert "999" in text
+    assert text == _unbound_copy_export(world)
@@ -0,0 +1,45 @@
+import pytest
+
+from models.map_graph import generate_world
+from models.symmetry import check_balanced, check_symmetry, is_symmetric
+from models.validation import WorldValidationError
+from utils.randomize import make_rng
+
+
+def _world(style="balanced", humans=3, ais=3, seed=1):
+    return generate_world(
+        num_human_players=humans, num_ai_players=ais, ai_difficulty_mode="normal", map_style=style,
+        main_zone_nodes=4, player_zone_nodes=3, avg_links_main=2, avg_links_player=2,
+        num_same_towns_in_start=1, ai_placement_mode="random", rng=make_rng(seed),
+    )
+
+
+@pytest.mark.parametrize("humans,ais", [(2, 0), (2, 2), (3, 3), (4, 4), (3, 1)])
+@pytest.mark.parametrize("seed", [1, 2])
+def test_balanced_worlds_are_symmetric(humans, ais, seed):
+    world = _world(humans=humans, ais=ais, seed=seed)
+    assert world.clone_orbits
+    assert check_symmetry(world) == []
+    assert check_balanced(world) == []
+
+
+def test_random_worlds_are_not_checked():
+    world = _world(style="random")
+    assert world.clone_orbits is None
+    assert is_symmetric(world)
+
+
+def test_changed_zone_breaks_symmetry():
+    world = _world()
+    world.clone_orbits[0][1].attributes["zone_size"] = 999
+    issues = check_symmetry(world)
+    assert [i.code for i in issues] == ["zone_asymmetry"]
+    with pytest.raises(WorldValidationError):
+        check_balanced(world)
+
+
+def test_missing_link_breaks_symmetry():
+    world = _world()
+    orbit_zone = world.clone_orbits[0][0]
+    world.links.remove(orbit_zone.links[0])
+    assert "link_asymmetry" in {i.code for i in check_symmetry(world)}
@@ -0,0 +1,72 @@
+import pytest
+
+from models.map_graph import generate_world
+from models.objects import Graph, Link, Node, NodeType
+from models.validation import ERROR, WARNING, WorldValidationError, check_world, errors, validate_world
+from utils.randomize import make_rng
+
+
+def _world():
+    """Main zones 1-2-3, START zones 10 (player 1) and 20 (player 2) linked to 1 and 3."""
+    g = Graph()
+    nodes = {i: Node(i, node_type=NodeType.NEUTRAL) for i in (1, 2, 3)}
+    for i, owner in ((10, 1), (20, 2)):
+        nodes[i] = Node(i, node_type=NodeType.START, owner=owner, is_start=True)
+    for n in nodes.values():
+        g.add_node(n)
+    for a, b in ((1, 2), (2, 3), (10, 1), (20, 3)):
+        g.add_link(nodes[a], nodes[b]).attributes = {"guard_strength": 1000}
+    return g, nodes
+
+
+def _codes(world):
+    return sorted(i.code for i in validate_world(world))
+
+
+def test_valid_world_has_no_issues():
+    world, _ = _world()
+    assert validate_world(world) == []
+    assert check_world(world) == []
+
+
+@pytest.mark.parametrize("style", ["random", "balanced"])
+def test_generated_worlds_are_valid(style):
+    world = generate_world(num_human_players=3, num_ai_players=2, map_style=style, rng=make_rng(4))
+    assert errors(validate_world(world)) == []
+
+
+def test_disconnected_start_area():
+    world, nodes = _world()
+    world.links = [l for l in world.links if nodes[20] not in (l.node_a, l.node_b)]
+    issues = validate_world(world)
+    assert sorted(i.code for i in issues) == ["disconnected", "start_unreachable", "stray_node_link", "stray_node_link"]
+    disconnected = next(i for i in issues if i.code == "disconnected")
+    assert disconnected.nodes == (20,)
+    with pytest.raises(WorldValidationError) as exc:
+        check_world(world)
+    assert "START zone 20" in str(exc.value)
+    assert [i.code for i in exc.value.issues] == [i.code for i in issues]
+
+
+def test_link_errors_and_warnings():
+    world, nodes = _world()
+    world.add_link(nodes[2], nodes[2])                       # self-loop, no attributes
+    world.links.append(Link(nodes[1], Node(99)))              # zone 99 is not in the world
+    for _ in range(2):                                        # bypass the pair limit of add_link
+        world.links.append(Link(nodes[1], nodes[2]))
+    issues = {i.code: i for i in validate_world(world)}
+    assert issues["self_loop"].severity == WARNING
+    assert issues["dangling_link"].severity == ERROR
+    assert issues["dangling_link"].nodes == (1, 99)
+    assert issues["too_many_links"].nodes == (1, 2)
+    assert issues["missing_link_attributes"].severity == WARNING
+
+
+def test_duplicate_ids_and_no_start():
+    g = Graph()
+    a, b = Node(1), Node(1)
+    g.add_node(a)
+    g.add_node(b)
+    world_codes = _codes(g)
+    assert "duplicate_node_id" in world_codes
+    assert "no_start" in world_codes
@@ -0,0 +1,404 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from models.constraints import (
+    ConstraintsNotMet, NeutralCastles, StartGuard, ZoneCount, acceptance_rate, merge_stats, new_stats
+)
+from models.csr import CSRGraph
+from models.fingerprint import make_filter, world_fingerprint
+from models.map_graph import generate_world
+from models.objects import NodeType
+from models.symmetry import check_balanced
+from models.validation import WorldValidationError, check_world
+from utils import instrumentation
+from utils.catalog import Catalog, world_metrics
+from utils.export import write_h3t
+from utils.randomize import make_rng, spawn_seeds
+
+# Same defaults as the GUI (WorldGeneratorGUI._build_ui)
+DEFAULT_PARAMS = {
+    "map_style": "random",
+    "human_players": 1,
+    "ai_players": 1,
+    "ai_difficulty": "normal",
+    "start_zones": 0,         # 0 = random (3-5)
+    "main_zones": 0,          # 0 = random (4-7)
+    "same_towns": 0,
+    "diff_towns": 0,
+    "ai_placement": "main",
+    "disable_special_weeks": True,
+    "anarchy": False,
+    "special_heroes": False,
+    "joining_percent": 1,     # 4 = random (0-3)
+    "join_only_for_money": True,
+    # Acceptance constraints (0 = off), see models.constraints
+    "min_super_treasure": 0,  # SUPER_TREASURE zones in the main area
+    "min_neutral_castles": 0, # guaranteed neutral castles in the main area
+    "max_start_guard": 0,     # guard strength on START zone links (whole world, AI starts included)
+    "max_attempts": 100,      # candidates per template before giving up
+}
+
+
+def _template_filename(params, index, seed):
+    """Unique file name: date, style, players + job index and seed."""
+    today = datetime.now().strftime("%Y%m%d")
+    return (
+        f"{today}_{params['map_style']}_H{params['human_players']}_{params['ai_players']}CP"
+        f"_{index:05d}_{seed:016x}.h3t"
+    )
+
+
+def build_constraints(params):
+    """Constraint objects for the min_super_treasure / min_neutral_castles / max_start_guard params."""
+    constraints = []
+    if params["min_super_treasure"]:
+        constraints.append(ZoneCount(NodeType.SUPER_TREASURE, at_least=params["min_super_treasure"]))
+    if params["min_neutral_castles"]:
+        constraints.append(NeutralCastles(at_least=params["min_neutral_castles"]))
+    if params["max_start_guard"]:
+        limit = params["max_start_guard"]
+        # the start template check rejects early; the world check also covers the
+        # player->main links (which get extra guards) and the AI START zones
+        constraints.append(StartGuard(at_most=limit))
+        constraints.append(StartGuard(at_most=limit, scope="world"))
+    return constraints
+
+
+def _build_world(params, rng, stats=None):
+    """Same steps as the GUI before export: resolve random sizes, set overrides, generate_world."""
+    start_zones = params["start_zones"] or rng.randint(3, 5)
+    main_zones = params["main_zones"] or rng.randint(4, 7)
+
+    joining_percent = params["joining_percent"]
+    if joining_percent == 4:
+        joining_percent = rng.randint(0, 3)
+
+    # per-world overrides (not config.MANUAL_OVERRIDES), so concurrent generations don't interfere
+    overrides = {
+        "joining_percent": joining_percent,
+        "join_only_for_money": "x" if params["join_only_for_money"] else ""
+    }
+
+    return generate_world(
+        num_human_players=params["human_players"],
+        num_ai_players=params["ai_players"],
+        ai_difficulty_mode=params["ai_difficulty"],
+        map_style=params["map_style"],
+        main_zone_nodes=main_zones,
+        player_zone_nodes=start_zones,
+        avg_links_main=2,
+        avg_links_player=2,
+        num_same_towns_in_start=params["same_towns"],
+        num_diff_towns_in_start=params["diff_towns"],
+        ai_placement_mode=params["ai_placement"],
+        rng=rng,
+        constraints=build_constraints(params),
+        max_attempts=params["max_attempts"],
+        stats=stats,
+        overrides=overrides,
+    )
+
+
+def _prepare_world(params, seed, validate=False, stats=None):
+    """(params merged with DEFAULT_PARAMS, rng, world) for one template; validated if asked."""
+    params = {**DEFAULT_PARAMS, **params}
+    rng = make_rng(seed)
+    world = _build_world(params, rng, stats)
+    if validate:
+        check_world(world)
+        check_balanced(world)
+    return params, rng, world
+
+
+def _export(params, rng, world, output):
+    return write_h3t(
+        world,
+        output,
+        num_humans=params["human_players"],
+        num_ais=params["ai_players"],
+        map_style=params["map_style"],
+        disable_special_weeks=params["disable_special_weeks"],
+        anarchy=params["anarchy"],
+        special_heroes=params["special_heroes"],
+        rng=rng
+    )
+
+
+def write_template(params, seed, output, validate=False, stats=None):
+    """
+    Generate one template and write it to `output`: a file path or any text
+    file-like object (e.g. io.StringIO), so nothing has to touch the disk.
+    Missing params fall back to DEFAULT_PARAMS. Returns the number of zone/link rows.
+    With validate=True a structurally broken (or, for balanced maps, asymmetric)
+    world raises WorldValidationError before anything is written.
+    `stats` collects constraint retry counts (models.constraints.new_stats()).
+    """
+    params, rng, world = _prepare_world(params, seed, validate, stats)
+    return _export(params, rng, world, output)
+
+
+def render_template(params, seed, validate=False):
+    """
+    Generate one template in memory and return the .h3t file content as UTF-8 bytes.
+    Same output as generate_template for the same params and seed.
+    validate: as for write_template.
+    """
+    buf = io.StringIO()
+    write_template(params, seed, buf, validate=validate)
+    return buf.getvalue().encode("utf-8")
+
+
+def generate_template(params, seed, output_path, validate=False, stats=None):
+    """
+    Generate a single template file for the given parameters and seed.
+    Same steps as the GUI: generate_world -> write_h3t.
+    """
+    write_template(params, seed, output_path, validate=validate, stats=stats)
+    return output_path
+
+
+# With dedupe, workers write to <file>.part; the parent renames first occurrences
+# into place and deletes duplicates
+PART_SUFFIX = ".part"
+
+# Per-process filter of the fingerprints this worker has already exported (dedupe only).
+# A worker skips the export of a world it has written before: results reach the parent
+# in job order, so that fingerprint is already kept and the file would only be deleted.
+_worker_seen = None
+
+
+def _init_worker(dedupe, capacity):
+    """Pool initializer: a fresh fingerprint filter per worker process."""
+    global _worker_seen
+    _worker_seen = make_filter(capacity) if dedupe else None
+
+
+def _generate_job(params, seed, output_path, instrument, validate, dedupe, catalog):
+    """
+    Generate one template. Returns a dict:
+      path         written file (None if rejected or skipped)
+      skipped      True if not exported: this worker has already written the same world (dedupe)
+      report       instrumentation report or None
+      rejected     reason if validation / the constraints / generation failed, else None
+      stats        constraint retry counts
+      fingerprint  world fingerprint (dedupe / catalog only)
+      metrics      catalog summary metrics (catalog only)
+    """
+    result = {
+        "path": None, "skipped": False, "report": None, "rejected": None, "stats": new_stats(),
+        "fingerprint": None, "metrics": None,
+    }
+    with instrumentation.recording() if instrument else contextlib.nullcontext() as rec:
+        try:
+            params, rng, world = _prepare_world(params, seed, validate, result["stats"])
+            if dedupe or catalog:
+                csr = CSRGraph.from_graph(world)    # shared by fingerprint and metrics
+                with instrumentation.stage("fingerprint"):
+                    result["fingerprint"] = world_fingerprint(world, csr)
+                if catalog:
+                    with instrumentation.stage("metrics"):
+                        result["metrics"] = world_metrics(world, csr)
+            if dedupe and _worker_seen is not None and result["fingerprint"] in _worker_seen:
+                result["skipped"] = True
+            else:
+                _export(params, rng, world, output_path)
+                result["path"] = output_path
+                if dedupe and _worker_seen is not None:
+                    _worker_seen.add(result["fingerprint"])
+        except (WorldValidationError, ConstraintsNotMet) as e:
+            result["rejected"] = str(e)
+        except Exception as e:
+            # a generator bug on one seed costs that template, not the whole batch
+            result["rejected"] = f"{type(e).__name__}: {e}"
+            if result["path"] is None and os.path.exists(output_path):
+                os.remove(output_path)      # partially written file
+    if rec is not None:
+        result["report"] = rec.report()
+    return result
+
+
+def _run_job(job):
+    """Worker entry point (must be top-level to be picklable)."""
+    params, seed, output_path, quiet, instrument, validate, dedupe, catalog = job
+    if not quiet:
+        return _generate_job(params, seed, output_path, instrument, validate, dedupe, catalog)
+    # The generator is very chatty - silence it in batch runs
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return _generate_job(params, seed, output_path, instrument, validate, dedupe, catalog)
+
+
+def run_batch(params, count, output_dir=".", seed=None, workers=None, quiet=True, instrument=False,
+              validate=True, dedupe=False, dedupe_capacity=None, catalog=None):
+    """
+    Generate `count` templates with the same parameters across a process pool.
+
+    Every job gets its own seed derived from `seed`, so re-running a batch with
+    the same seed reproduces the same files regardless of the worker count.
+    With instrument=True every job records stage times/counters; the per-run
+    reports and their aggregate are saved to <output_dir>/instrumentation.json.
+    With validate=True (default) every world is checked by models.validation
+    and broken ones are rejected instead of written. A job that raises is
+    rejected as well (with the error message), the rest of the batch goes on.
+    With dedupe=True worlds identical up to zone numbering (models.fingerprint)
+    are written once - the first job of each fingerprint keeps its file. Every
+    worker skips the export of worlds it has already written itself; the parent
+    checks the fingerprints in job order and deletes the files of duplicates
+    written by different workers, so the result does not depend on the worker
+    count. dedupe_capacity switches the exact fingerprint sets to Bloom filters
+    of fixed size (rare false positives drop a unique world).
+    catalog: SQLite file (utils.catalog) receiving one row per written template.
+    Returns the list of generated file paths (in job order, rejected jobs left out).
+    """
+    params = {**DEFAULT_PARAMS, **params}
+
+    if params["human_players"] + params["ai_players"] > 8:
+        raise ValueError("Total players cannot exceed 8.")
+
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    print(f"[BATCH] {count} templates, seed {seed}, workers {workers or os.cpu_count()}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    for index, job_seed in enumerate(spawn_seeds(seed, count)):
+        path = os.path.join(output_dir, _template_filename(params, index, job_seed))
+        if dedupe:
+            path += PART_SUFFIX
+        jobs.append((params, job_seed, path, quiet, instrument, validate, dedupe, catalog is not None))
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, count // (workers * 4))
+    seen = make_filter(dedupe_capacity) if dedupe else None
+    duplicates = 0
+    results = []
+    retry = []      # worker skipped a world the batch keeps (Bloom false positive) - generate it again
+    with contextlib.ExitStack() as stack:
+        cat = stack.enter_context(Catalog(catalog)) if catalog is not None else None
+        pool = stack.enter_context(ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(dedupe, dedupe_capacity)
+        ))
+        for index, (job, result) in enumerate(zip(jobs, pool.map(_run_job, jobs, chunksize=chunksize))):
+            results.append(result)
+            if result["rejected"]:
+                print(f"[WARN] Rejected seed {job[1]}: {result['rejected']}")
+                continue
+            if dedupe:
+                # results arrive in job order: the first job of each fingerprint keeps its file
+                part, result["path"] = result["path"], None
+                if not seen.add(result["fingerprint"]):
+                    if part is not None:
+                        os.remove(part)
+                    duplicates += 1
+                    continue
+                if part is None:
+                    retry.append(index)
+                    continue
+                result["path"] = part[:-len(PART_SUFFIX)]
+                os.replace(part, result["path"])
+            if cat is not None:
+                cat.add(result["path"], job[1], params, result["metrics"], result["fingerprint"])
+
+        if retry:
+            # same seed, same world: written straight to its final name, without the worker filter
+            retry_jobs = [
+                (params, jobs[i][1], jobs[i][2][:-len(PART_SUFFIX)], quiet, instrument, validate, False,
+                 catalog is not None)
+                for i in retry
+            ]
+            for index, job, again in zip(retry, retry_jobs, pool.map(_run_job, retry_jobs)):
+                results[index]["path"] = again["path"]
+                if cat is not None and again["path"] is not None:
+                    cat.add(again["path"], job[1], params, again["metrics"], results[index]["fingerprint"])
+    paths = [r["path"] for r in results if r["path"] is not None]
+
+    stats = new_stats()
+    for r in results:
+        merge_stats(stats, r["stats"])
+    if build_constraints(params):
+        print(f"[BATCH] Constraints: {stats['worlds']} accepted of {stats['attempts']} candidates "
+              f"({acceptance_rate(stats):.1%}), rejections {stats['reasons']}")
+
+    if instrument:
+        runs = [
+            {
+                "path": r["path"], "seed": job[1], "rejected": r["rejected"], "attempts": r["stats"]["attempts"],
+                "fingerprint": r["fingerprint"], **r["report"],
+            }
+            for r, job in zip(results, jobs)
+        ]
+        instrumentation.write_report(
+            {
+                "seed": seed, "params": params, "constraints": stats,
+                "aggregate": instrumentation.aggregate(r["report"] for r in results), "runs": runs,
+            },
+            os.path.join(output_dir, "instrumentation.json"),
+        )
+
+    rejected = len(results) - len(paths) - duplicates
+    print(f"[OK] Batch finished: {len(paths)} templates in {output_dir}"
+          + (f", {rejected} rejected" if rejected else "")
+          + (f", {duplicates} duplicates dropped" if dedupe else ""))
+    return paths
+
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(description="Headless batch generation of HotA templates.")
+    p.add_argument("--count", type=int, required=True, help="number of templates to generate")
+    p.add_argument("--out-dir", default=".", help="output directory")
+    p.add_argument("--seed", type=int, default=None, help="batch seed (random if omitted)")
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    p.add_argument("--verbose", action="store_true", help="keep generator debug output")
+    p.add_argument("--instrument", action="store_true", help="save stage timings/counters to instrumentation.json")
+    p.add_argument("--no-validate", dest="validate", action="store_false", help="skip structural validation of worlds")
+    p.add_argument("--dedupe", action="store_true", help="write worlds identical up to zone numbering only once")
+    p.add_argument("--dedupe-capacity", type=int, default=None,
+                   help="use a fixed-size Bloom filter sized for this many templates (default: exact set)")
+    p.add_argument("--catalog", default=None, help="SQLite catalog to record the generated templates in")
+
+    p.add_argument("--style", dest="map_style", choices=["random", "balanced"], default=DEFAULT_PARAMS["map_style"])
+    p.add_argument("--humans", dest="human_players", type=int, default=DEFAULT_PARAMS["human_players"])
+    p.add_argument("--ais", dest="ai_players", type=int, default=DEFAULT_PARAMS["ai_players"])
+    p.add_argument("--ai-difficulty", choices=["normal", "hard", "unfair", "random"], default=DEFAULT_PARAMS["ai_difficulty"])
+    p.add_argument("--ai-placement", choices=["main", "start", "both", "random"], default=DEFAULT_PARAMS["ai_placement"])
+    p.add_argument("--start-zones", type=int, default=DEFAULT_PARAMS["start_zones"], help="0 = random")
+    p.add_argument("--main-zones", type=int, default=DEFAULT_PARAMS["main_zones"], help="0 = random")
+    p.add_argument("--same-towns", type=int, default=DEFAULT_PARAMS["same_towns"])
+    p.add_argument("--diff-towns", type=int, default=DEFAULT_PARAMS["diff_towns"])
+    p.add_argument("--joining-percent", type=int, choices=range(0, 5), default=DEFAULT_PARAMS["joining_percent"], help="4 = random")
+    p.add_argument("--special-weeks", dest="disable_special_weeks", action="store_false", help="keep special weeks enabled")
+    p.add_argument("--anarchy", action="store_true")
+    p.add_argument("--special-heroes", action="store_true")
+    p.add_argument("--join-any", dest="join_only_for_money", action="store_false", help="monsters may join without money")
+
+    c = p.add_argument_group("constraints", "regenerate each template until these hold (0 = off)")
+    c.add_argument("--min-super-treasure", type=int, default=DEFAULT_PARAMS["min_super_treasure"],
+                   help="minimum SUPER_TREASURE zones in the main area")
+    c.add_argument("--min-neutral-castles", type=int, default=DEFAULT_PARAMS["min_neutral_castles"],
+                   help="minimum guaranteed neutral castles in the main area")
+    c.add_argument("--max-start-guard", type=int, default=DEFAULT_PARAMS["max_start_guard"],
+                   help="maximum guard strength on any link of a START zone")
+    c.add_argument("--max-attempts", type=int, default=DEFAULT_PARAMS["max_attempts"],
+                   help="candidates per template before it is skipped")
+    return p
+
+
+def main(argv=None):
+    args = vars(build_arg_parser().parse_args(argv))
+    count = args.pop("count")
+    output_dir = args.pop("out_dir")
+    seed = args.pop("seed")
+    workers = args.pop("workers")
+    quiet = not args.pop("verbose")
+    instrument = args.pop("instrument")
+    validate = args.pop("validate")
+    dedupe = args.pop("dedupe")
+    dedupe_capacity = args.pop("dedupe_capacity")
+    catalog = args.pop("catalog")
+    return run_batch(args, count, output_dir=output_dir, seed=seed, workers=workers, quiet=quiet,
+                     instrument=instrument, validate=validate, dedupe=dedupe or bool(dedupe_capacity),
+                     dedupe_capacity=dedupe_capacity, catalog=catalog)
@@ -0,0 +1,217 @@
+import argparse
+import json
+import sqlite3
+import statistics
+from datetime import datetime
+
+from models.csr import CSRGraph
+from models.objects import NodeType
+from models.scoring import score_world
+
+# ──────────────────────────────────────────────
+# Template catalog (SQLite)
+# ──────────────────────────────────────────────
+# One row per generated .h3t: parameters, seed, fingerprint, summary metrics
+# and file path. Rows are buffered and inserted with executemany() in one
+# transaction per `batch_size` rows, so inserting keeps up with run_batch.
+#
+#     with Catalog("catalog.db") as cat:
+#         cat.find(human_players=2, map_style="balanced", min_super_treasures=3)
+#
+#     python -m utils.catalog catalog.db --human-players 2 --map-style balanced --min-super-treasures 3 \
+#         --order-by fairness --desc
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS templates (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        seed TEXT NOT NULL,
+        fingerprint TEXT,
+        map_style TEXT NOT NULL,
+        human_players INTEGER NOT NULL,
+        ai_players INTEGER NOT NULL,
+        ai_difficulty TEXT,
+        ai_placement TEXT,
+        start_area_zones INTEGER,
+        main_area_zones INTEGER,
+        zones INTEGER NOT NULL,
+        links INTEGER NOT NULL,
+        treasures INTEGER NOT NULL,
+        super_treasures INTEGER NOT NULL,
+        guard_min INTEGER,
+        guard_max INTEGER,
+        guard_mean REAL,
+        fairness REAL,
+        params TEXT NOT NULL,
+        created TEXT NOT NULL
+    )""",
+    # equality columns first, the range column (min_super_treasures) last; ai_players is
+    # left out because the usual query ("2 humans, balanced, >= 3 super treasures") does not filter it
+    "DROP INDEX IF EXISTS idx_templates_players",   # old (human_players, ai_players, ...) order
+    "CREATE INDEX IF NOT EXISTS idx_templates_style_players ON templates (map_style, human_players, super_treasures)",
+    "CREATE INDEX IF NOT EXISTS idx_templates_style ON templates (map_style, fairness)",
+    "CREATE INDEX IF NOT EXISTS idx_templates_fingerprint ON templates (fingerprint)",
+]
+
+# Columns of older catalogs -> current name. The generated sizes were stored as
+# start_zones / main_zones, which read like the batch params of the same name
+# (zones per player); the params themselves are kept in the params column.
+RENAMED_COLUMNS = {"start_zones": "start_area_zones", "main_zones": "main_area_zones"}
+
+# Columns filled from the batch params / the metrics, in insert order
+PARAM_COLUMNS = ("map_style", "human_players", "ai_players", "ai_difficulty", "ai_placement")
+METRIC_COLUMNS = (
+    "start_area_zones", "main_area_zones", "zones", "links", "treasures", "super_treasures",
+    "guard_min", "guard_max", "guard_mean", "fairness",
+)
+COLUMNS = ("path", "seed", "fingerprint") + PARAM_COLUMNS + METRIC_COLUMNS + ("params", "created")
+FILTER_COLUMNS = frozenset(COLUMNS) - {"params", "created"}
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def world_metrics(world, csr=None):
+    """Summary metrics of a generated world for the catalog (JSON-serialisable dict)."""
+    if csr is None:
+        csr = CSRGraph.from_graph(world)
+    types = csr.node_types
+    guards = [g for g in csr.guard if g]
+    return {
+        # generated sizes: player 1's start area, and the whole unowned main area
+        # (all fragments - not the per-player main_zones param)
+        "start_area_zones": sum(1 for n in csr.nodes if n.owner == 1),
+        "main_area_zones": sum(1 for n in csr.nodes if n.owner is None and not n.is_start),
+        "zones": len(csr.nodes),
+        "links": len(csr.link_ends),
+        "treasures": types.count(NodeType.TREASURE),
+        "super_treasures": types.count(NodeType.SUPER_TREASURE),
+        "guard_min": min(guards, default=None),
+        "guard_max": max(guards, default=None),
+        "guard_mean": round(statistics.fmean(guards), 1) if guards else None,
+        "fairness": score_world(world, csr)["score"],
+    }
+
+
+class Catalog:
+    """SQLite catalog of generated templates; use as a context manager so pending rows get flushed."""
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        # WAL + NORMAL sync: readers do not block the writer, commits do not fsync every time
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self._rename_old_columns()
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+        self._pending = []
+        self._insert = (
+            f"INSERT OR REPLACE INTO templates ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in COLUMNS)})"
+        )
+
+    def _rename_old_columns(self):
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(templates)")}
+        for old, new in RENAMED_COLUMNS.items():
+            if old in existing and new not in existing:
+                self.conn.execute(f"ALTER TABLE templates RENAME COLUMN {old} TO {new}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, path, seed, params, metrics, fingerprint=None):
+        """Queue one template; written with the next flush (automatic every batch_size rows)."""
+        row = (path, f"{seed:016x}", fingerprint)
+        row += tuple(params.get(c) for c in PARAM_COLUMNS)
+        row += tuple(metrics.get(c) for c in METRIC_COLUMNS)
+        row += (json.dumps(params, sort_keys=True), datetime.now().isoformat(timespec="seconds"))
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self.conn:     # one transaction for the whole chunk
+            self.conn.executemany(self._insert, self._pending)
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __len__(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+
+    def find(self, limit=None, order_by=None, descending=False, **filters):
+        """
+        Rows (as dicts) matching all filters: column=value for equality,
+        min_<column>=x / max_<column>=x for ranges, e.g.
+            find(human_players=2, map_style="balanced", min_super_treasures=3)
+        """
+        self.flush()
+        where, args = [], []
+        for key, value in filters.items():
+            op = "="
+            column = key
+            if key.startswith("min_"):
+                op, column = ">=", key[4:]
+            elif key.startswith("max_"):
+                op, column = "<=", key[4:]
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Unknown catalog column: {column}")
+            where.append(f"{column} {op} ?")
+            args.append(value)
+
+        sql = "SELECT * FROM templates"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if order_by:
+            if order_by not in FILTER_COLUMNS:
+                raise ValueError(f"Unknown catalog column: {order_by}")
+            sql += f" ORDER BY {order_by}{' DESC' if descending else ''}"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, args)]
+
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(description="Query the template catalog.")
+    p.add_argument("catalog", help="catalog database (created by generate.py --catalog)")
+    p.add_argument("--limit", type=int, default=None)
+    p.add_argument("--order-by", default=None, help="sort column")
+    p.add_argument("--desc", dest="descending", action="store_true", help="sort descending")
+    p.add_argument("--map-style", choices=["random", "balanced"])
+    p.add_argument("--human-players", type=int)
+    p.add_argument("--ai-players", type=int)
+    p.add_argument("--fingerprint")
+    p.add_argument("--min-super-treasures", type=int)
+    p.add_argument("--min-treasures", type=int)
+    p.add_argument("--min-fairness", type=float)
+    p.add_argument("--max-guard-max", type=int)
+    return p
+
+
+def main(argv=None):
+    args = vars(build_arg_parser().parse_args(argv))
+    path, limit, order_by, descending = args.pop("catalog"), args.pop("limit"), args.pop("order_by"), args.pop("descending")
+    filters = {k: v for k, v in args.items() if v is not None}
+    with Catalog(path) as cat:
+        rows = cat.find(limit=limit, order_by=order_by, descending=descending, **filters)
+    for row in rows:
+        print(f"{row['path']}\t{row['map_style']}\tH{row['human_players']}/C{row['ai_players']}\t"
+              f"super {row['super_treasures']}\tfairness {row['fairness']}")
+    print(f"[OK] {len(rows)} templates")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
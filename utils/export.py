@@ -1,56 +1,50 @@
-import os
-import random
-import sys
 from datetime import datetime
+from functools import lru_cache
 
 from config import LINK_FIELDS, ZONE_FIELDS, NodeType
+from models.store import WorldStore
+from utils import instrumentation
+from utils.h3t_layout import get_layout, resource_path
+from utils.randomize import resolve_rng
 
-def resource_path(relative_path):
-    """Get absolute path to resource (works for dev and PyInstaller)."""
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, relative_path)
-    return os.path.join(os.path.abspath("."), relative_path)
+ROW_CHUNK = 1024             # rows formatted column-wise per chunk
+WRITE_BUFFER = 1024 * 1024   # output buffer size for write_h3t
 
-def generate_h3t_file(
+@lru_cache(maxsize=None)
+def _load_header(actual_source_path):
+    """Static header from the source file (read once per process)."""
+    with open(actual_source_path, "r", encoding="utf-8") as src:
+        return src.read().rstrip("\n") + "\n"
+
+def template_line(
         num_humans,
         num_ais,
-        source_path="h3t_source.h3t", 
-        output_path="output.h3t",
         map_style="default",
         disable_special_weeks=None,
         anarchy=None,
-        special_heroes=False
+        special_heroes=False,
+        rng=None,
+        source_path="h3t_source.h3t"
         ):
     """
-    Generates a full .h3t template file using:
-    - A static base template (h3t_source.h3t)
-    - Auto-generated template attributes appended as one TAB-separated line
+    Build the TAB-separated template attribute line (without newline).
+    Values are keyed by their header column and ordered by the source template layout.
     """
+    rng = resolve_rng(rng)
 
-    actual_source_path = resource_path(source_path)
-
-    # --------------------------------------------------------
-    # 1. Load static header from source file
-    # --------------------------------------------------------
-    with open(actual_source_path, "r", encoding="utf-8") as src:
-        base_content = src.read()
-
-    # --------------------------------------------------------
-    # 2. Compute dynamic values
-    # --------------------------------------------------------
     # Template pack / name
     today = datetime.now().strftime("%Y%m%d")
     template_pack_name = f"{today}_{map_style}_H{num_humans}_C{num_ais}"
     template_pack_dsc = "template generated using automation"
 
     # Randomized fields
-    zone_sparsness = round(random.uniform(0.8, 1.5), 3)  # float
+    zone_sparsness = round(rng.uniform(0.8, 1.5), 3)  # float
     if disable_special_weeks is None:
-        disable_special_weeks = random.choice(["", "x"])
+        disable_special_weeks = rng.choice(["", "x"])
     else:
         disable_special_weeks = 'x' if disable_special_weeks else ''
     if anarchy is None:
-        anarchy = random.choice(["", "x"])
+        anarchy = rng.choice(["", "x"])
     else:
         anarchy = 'x' if anarchy else ''
     if not special_heroes:
@@ -59,121 +53,207 @@ def generate_h3t_file(
         heroes = "+144 +145 +146 +147 +148 +149 +150 +151 +152 +153 +196 +197"
 
     # --------------------------------------------------------
-    # 3. Prepare attribute line (order EXACTLY as requested)
+    # Prepare attribute line, keyed by (header section, header column)
     # --------------------------------------------------------
-    values = [
-        12,                  # version
-        10,                  # val2
-        4,                   # val3
-        8,                   # val4
-        10,                  # val5
-        18,                  # val6
-        4,                   # val7
-        template_pack_name,  # template pack name
-        template_pack_dsc,   # template pack description
-        "",                  # available_castles
-        heroes,              # available_heroes
-        "",                  # mirror_template
-        "",                  # empty
-        100,                 # max_battle_rounds
-        "",                  # Disable hero hiring
-        template_pack_name,  # template_name
-        16,                  # min_size
-        99,                  # max_size
-        "",                  # available_artifacts
-        "+1 ",               # available_comb_artifacts
-        "",                  # available_spells
-        "",                  # available_secondary_skills
-        "-88 3",             # disable_objects
-        "",                  # rock_block_radius
-        zone_sparsness,      # zone_sparsness
-        disable_special_weeks,
-        "x",                 # allow_spell_research
-        anarchy
-    ]
+    values = {
+        # Field counts (number of columns per group)
+        ("Pack", "Town"): 12,
+        ("Pack", "Terrain"): 10,
+        ("Pack", "Zone type"): 4,
+        ("Pack", "Pack new"): 8,
+        ("Pack", "Map new"): 10,
+        ("Pack", "Zone new"): 18,
+        ("Pack", "Connection new"): 4,
+        # Pack options
+        ("Pack", "Name"): template_pack_name,
+        ("Pack", "Description"): template_pack_dsc,
+        ("Pack", "Town selection"): "",              # available_castles
+        ("Pack", "Heroes"): heroes,                  # available_heroes
+        ("Pack", "Mirror"): "",                      # mirror_template
+        ("Pack", "Tags"): "",
+        ("Pack", "Max Battle Rounds"): 100,
+        ("Pack", "Forbid Hiring Heroes"): "",
+        # Map
+        ("Map", "Name"): template_pack_name,         # template_name
+        ("Map", "Minimum Size"): 16,
+        ("Map", "Maximum Size"): 99,
+        ("Map", "Artifacts"): "",
+        ("Map", "Combo Arts"): "+1 ",
+        ("Map", "Spells"): "",
+        ("Map", "Secondary skills"): "",
+        ("Map", "Objects"): "-88 3",                 # disable_objects
+        ("Map", "Rock blocks"): "",                  # rock_block_radius
+        ("Map", "Zone sparseness"): zone_sparsness,
+        ("Map", "Special weeks disabled"): disable_special_weeks,
+        ("Map", "Spell Research"): "x",
+        ("Map", "Anarchy"): anarchy,
+    }
 
     # Convert everything to strings and join with TAB
-    attribute_line = "\t".join(str(v) for v in values)
+    return "\t".join(str(v) for v in get_layout(source_path).template_values(values))
+
+def generate_h3t_file(
+        num_humans,
+        num_ais,
+        source_path="h3t_source.h3t",
+        output_path="output.h3t",
+        map_style="default",
+        disable_special_weeks=None,
+        anarchy=None,
+        special_heroes=False,
+        rng=None
+        ):
+    """
+    Generates a full .h3t template file using:
+    - A static base template (h3t_source.h3t)
+    - Auto-generated template attributes appended as one TAB-separated line
+
+    Zone/link rows are appended later by export_to_h3t. write_h3t does both in one pass.
+    """
+    attribute_line = template_line(
+        num_humans, num_ais, map_style, disable_special_weeks, anarchy, special_heroes, rng, source_path
+    )
 
-    # --------------------------------------------------------
-    # 4. Write the final output file
-    # --------------------------------------------------------
     with open(output_path, "w", encoding="utf-8") as out:
-        out.write(base_content.rstrip("\n"))
-        out.write("\n")             # ensure separation
+        out.write(_load_header(resource_path(source_path)))  # static header, ends with newline
         out.write(attribute_line)   # append generated attributes
         out.write("\n")
 
     print(f"[OK] Generated {output_path}")
 
 
-def export_to_h3t(world, filename="generated_template.h3t"):
+def _zone_type_flags(node):
+    """Return the 4 'x' flags for START / NEUTRAL+TREASURE / JUNCTION."""
+    f1 = "x" if node.node_type == NodeType.START else ""
+    f2 = ""
+    f3 = "x" if node.node_type in (
+        NodeType.NEUTRAL, NodeType.TREASURE, NodeType.SUPER_TREASURE) else ""
+    f4 = "x" if node.node_type == NodeType.JUNCTION else ""
+    return f1, f2, f3, f4
+
+def _zone_rows(layout, nodes, zones, start):
+    """Zone part of the rows for nodes[start:start+len(nodes)], assembled column-wise."""
+    if not nodes:
+        return []
+    stop = start + len(nodes)
+
+    columns = [[str(n.id) for n in nodes]]
+    columns += zip(*(_zone_type_flags(n) for n in nodes))
+    columns += [
+        zones.formatted_column(k, start, stop, fmt)
+        for k, fmt in zip(ZONE_FIELDS, layout.zone_formatters)
+    ]
+    # leading blank template columns, then one slot per zone column
+    zone_prefix = layout.zone_prefix
+    return [zone_prefix + "\t".join(row) for row in zip(*columns)]
+
+def _link_rows(layout, links, store_links, start):
+    """Link part of the rows."""
+    if not links:
+        return []
+    stop = start + len(links)
+    columns = [
+        [str(l.node_a.id) for l in links],
+        [str(l.node_b.id) for l in links],
+    ]
+    columns += [
+        store_links.formatted_column(k, start, stop, fmt)
+        for k, fmt in zip(LINK_FIELDS, layout.link_formatters)
+    ]
+    return ["\t".join(row) for row in zip(*columns)]
+
+def iter_h3t_rows(world, chunk_size=ROW_CHUNK, source_path="h3t_source.h3t"):
     """
-    Export world graph to Heroes 3 .h3t-like tab-separated format.
+    Yield the zone/link rows of the world (without newline).
 
     Each row = zone entry (ID + 4 flags + attributes)
              + link entry (NodeA, NodeB, link parameters),
-    with absolutely ZERO tabs between the last zone field and the first link field.
+    placed in the columns given by the header of the source template.
+
+    Rows are assembled column-wise from the world's columnar attribute store
+    (built on the fly if the world has none or it is out of date), `chunk_size`
+    rows at a time, so memory stays flat for huge worlds.
     """
-    PRE_ZONE_TABS = 28
-    ZONE_FIELD_COUNT = 95  # total zone columns (id + 4 flags + attributes)
-
-    all_zones = list(world.nodes)
-    all_links = list(world.links)
-    lines = []
-
-    def pad(values, count):
-        """Pad or truncate to match column width."""
-        vals = ["" if (v is None or v == 0) else str(v) for v in values]
-        if len(vals) < count:
-            vals += [""] * (count - len(vals))
-        elif len(vals) > count:
-            vals = vals[:count]
-        return vals
-
-    def zone_type_flags(node):
-        """Return the 4 'x' flags for START / NEUTRAL+TREASURE / JUNCTION."""
-        f1 = "x" if node.node_type == NodeType.START else ""
-        f2 = ""
-        f3 = "x" if node.node_type in (
-            NodeType.NEUTRAL, NodeType.TREASURE, NodeType.SUPER_TREASURE) else ""
-        f4 = "x" if node.node_type == NodeType.JUNCTION else ""
-        return [f1, f2, f3, f4]
+    layout = get_layout(source_path)
+    all_zones = world.nodes
+    all_links = world.links
+
+    store = world.store
+    if store is None or not store.matches(world):
+        store = WorldStore.from_graph(world, bind=False)
 
+    blank_zone = layout.blank_zone
     total_lines = max(len(all_zones), len(all_links))
 
-    for i in range(total_lines):
-        # ---------------- ZONE SECTION ----------------
-        zone_cols = [""] * PRE_ZONE_TABS  # leading 28 blank columns
-
-        if i < len(all_zones):
-            node = all_zones[i]
-            node_prefix = [str(node.id)] + zone_type_flags(node)
-            zone_vals = [node.attributes.get(k, "") for k in ZONE_FIELDS]
-            zone_vals = pad(zone_vals, ZONE_FIELD_COUNT)
-            zone_cols += node_prefix + zone_vals
-        else:
-            zone_cols += [""] * (1 + 4 + ZONE_FIELD_COUNT)
-
-        # Join the zone part separately
-        zone_str = "\t".join(zone_cols)
-
-        # ---------------- LINK SECTION ----------------
-        link_str = ""
-        if i < len(all_links):
-            link = all_links[i]
-            link_prefix = [str(link.node_a.id), str(link.node_b.id)]
-            link_vals = [link.attributes.get(k, "") for k in LINK_FIELDS]
-            link_vals = pad(link_vals, len(LINK_FIELDS))
-            # Join link part (do NOT prefix with a tab)
-            link_str = "\t".join(link_prefix + link_vals)
-
-        # ✅ Concatenate directly — no tab between zone and link parts
-        line = zone_str + link_str
-        lines.append(line)
-
-    with open(filename, "a", encoding="utf-8") as f:
-        f.write("\n".join(lines) + "\n")
+    for start in range(0, total_lines, chunk_size):
+        stop = min(start + chunk_size, total_lines)
+        zone_rows = _zone_rows(layout, all_zones[start:stop], store.zones, start)
+        link_rows = _link_rows(layout, all_links[start:stop], store.links, start)
+        zone_rows += [blank_zone] * (stop - start - len(zone_rows))
+        link_rows += [""] * (stop - start - len(link_rows))
+
+        for zone_str, link_str in zip(zone_rows, link_rows):
+            yield zone_str + "\t" + link_str
+
+def _write_rows(world, out, source_path="h3t_source.h3t"):
+    count = 0
+    for line in iter_h3t_rows(world, source_path=source_path):
+        out.write(line)
+        out.write("\n")
+        count += 1
+    return count
+
+def _write_template(world, out, header, attribute_line, source_path):
+    with instrumentation.stage("header"):
+        out.write(header)
+        out.write(attribute_line)
+        out.write("\n")
+    with instrumentation.stage("export"):
+        return _write_rows(world, out, source_path)
+
+def export_to_h3t(world, filename="generated_template.h3t"):
+    """
+    Export world graph to Heroes 3 .h3t-like tab-separated format,
+    appending the zone/link rows to a file created by generate_h3t_file.
+    """
+    with open(filename, "a", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        lines_written = _write_rows(world, f)
 
     print(f"[OK] Exported world to {filename}")
-    print(f"Zones: {len(all_zones)} | Links: {len(all_links)} | Lines written: {len(lines)}")
+    print(f"Zones: {len(world.nodes)} | Links: {len(world.links)} | Lines written: {lines_written}")
+
+def write_h3t(
+        world,
+        output,
+        num_humans,
+        num_ais,
+        source_path="h3t_source.h3t",
+        map_style="default",
+        disable_special_weeks=None,
+        anarchy=None,
+        special_heroes=False,
+        rng=None
+        ):
+    """
+    Write a complete .h3t template in a single pass:
+    static header, template attribute line, then the zone/link rows streamed
+    through one buffered writer.
+
+    output: file path, or any text file-like object with write().
+    Returns the number of zone/link rows written.
+    """
+    with instrumentation.stage("header"):
+        attribute_line = template_line(
+            num_humans, num_ais, map_style, disable_special_weeks, anarchy, special_heroes, rng, source_path
+        )
+        header = _load_header(resource_path(source_path))
+
+    if hasattr(output, "write"):
+        return _write_template(world, output, header, attribute_line, source_path)
+
+    with open(output, "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+        lines_written = _write_template(world, out, header, attribute_line, source_path)
+
+    print(f"[OK] Generated {output}")
+    print(f"Zones: {len(world.nodes)} | Links: {len(world.links)} | Lines written: {lines_written}")
+    return lines_written
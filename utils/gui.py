@@ -2,8 +2,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import random
 from datetime import datetime
+from utils.instrumentation import recording_from_env
 from utils.run_pipeline import run_generation_pipeline
-from config import MANUAL_OVERRIDES
 from models.map_graph import generate_world
 from models.objects import NodeType
 
@@ -192,45 +192,47 @@ class WorldGeneratorGUI(tk.Tk):
             if num_humans + num_ai > 8:
                 raise ValueError("Total players cannot exceed 8.")
 
-            start_zones = self.start_zones.get() or random.randint(3, 5)
-            main_zones = self.main_zones.get() or random.randint(4, 7)
-
-            joining_raw = int(self.joining_percent.get()[0])
-            if joining_raw == 4:
-                joining_raw = random.randint(0, 3)
-
-            MANUAL_OVERRIDES.update({
-                "joining_percent": joining_raw,
-                "join_only_for_money": self.join_money.get()
-            })
-
-            world = generate_world(
-                num_human_players=num_humans,
-                num_ai_players=num_ai,
-                ai_difficulty_mode=self.ai_difficulty.get(),
-                map_style=self.map_style.get(),
-                main_zone_nodes=main_zones,
-                player_zone_nodes=start_zones,
-                avg_links_main=2,
-                avg_links_player=2,
-                num_same_towns_in_start=self.same_towns.get(),
-                num_diff_towns_in_start=self.diff_towns.get(),
-                ai_placement_mode=self.ai_placement.get(),
-            )
-
-            today = datetime.now().strftime("%Y%m%d")
-            template_file = f"{today}_{self.map_style.get()}_H{num_humans}_{num_ai}CP.h3t"
-
-            run_generation_pipeline(
-                template_filename=template_file,
-                map_style=self.map_style.get(),
-                human_players=num_humans,
-                ai_players=num_ai,
-                disable_special_weeks=self.disable_weeks.get(),
-                anarchy=self.anarchy.get(),
-                world=world,
-                heroes=self.special_heroes.get(),
-            )
+            with recording_from_env():
+                start_zones = self.start_zones.get() or random.randint(3, 5)
+                main_zones = self.main_zones.get() or random.randint(4, 7)
+
+                joining_raw = int(self.joining_percent.get()[0])
+                if joining_raw == 4:
+                    joining_raw = random.randint(0, 3)
+
+                overrides = {
+                    "joining_percent": joining_raw,
+                    "join_only_for_money": self.join_money.get()
+                }
+
+                world = generate_world(
+                    num_human_players=num_humans,
+                    num_ai_players=num_ai,
+                    ai_difficulty_mode=self.ai_difficulty.get(),
+                    map_style=self.map_style.get(),
+                    main_zone_nodes=main_zones,
+                    player_zone_nodes=start_zones,
+                    avg_links_main=2,
+                    avg_links_player=2,
+                    num_same_towns_in_start=self.same_towns.get(),
+                    num_diff_towns_in_start=self.diff_towns.get(),
+                    ai_placement_mode=self.ai_placement.get(),
+                    overrides=overrides,
+                )
+
+                today = datetime.now().strftime("%Y%m%d")
+                template_file = f"{today}_{self.map_style.get()}_H{num_humans}_{num_ai}CP.h3t"
+
+                run_generation_pipeline(
+                    template_filename=template_file,
+                    map_style=self.map_style.get(),
+                    human_players=num_humans,
+                    ai_players=num_ai,
+                    disable_special_weeks=self.disable_weeks.get(),
+                    anarchy=self.anarchy.get(),
+                    world=world,
+                    heroes=self.special_heroes.get(),
+                )
 
             messagebox.showinfo(
                 "Success",
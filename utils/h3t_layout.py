@@ -0,0 +1,136 @@
+import os
+import sys
+from functools import lru_cache
+
+from config import LINK_FIELDS, ZONE_FIELDS
+from models.store import format_value
+
+# Section names in the first header row of h3t_source.h3t
+TEMPLATE_SECTIONS = ("Pack", "Map")
+ZONE_SECTION = "Zone"
+LINK_SECTION = "Connections"
+
+ZONE_PREFIX_COLUMNS = 5   # Id + 4 zone type flags
+LINK_PREFIX_COLUMNS = 2   # Zone 1, Zone 2
+
+# Zone fields that always export as an empty column, whatever their value
+BLANK_ZONE_FIELDS = {"blank_before_ui"}
+
+# Repeated column groups in the header and the ZONE_FIELDS entries they hold
+GROUP_FIELD_PREFIXES = {
+    "Town types": "allowed_castle_",
+}
+
+
+def _blank(value):
+    return ""
+
+
+def resource_path(relative_path):
+    """Get absolute path to resource (works for dev and PyInstaller)."""
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.join(os.path.abspath("."), relative_path)
+
+
+class H3tLayout:
+    """
+    Column layout of an .h3t file, compiled from the header rows of the source template.
+
+    Every data row is: template columns (only used by the template line),
+    zone columns (Id, 4 type flags, ZONE_FIELDS) and link columns (Zone 1, Zone 2, LINK_FIELDS).
+    The layout is validated against ZONE_FIELDS / LINK_FIELDS, so schema drift fails
+    here instead of silently shifting columns in the exported file.
+    """
+
+    def __init__(self, header_rows):
+        if len(header_rows) < 3:
+            raise ValueError("h3t header must have 3 rows (sections, groups, column names)")
+        width = max(len(r) for r in header_rows)
+        sections, groups, names = (self._fill(r, width) for r in header_rows[:3])
+
+        # (section, group, name) for every column; section/group names span until the next one
+        self.columns = []
+        section = group = ""
+        for sec, grp, name in zip(sections, groups, names):
+            if sec.strip():
+                section, group = sec.strip(), ""
+            if grp.strip():
+                group = grp.strip()
+            self.columns.append((section, group, name.strip()))
+        # trailing cells without a column name (e.g. a trailing tab) are not columns
+        while self.columns and not self.columns[-1][2]:
+            self.columns.pop()
+
+        self.zone_start = self._section_start(ZONE_SECTION)
+        self.link_start = self._section_start(LINK_SECTION)
+
+        self.template_columns = [(s, n) for s, _, n in self.columns[:self.zone_start]]
+        self.zone_columns = self.columns[self.zone_start:self.link_start]
+        self.link_columns = self.columns[self.link_start:]
+
+        self._validate()
+
+        # Precompiled pieces of a row
+        self.zone_prefix = "\t" * self.zone_start            # blank template columns
+        self.blank_zone = "\t" * (self.link_start - 1)        # zone part of a row without a zone
+        self.zone_formatters = tuple(
+            _blank if f in BLANK_ZONE_FIELDS else format_value for f in ZONE_FIELDS
+        )
+        self.link_formatters = tuple(format_value for _ in LINK_FIELDS)
+
+    @staticmethod
+    def _fill(row, width):
+        return list(row) + [""] * (width - len(row))
+
+    def _section_start(self, section):
+        for i, (sec, _, _) in enumerate(self.columns):
+            if sec == section:
+                return i
+        raise ValueError(f"h3t header has no '{section}' section")
+
+    def _validate(self):
+        zone_fields = len(self.zone_columns) - ZONE_PREFIX_COLUMNS
+        if zone_fields != len(ZONE_FIELDS):
+            raise ValueError(
+                f"h3t header has {zone_fields} zone attribute columns, "
+                f"ZONE_FIELDS defines {len(ZONE_FIELDS)}"
+            )
+        link_fields = len(self.link_columns) - LINK_PREFIX_COLUMNS
+        if link_fields != len(LINK_FIELDS):
+            raise ValueError(
+                f"h3t header has {link_fields} link attribute columns, "
+                f"LINK_FIELDS defines {len(LINK_FIELDS)}"
+            )
+        for group, prefix in GROUP_FIELD_PREFIXES.items():
+            in_header = sum(1 for _, g, _ in self.zone_columns if g == group)
+            in_fields = sum(1 for f in ZONE_FIELDS if f.startswith(prefix))
+            if in_header != in_fields:
+                raise ValueError(
+                    f"h3t header group '{group}' has {in_header} columns, "
+                    f"ZONE_FIELDS has {in_fields} '{prefix}*' fields"
+                )
+
+    def template_values(self, values):
+        """
+        Order template line values by the header.
+        values: dict keyed by (section, column name), e.g. ("Map", "Name").
+        """
+        missing = [c for c in self.template_columns if c not in values]
+        unknown = [k for k in values if k not in self.template_columns]
+        if missing or unknown:
+            raise ValueError(f"template line does not match h3t header: missing {missing}, unknown {unknown}")
+        return [values[c] for c in self.template_columns]
+
+
+def parse_header(lines):
+    """Split the first 3 header lines into cells."""
+    return [line.rstrip("\r\n").split("\t") for line in lines[:3]]
+
+
+@lru_cache(maxsize=None)
+def get_layout(source_path="h3t_source.h3t"):
+    """Compiled layout of the source template (parsed once per process)."""
+    with open(resource_path(source_path), "r", encoding="utf-8") as src:
+        lines = [src.readline() for _ in range(3)]
+    return H3tLayout(parse_header(lines))
@@ -0,0 +1,175 @@
+from functools import lru_cache
+
+from config import LINK_FIELDS, ZONE_FIELDS
+from models.objects import Graph, Node, NodeType
+from utils.h3t_layout import LINK_SECTION, ZONE_SECTION, H3tLayout, get_layout, parse_header
+
+# ──────────────────────────────────────────────
+# .h3t reader
+# ──────────────────────────────────────────────
+# Streams a template written by write_h3t / export_to_h3t back into a Graph:
+# the 3 header rows give the column layout, the 4th line holds the template
+# values, every further row carries (optionally) one zone and one connection.
+#
+# Attribute values are converted back to int where possible; empty cells are
+# left out of the attributes (the exporter writes None / 0 / missing as empty),
+# so iter_h3t_rows(read_h3t(path)[0]) reproduces the rows of the file.
+# Not stored in the file and therefore not restored: Link.is_player_to_main
+# and the owner of non-START zones.
+
+# Zone type inference from the 4 type flags (START / - / treasure / junction);
+# the treasure flag covers 3 types, told apart by the jittered treasure1_low
+# ranges of treasure_attributes: NEUTRAL 400-600, TREASURE 2400-3600,
+# SUPER_TREASURE 8000-12000.
+TREASURE_MIN_T1_LOW = 2000
+SUPER_TREASURE_MIN_T1_LOW = 8000
+
+# Zone columns (the 2 Bulwark town columns) missing from the header of files
+# written before the header was compiled from ZONE_FIELDS
+LEGACY_MISSING_ZONE_COLUMNS = 2
+
+
+def _cell(text):
+    """Cell text -> int if it is one, else the text itself."""
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def _template_cell(text):
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+@lru_cache(maxsize=16)
+def _layout_for(header_lines):
+    """
+    Layouts are compiled once per distinct header (all files of a batch share one).
+
+    Files written before the header listed the Bulwark columns have 2 zone columns
+    fewer in the header than in their rows; their rows already use the current
+    layout, so such legacy headers are read with the layout of the source template.
+    """
+    rows = parse_header(list(header_lines))
+    try:
+        return H3tLayout(rows)
+    except ValueError as e:
+        current = get_layout()
+        if not _is_legacy_header(rows, current):
+            raise
+        print(f"[WARN] {e} - older h3t header, reading the rows with the current column layout")
+        return current
+
+
+def _is_legacy_header(rows, layout):
+    """Header of `layout` without the Bulwark zone columns (template and link columns unchanged)."""
+    if len(rows) < 3:
+        return False
+    sections, _, names = rows[:3]
+    names = [name.strip() for name in names]
+    link_start = layout.link_start - LEGACY_MISSING_ZONE_COLUMNS
+    return (
+        len(sections) > link_start
+        and sections[layout.zone_start].strip() == ZONE_SECTION
+        and sections[link_start].strip() == LINK_SECTION
+        and names[:layout.zone_start] == [name for _, name in layout.template_columns]
+        and names[link_start:link_start + len(layout.link_columns)] == [name for _, _, name in layout.link_columns]
+    )
+
+
+def _infer_node_type(flags, attrs):
+    start, _, treasure, junction = flags
+    if start == "x":
+        return NodeType.START
+    if junction == "x":
+        return NodeType.JUNCTION
+    if treasure == "x":
+        t1_low = attrs.get("treasure1_low", 0)
+        if t1_low >= SUPER_TREASURE_MIN_T1_LOW:
+            return NodeType.SUPER_TREASURE
+        if t1_low >= TREASURE_MIN_T1_LOW:
+            return NodeType.TREASURE
+        return NodeType.NEUTRAL
+    return None
+
+
+def _parse_zone(cells):
+    """cells = Id, 4 flags, ZONE_FIELDS values. Returns a Node or None for an empty zone part."""
+    if not cells or not cells[0]:
+        return None
+    attrs = {k: _cell(v) for k, v in zip(ZONE_FIELDS, cells[5:]) if v}
+    node_type = _infer_node_type(cells[1:5], attrs)
+    owner = attrs.get("player_control") if node_type == NodeType.START else None
+    node = Node(int(cells[0]), node_type=node_type, owner=owner or None, is_start=node_type == NodeType.START)
+    node.attributes = attrs
+    return node
+
+
+def _parse_link(cells):
+    """cells = Zone 1, Zone 2, LINK_FIELDS values. Returns (id_a, id_b, attrs) or None."""
+    if len(cells) < 2 or not cells[0]:
+        return None
+    attrs = {k: _cell(v) for k, v in zip(LINK_FIELDS, cells[2:]) if v}
+    return int(cells[0]), int(cells[1]), attrs
+
+
+def parse_h3t(lines):
+    """
+    Parse .h3t lines (any iterable of str, e.g. an open file) into (world, template).
+
+    world:    Graph with Nodes/Links rebuilt from the zone and connection columns
+    template: {(section, column name): value} from the template line, e.g. ("Map", "Name")
+    """
+    lines = iter(lines)
+    header = tuple(next(lines, "") for _ in range(3))
+    layout = _layout_for(header)
+    zone_start, link_start = layout.zone_start, layout.link_start
+
+    template_cells = next(lines, "").rstrip("\r\n").split("\t")
+    template = {
+        column: _template_cell(v)
+        for column, v in zip(layout.template_columns, template_cells + [""] * len(layout.template_columns))
+    }
+
+    world = Graph()
+    pending_links = []    # links may name zones defined on later rows
+    for line in lines:
+        cells = line.rstrip("\r\n").split("\t")
+        node = _parse_zone(cells[zone_start:link_start])
+        if node is not None:
+            world.add_node(node)
+        link = _parse_link(cells[link_start:])
+        if link is not None:
+            pending_links.append(link)
+
+    nodes = {n.id: n for n in world.nodes}
+    for id_a, id_b, attrs in pending_links:
+        a, b = nodes.get(id_a), nodes.get(id_b)
+        if a is None or b is None:
+            raise ValueError(f"connection {id_a}-{id_b} refers to a zone that is not in the file")
+        if world.link_count(a, b) >= 2:
+            print(f"[WARN] more than 2 connections between {id_a} and {id_b} - extra one skipped")
+            continue
+        link = world.add_link(a, b, allow_double=True)
+        link.attributes = attrs
+    return world, template
+
+
+def read_h3t(path):
+    """Read one .h3t file into (world, template), streaming it line by line."""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_h3t(f)
+
+
+def iter_h3t_files(paths):
+    """Yield (path, world, template) for many files, one file in memory at a time."""
+    for path in paths:
+        world, template = read_h3t(path)
+        yield path, world, template
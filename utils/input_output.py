@@ -2,7 +2,6 @@ import math
 import random
 from datetime import datetime
 
-from config import MANUAL_OVERRIDES
 from models.map_graph import generate_world
 from models.objects import NodeType
 
@@ -218,11 +217,11 @@ def build_world_interactive():
         default=True
     )
 
-    # Store overrides used later by zone/link generation
-    MANUAL_OVERRIDES.update({
+    # Overrides used by zone generation
+    overrides = {
         "joining_percent": joining_percent,
         "join_only_for_money": join_only_for_money
-    })
+    }
 
     # 10) Generate the world
     world = generate_world(
@@ -237,6 +236,7 @@ def build_world_interactive():
         num_same_towns_in_start=num_same_towns_in_start,
         num_diff_towns_in_start=num_diff_towns_in_start,
         ai_placement_mode=ai_placement_mode,
+        overrides=overrides,
     )
 
     # Debug output for AI nodes
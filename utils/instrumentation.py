@@ -0,0 +1,217 @@
+import contextlib
+import functools
+import json
+import os
+import time
+
+# ──────────────────────────────────────────────
+# Opt-in instrumentation
+# ──────────────────────────────────────────────
+# `recorder` is None unless a recording() block is active, and every hook checks
+# that first - so with instrumentation off the cost is one global lookup.
+#
+#     with recording() as rec:
+#         world = generate_world(...)
+#         write_h3t(world, ...)
+#     write_report(rec.report(), "perf.json")
+#
+# Hot paths count with:
+#     if instrumentation.recorder is not None:
+#         instrumentation.recorder.count("graph.add_link")
+
+ENV_VAR = "H3T_INSTRUMENT"   # report path; enables recording for GUI/CLI runs
+
+recorder = None
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class Recorder:
+    """
+    Collects per-stage wall/CPU time and named counters for one run.
+    Stages may nest; 'self' times exclude nested stages.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._stack = []
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def begin(self, name):
+        self._stack.append([name, time.perf_counter(), time.process_time(), 0.0, 0.0])
+
+    def end(self):
+        name, wall0, cpu0, child_wall, child_cpu = self._stack.pop()
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        if self._stack:
+            parent = self._stack[-1]
+            parent[3] += wall
+            parent[4] += cpu
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "self_wall_s": 0.0, "self_cpu_s": 0.0}
+        s["calls"] += 1
+        s["wall_s"] += wall
+        s["cpu_s"] += cpu
+        s["self_wall_s"] += wall - child_wall
+        s["self_cpu_s"] += cpu - child_cpu
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def report(self):
+        """JSON-serialisable summary of the run (times in milliseconds)."""
+        return {
+            "wall_ms": _ms(time.perf_counter() - self._started),
+            "cpu_ms": _ms(time.process_time() - self._cpu_started),
+            "stages": {
+                name: {
+                    "calls": s["calls"],
+                    "wall_ms": _ms(s["wall_s"]),
+                    "cpu_ms": _ms(s["cpu_s"]),
+                    "self_wall_ms": _ms(s["self_wall_s"]),
+                    "self_cpu_ms": _ms(s["self_cpu_s"]),
+                }
+                for name, s in self.stages.items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+@contextlib.contextmanager
+def recording():
+    """Enable instrumentation for the block; yields the Recorder."""
+    global recorder
+    previous = recorder
+    recorder = Recorder()
+    try:
+        yield recorder
+    finally:
+        recorder = previous
+
+
+def stage(name):
+    """Context manager timing a stage if recording, a shared no-op otherwise."""
+    if recorder is None:
+        return _NULL_CONTEXT
+    return recorder.stage(name)
+
+
+class _Laps:
+    """Consecutive stages: each call ends the previous stage and starts the next."""
+
+    def __init__(self, rec):
+        self._rec = rec
+        self._open = False
+
+    def __call__(self, name):
+        if self._open:
+            self._rec.end()
+        self._rec.begin(name)
+        self._open = True
+
+    def done(self):
+        if self._open:
+            self._rec.end()
+            self._open = False
+
+
+class _NullLaps:
+    def __call__(self, name):
+        pass
+
+    def done(self):
+        pass
+
+
+_NULL_LAPS = _NullLaps()
+
+
+def laps():
+    """
+    Time a function as a sequence of stages without re-indenting it:
+        lap = laps(); lap("a"); ...; lap("b"); ...; lap.done()
+    """
+    if recorder is None:
+        return _NULL_LAPS
+    return _Laps(recorder)
+
+
+def timed(name):
+    """Decorator timing every call of a function as stage `name` while recording."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rec = recorder
+            if rec is None:
+                return func(*args, **kwargs)
+            rec.begin(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                rec.end()
+        return wrapper
+    return decorator
+
+
+# ──────────────────────────────────────────────
+# Reports
+# ──────────────────────────────────────────────
+
+def aggregate(reports):
+    """Sum stage times/calls and counters over several run reports (e.g. one batch)."""
+    total = {"runs": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "stages": {}, "counters": {}}
+    for r in reports:
+        total["runs"] += 1
+        total["wall_ms"] += r["wall_ms"]
+        total["cpu_ms"] += r["cpu_ms"]
+        for name, s in r["stages"].items():
+            t = total["stages"].setdefault(name, dict.fromkeys(s, 0))
+            for k, v in s.items():
+                t[k] += v
+        for name, v in r["counters"].items():
+            total["counters"][name] = total["counters"].get(name, 0) + v
+
+    runs = total["runs"] or 1
+    total["mean_wall_ms"] = round(total["wall_ms"] / runs, 3)
+    total["stages"] = {
+        name: {**{k: round(v, 3) for k, v in s.items()}, "mean_wall_ms": round(s["wall_ms"] / runs, 3)}
+        for name, s in sorted(total["stages"].items(), key=lambda kv: -kv[1]["self_wall_ms"])
+    }
+    total["counters"] = dict(sorted(total["counters"].items()))
+    total["wall_ms"] = round(total["wall_ms"], 3)
+    total["cpu_ms"] = round(total["cpu_ms"], 3)
+    return total
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[OK] Instrumentation report saved to {path}")
+
+
+@contextlib.contextmanager
+def recording_from_env():
+    """Record the block and write the report to $H3T_INSTRUMENT, if that is set."""
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        yield None
+        return
+    with recording() as rec:
+        yield rec
+    write_report(rec.report(), path)
@@ -1,13 +1,48 @@
+import hashlib
 import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 
+try:
+    import numpy as np
+except ImportError:  # optional - only WeightedSampler.draw_array needs it
+    np = None
 
-def random_bool(chance):
+# ──────────────────────────────────────────────
+# Generator context
+# ──────────────────────────────────────────────
+# Every generator function takes an optional `rng` argument - a random.Random
+# instance owned by the caller. When it's None the module-global `random` is
+# used, so interactive/GUI runs behave exactly like before.
+
+def make_rng(seed=None):
+    """Create an independent generator context for one world."""
+    return random.Random(seed)
+
+def resolve_rng(rng=None):
+    """Return the generator to draw from (module-global random if rng is None)."""
+    return random if rng is None else rng
+
+def derive_seed(seed, *path):
+    """
+    Derive a child seed from a parent seed and a spawn path (SeedSequence-style).
+    derive_seed(s, 3) is the seed of the 4th child of s, derive_seed(s, 3, 0) its first grandchild.
+    """
+    digest = hashlib.blake2b(repr((seed, *path)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def spawn_seeds(seed, count):
+    """Return `count` independent child seeds of `seed`."""
+    return [derive_seed(seed, i) for i in range(count)]
+
+
+def random_bool(chance, rng=None):
     """Return True with given probability (0.0–1.0)."""
-    return random.random() < chance
+    return resolve_rng(rng).random() < chance
 
-def random_choice_weighted(options):
-    """Random weighted choice: expects list of (value, probability)."""
-    r = random.random()
+def random_choice_weighted(options, rng=None):
+    """Random weighted choice: expects list of (value, probability). For repeated draws use WeightedSampler."""
+    r = resolve_rng(rng).random()
     cumulative = 0
     for value, prob in options:
         cumulative += prob
@@ -15,10 +50,10 @@ def random_choice_weighted(options):
             return value
     return options[-1][0]  # fallback
 
-def weighted_choice(weights):
-    """Return index (1-based) according to weight distribution list."""
+def weighted_choice(weights, rng=None):
+    """Return index (1-based) according to weight distribution list. For repeated draws use WeightedSampler.from_weights."""
     total = sum(weights)
-    r = random.uniform(0, total)
+    r = resolve_rng(rng).uniform(0, total)
     upto = 0
     for i, w in enumerate(weights, start=1):
         if upto + w >= r:
@@ -26,18 +61,92 @@ def weighted_choice(weights):
         upto += w
     return len(weights)
 
-def jitter(value, pct=0.2):
+# ──────────────────────────────────────────────
+# Precomputed weighted sampler
+# ──────────────────────────────────────────────
+
+class WeightedSampler:
+    """
+    Weighted choice over fixed options: cumulative table built once, bisect per draw.
+    Draws consume the generator exactly like the scalar helpers they replace
+    (one rng.random() / rng.uniform() per draw), so seeded results are unchanged.
+
+        WeightedSampler([(value, probability), ...])       -> random_choice_weighted
+        WeightedSampler.from_weights([w1, w2, ...])         -> weighted_choice (values 1..n)
+        WeightedSampler.ladder(values, thresholds)          -> 'if roll < t1 ... elif roll < t2 ... else'
+    """
+    __slots__ = ("values", "cumulative", "side", "scale")
+
+    def __init__(self, options, side="left", scale=None):
+        self.values = [v for v, _ in options]
+        self.cumulative = list(accumulate(p for _, p in options))
+        self.side = side        # "left": r <= cumulative, "right": r < threshold
+        self.scale = scale      # None: r = random(), else r = uniform(0, scale)
+
+    @classmethod
+    def from_weights(cls, weights, values=None):
+        """weighted_choice semantics: r = uniform(0, sum(weights)), returns values (default 1..n)."""
+        if values is None:
+            values = range(1, len(weights) + 1)
+        return cls(list(zip(values, weights)), scale=sum(weights))
+
+    @classmethod
+    def ladder(cls, values, thresholds):
+        """values[i] for the first thresholds[i] with roll < thresholds[i], values[-1] otherwise."""
+        if len(values) != len(thresholds) + 1:
+            raise ValueError("ladder needs exactly one more value than thresholds")
+        sampler = cls([], side="right")
+        sampler.values = list(values)
+        sampler.cumulative = list(thresholds)
+        return sampler
+
+    def index(self, r):
+        """Index of the option selected by the uniform draw r."""
+        if self.side == "left":
+            i = bisect_left(self.cumulative, r)
+        else:
+            i = bisect_right(self.cumulative, r)
+        return i if i < len(self.values) else len(self.values) - 1   # fallback: last option
+
+    def draw(self, rng=None):
+        rng = resolve_rng(rng)
+        r = rng.random() if self.scale is None else rng.uniform(0, self.scale)
+        return self.values[self.index(r)]
+
+    def draw_many(self, k, rng=None):
+        """k independent draws (same stream as k calls of draw)."""
+        rng = resolve_rng(rng)
+        values, index = self.values, self.index
+        if self.scale is None:
+            return [values[index(rng.random())] for _ in range(k)]
+        scale = self.scale
+        return [values[index(rng.uniform(0, scale))] for _ in range(k)]
+
+    def draw_array(self, gen, n):
+        """n draws from a numpy.random.Generator (bulk path, NumPy required). Returns a list."""
+        if np is None:
+            raise ImportError("WeightedSampler.draw_array requires NumPy; use draw_many instead")
+        r = gen.random(n)
+        if self.scale is not None:
+            r = r * self.scale
+        idx = np.minimum(np.searchsorted(self.cumulative, r, side=self.side), len(self.values) - 1)
+        values = self.values
+        return [values[i] for i in idx.tolist()]
+
+
+def jitter(value, pct=0.2, rng=None):
     """Return value randomly adjusted by ±pct, keeping it integer."""
     low = int(value * (1 - pct))
     high = int(value * (1 + pct))
-    return random.randint(low, high)
+    return resolve_rng(rng).randint(low, high)
 
-def pick_random_subset(options, chance_per_item, max_total=None):
+def pick_random_subset(options, chance_per_item, max_total=None, rng=None):
     """Return dict of {option: 0 or 1} with chance per item, optionally limited by max_total."""
+    rng = resolve_rng(rng)
     chosen = []
     for o in options:
-        if random.random() < chance_per_item:
+        if rng.random() < chance_per_item:
             chosen.append(o)
     if max_total and len(chosen) > max_total:
-        chosen = random.sample(chosen, max_total)
+        chosen = rng.sample(chosen, max_total)
     return {o: 1 if o in chosen else 0 for o in options}
\ No newline at end of file
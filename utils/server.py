@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qsl, urlsplit
+
+from models.constraints import ConstraintsNotMet
+from utils.batch import DEFAULT_PARAMS, render_template
+
+# ──────────────────────────────────────────────
+# Local template service
+# ──────────────────────────────────────────────
+# GET /template?map_style=balanced&human_players=2&ai_players=2&seed=42
+#     -> the .h3t file, streamed with chunked transfer encoding
+# GET /health
+#     -> {"status": "ok", "pending": <jobs in flight>, "capacity": <max jobs>}
+#
+# Query parameters are the GUI fields (same names as DEFAULT_PARAMS), plus an
+# optional `seed` - the same params and seed always return the same template.
+# Generation runs in a bounded process pool; when `capacity` jobs are already
+# in flight new requests are rejected with 503 instead of queueing forever.
+# Invalid parameters get 400, constraints no candidate met within max_attempts 422.
+
+STREAM_CHUNK = 64 * 1024
+MAX_REQUEST_LINE = 8192
+
+# Allowed values of the choice fields (same as the GUI combo boxes)
+PARAM_CHOICES = {
+    "map_style": ("random", "balanced"),
+    "ai_difficulty": ("normal", "hard", "unfair", "random"),
+    "ai_placement": ("main", "start", "both", "random"),
+    "joining_percent": (0, 1, 2, 3, 4),
+}
+
+# Upper bounds of the numeric fields (zone counts as in the GUI spin boxes), so one
+# request cannot tie up a worker with a huge world or an endless retry loop
+PARAM_LIMITS = {
+    "start_zones": 10,
+    "main_zones": 10,
+    "same_towns": 10,
+    "diff_towns": 10,
+    "max_attempts": 1000,
+}
+
+TRUE_VALUES = ("1", "true", "yes", "on", "x")
+FALSE_VALUES = ("0", "false", "no", "off", "")
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+def parse_params(query):
+    """
+    Turn query string pairs into generator params + seed.
+    Values are converted to the type of the DEFAULT_PARAMS entry; raises ValueError on bad input.
+    """
+    params = dict(DEFAULT_PARAMS)
+    seed = None
+    for key, raw in parse_qsl(query, keep_blank_values=True):
+        if key == "seed":
+            seed = int(raw)
+            continue
+        if key not in DEFAULT_PARAMS:
+            raise ValueError(f"unknown parameter '{key}'")
+
+        default = DEFAULT_PARAMS[key]
+        if isinstance(default, bool):
+            value = raw.strip().lower()
+            if value not in TRUE_VALUES + FALSE_VALUES:
+                raise ValueError(f"'{key}' must be a boolean")
+            params[key] = value in TRUE_VALUES
+        elif isinstance(default, int):
+            params[key] = int(raw)
+            if params[key] < 0:
+                raise ValueError(f"'{key}' cannot be negative")
+            limit = PARAM_LIMITS.get(key)
+            if limit is not None and params[key] > limit:
+                raise ValueError(f"'{key}' cannot exceed {limit}")
+        else:
+            params[key] = raw
+
+        choices = PARAM_CHOICES.get(key)
+        if choices is not None and params[key] not in choices:
+            raise ValueError(f"'{key}' must be one of {', '.join(str(c) for c in choices)}")
+
+    # Same limits as generate_world, checked here so bad input is a 400, not a failed job
+    if params["human_players"] < 1:
+        raise ValueError("At least one human player is required.")
+    if params["human_players"] + params["ai_players"] > 8:
+        raise ValueError("Total players cannot exceed 8.")
+    if params["max_attempts"] < 1:
+        raise ValueError("'max_attempts' must be at least 1")
+    # random style: every start area links to 2 distinct zones of the shared main area
+    if params["map_style"] == "random" and 0 < params["main_zones"] * params["human_players"] < 2:
+        raise ValueError("random maps need at least 2 main zones in total (main_zones * human_players)")
+
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    return params, seed
+
+
+def _render_job(params, seed):
+    """
+    Worker entry point: render one template, silencing the generator debug output.
+    The world is validated like in batch mode, so a broken template is never served.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return render_template(params, seed, validate=True)
+
+
+def _template_name(params, seed):
+    today = datetime.now().strftime("%Y%m%d")
+    return f"{today}_{params['map_style']}_H{params['human_players']}_{params['ai_players']}CP_{seed:x}.h3t"
+
+
+class TemplateServer:
+    """
+    asyncio HTTP/1.1 front end for the generator.
+
+    workers:   size of the process pool doing the CPU work
+    capacity:  max jobs in flight (running + waiting for a worker); beyond that -> 503
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, workers=None, capacity=None, executor=None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = capacity or self.workers * 2
+        self.pending = 0
+        self._executor = executor
+        self._own_executor = executor is None
+        self._server = None
+
+    # ----- lifecycle -----
+
+    async def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # port=0 picks a free port - report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"[SERVER] http://{self.host}:{self.port}/template  (workers {self.workers}, capacity {self.capacity})")
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None and self._own_executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    # ----- request handling -----
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line or len(request_line) > MAX_REQUEST_LINE:
+                return
+            # Skip headers (no request body is accepted)
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            try:
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            except ValueError:
+                await self._send_json(writer, 400, {"error": "malformed request line"})
+                return
+            if method != "GET":
+                await self._send_json(writer, 405, {"error": "only GET is supported"})
+                return
+
+            url = urlsplit(target)
+            if url.path == "/health":
+                await self._send_json(writer, 200, {
+                    "status": "ok", "pending": self.pending, "capacity": self.capacity
+                })
+            elif url.path == "/template":
+                await self._template(writer, url.query)
+            else:
+                await self._send_json(writer, 404, {"error": f"no route {url.path}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client went away
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _template(self, writer, query):
+        try:
+            params, seed = parse_params(query)
+        except ValueError as e:
+            await self._send_json(writer, 400, {"error": str(e)})
+            return
+
+        # Backpressure: reject instead of growing an unbounded queue
+        if self.pending >= self.capacity:
+            await self._send_json(writer, 503, {"error": "server busy, retry later"}, {"Retry-After": "1"})
+            return
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(self._executor, _render_job, params, seed)
+        except ConstraintsNotMet as e:
+            await self._send_json(writer, 422, {"error": str(e)})
+            return
+        except Exception as e:
+            await self._send_json(writer, 500, {"error": str(e)})
+            return
+        finally:
+            self.pending -= 1
+
+        headers = {
+            "Content-Type": "text/tab-separated-values; charset=utf-8",
+            "Content-Disposition": f'attachment; filename="{_template_name(params, seed)}"',
+            "X-Template-Seed": str(seed),
+            "Transfer-Encoding": "chunked",
+        }
+        writer.write(self._head(200, headers))
+        view = memoryview(data)
+        for start in range(0, len(view), STREAM_CHUNK):
+            chunk = view[start:start + STREAM_CHUNK]
+            writer.write(b"%x\r\n" % len(chunk))
+            writer.write(chunk)
+            writer.write(b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _head(status, headers):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", "Connection: close"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer, status, payload, extra_headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        headers.update(extra_headers or {})
+        writer.write(self._head(status, headers) + body)
+        await writer.drain()
+
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(description="Local HTTP service generating HotA templates on demand.")
+    p.add_argument("--serve", action="store_true", help="run the template server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    p.add_argument("--capacity", type=int, default=None, help="max jobs in flight before 503 (default: 2 x workers)")
+    return p
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    server = TemplateServer(args.host, args.port, workers=args.workers, capacity=args.capacity)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass